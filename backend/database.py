@@ -1,4 +1,4 @@
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure
 import os
 from dotenv import load_dotenv
@@ -7,41 +7,64 @@ from pathlib import Path
 env_path = Path(__file__).resolve().parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+# Connection pool and timeout settings
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 10000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 30000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 10000))
+# primary, primaryPreferred, secondary, secondaryPreferred or nearest
+MONGO_READ_PREFERENCE = os.getenv('MONGO_READ_PREFERENCE', 'primary')
+
 class Database:
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._initialize_connection()
         return cls._instance
-    
+
     def _initialize_connection(self):
-        """Initialize MongoDB connection."""
+        """Create the async MongoDB client; connections are opened lazily by the pool."""
         print("Starting MongoDB connection...")
+        self.client = AsyncIOMotorClient(
+            os.getenv('MONGO_URI'),
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+            socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            readPreference=MONGO_READ_PREFERENCE
+        )
+        self.db = self.client[os.getenv('DB_NAME', 'scmlitedb')]
+
+    async def ping(self):
+        """Verify the server is reachable."""
         try:
-            self.client = MongoClient(
-                os.getenv('MONGO_URI'),
-                serverSelectionTimeoutMS=5000
-            )
-            
-            # Test the connection
-            self.client.server_info()
-            self.db = self.client[os.getenv('DB_NAME', 'scmlitedb')]
+            await self.client.admin.command("ping")
             print("MongoDB connected")
         except ConnectionFailure as e:
             print(f"Failed to connect to MongoDB: {e}")
             raise
-    
+
     def get_collection(self, collection_name: str):
         """Get a collection."""
         return self.db[collection_name]
-    
-    def create_index(self, collection_name: str, index_key, **kwargs):
+
+    async def is_timeseries(self, collection_name: str) -> bool:
+        """Whether a collection is a native time-series collection."""
+        async for info in self.db.list_collections(filter={"name": collection_name}):
+            return info.get("type") == "timeseries"
+        return False
+
+    async def create_index(self, collection_name: str, index_key, **kwargs):
         """Create an index on a collection."""
         collection = self.get_collection(collection_name)
-        return collection.create_index(index_key, **kwargs)
-    
+        return await collection.create_index(index_key, **kwargs)
+
     def close_connection(self):
         """Close the MongoDB connection."""
         if hasattr(self, 'client'):
@@ -49,4 +72,4 @@ class Database:
             print("MongoDB connection closed")
 
 # Initialize database connection
-db = Database()
\ No newline at end of file
+db = Database()
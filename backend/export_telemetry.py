@@ -0,0 +1,60 @@
+"""Export device data straight from MongoDB to a file, as GET /data/export does.
+
+Streams the same NDJSON, CSV or Parquet encoding to disk with
+constant memory, without going through the API:
+
+    python -m backend.export_telemetry --device 3 --from 2024-05-01 --to 2024-06-01 \\
+        --format parquet --output device3-may.parquet
+    python -m backend.export_telemetry --format csv --gzip --output telemetry.csv.gz
+
+Run from the repository root with MONGO_URI / DB_NAME set as for the backend.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+
+from .database import db
+from .utils.export import ExportFormat, export_cursor, export_query, export_stream
+
+
+def _utc(value):
+    moment = datetime.fromisoformat(value)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+async def export(args, out):
+    collection = db.get_collection(args.collection)
+    query = export_query(args.device, args.start, args.end)
+    started = time.perf_counter()
+    written = 0
+    async for chunk in export_stream(export_cursor(collection, query, args.limit), args.format, args.gzip):
+        out.write(chunk)
+        written += len(chunk)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written / 1e6:.1f} MB in {elapsed:.1f}s", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--device", type=int, help="only this Device_ID (default: all devices)")
+    parser.add_argument("--from", dest="start", type=_utc, help="ISO 8601 start, inclusive (UTC if no offset)")
+    parser.add_argument("--to", dest="end", type=_utc, help="ISO 8601 end, exclusive (UTC if no offset)")
+    parser.add_argument("--format", type=ExportFormat, choices=[fmt.value for fmt in ExportFormat],
+                        default=ExportFormat.NDJSON)
+    parser.add_argument("--gzip", action="store_true", help="gzip the output")
+    parser.add_argument("--limit", type=int, help="stop after this many readings")
+    parser.add_argument("--collection", default="shipment_data")
+    parser.add_argument("--output", required=True, help="file to write")
+    args = parser.parse_args()
+
+    try:
+        with open(args.output, "wb") as out:
+            asyncio.run(export(args, out))
+    finally:
+        db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.exception_handlers import http_exception_handler
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import uvicorn
@@ -12,8 +12,15 @@ env_path = Path(__file__).resolve().parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
 # Import routers
-from .routes import auth_routes, shipment_routes, data_routes, admin_routes
+from .routes import auth_routes, shipment_routes, data_routes, admin_routes, stream_routes
 from .database import db
+from .utils.device_state import DEVICE_STATE_COLLECTION
+from .utils.live_stream import live_hub
+from .utils.pagination import TIMESERIES_ENABLED, TIMESERIES_COLLECTIONS
+from .utils.metrics import METRICS_ENABLED, MetricsMiddleware
+from .utils.security import revoked_subjects
+from .utils import recaptcha
+from common.metrics import CONTENT_TYPE, REGISTRY
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -24,11 +31,15 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_routes.router)
 app.include_router(shipment_routes.router)
 app.include_router(data_routes.router)
 app.include_router(admin_routes.router)
+app.include_router(stream_routes.router)
 
 
 # Root endpoint (API health/info)
@@ -43,6 +54,12 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 # Serve built frontend assets (Vite build output)
 app.mount("/", StaticFiles(directory="build", html=True), name="frontend")
 
@@ -72,6 +89,7 @@ async def spa_fallback(request: Request, exc: StarletteHTTPException):
                 "/redoc",
                 "/openapi.json",
                 "/api",
+                "/metrics",
             )
         ):
             return await http_exception_handler(request, exc)
@@ -86,18 +104,36 @@ async def spa_fallback(request: Request, exc: StarletteHTTPException):
 
 # Startup event
 @app.on_event("startup")
-def startup_db_client():
+async def startup_db_client():
     """Initialize database connection on startup."""
     print("Starting backend...")
     try:
         # Test the connection
-        db.client.admin.command("ping")
-        print("MongoDB connected")
+        await db.ping()
 
         # Create indexes
-        db.create_index("users", "email", unique=True)
-        db.create_index("shipments_usr", "device_id")
-        db.create_index("shipments_usr", "timestamp")
+        await db.create_index("users", "email", unique=True)
+        # Shipment listings filter by owner (then device or status) and page by (created_at, _id)
+        await db.create_index("shipments_usr", [("created_by", 1), ("created_at", -1), ("_id", -1)])
+        await db.create_index("shipments_usr", [("created_by", 1), ("device_id", 1), ("created_at", -1), ("_id", -1)])
+        await db.create_index("shipments_usr", [("created_by", 1), ("status", 1), ("created_at", -1), ("_id", -1)])
+        if TIMESERIES_ENABLED or await db.is_timeseries("shipment_data"):
+            # The consumer creates the time-series collection and its indexes;
+            # creating an index here first would make it a regular collection
+            TIMESERIES_COLLECTIONS.add("shipment_data")
+        else:
+            # Keyset pagination over (timestamp, _id), newest first
+            await db.create_index("shipment_data", [("timestamp", -1), ("_id", -1)])
+            await db.create_index("shipment_data", [("Device_ID", 1), ("timestamp", -1), ("_id", -1)])
+        # Rollups are upserted by the consumer; the unique index also serves range reads
+        for rollup in data_routes.ROLLUP_COLLECTIONS.values():
+            await db.create_index(rollup, [("Device_ID", 1), ("bucket_start", 1)], unique=True)
+        # The device health check counts recent 1-minute buckets across all devices
+        await db.create_index(admin_routes.RECENT_ROLLUP_COLLECTION, [("bucket_start", -1)])
+        await db.create_index(DEVICE_STATE_COLLECTION, [("last_seen", -1)])
+        await revoked_subjects.ensure_indexes()
+        await revoked_subjects.refresh()
+        await recaptcha.recaptcha_verifier.start()
 
     except Exception as e:
         print(f"Error connecting to MongoDB: {e}")
@@ -106,8 +142,10 @@ def startup_db_client():
 
 # Shutdown event
 @app.on_event("shutdown")
-def shutdown_db_client():
+async def shutdown_db_client():
     """Close database connection on shutdown."""
+    await live_hub.stop()
+    await recaptcha.recaptcha_verifier.close()
     db.close_connection()
     print("Backend shutdown")
 
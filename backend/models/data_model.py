@@ -1,9 +1,52 @@
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+from enum import Enum
+
+class CountMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
 
 class PaginatedResponse(BaseModel):
     data: List[Dict[str, Any]]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     limit: int
-    total_pages: int
\ No newline at end of file
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+class DeviceState(BaseModel):
+    Device_ID: int
+    last_seen: Optional[datetime] = None
+    message_count: int = 0
+    message_rate: float = 0.0
+    status: str
+    reading: Dict[str, Any]
+
+class RollupBucket(str, Enum):
+    AUTO = "auto"
+    MINUTE = "1m"
+    HOUR = "1h"
+    DAY = "1d"
+
+class SeriesStats(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+
+class SeriesPoint(BaseModel):
+    timestamp: datetime
+    count: int
+    temperature: SeriesStats
+    battery: SeriesStats
+    last_temperature: Optional[float] = None
+    last_battery: Optional[float] = None
+
+class SeriesResponse(BaseModel):
+    device_id: int
+    bucket: RollupBucket
+    start: datetime
+    end: datetime
+    points: List[SeriesPoint]
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from enum import Enum
 import re
 
@@ -12,6 +12,10 @@ class ShipmentStatus(str, Enum):
     DELIVERED = "delivered"
     CANCELLED = "cancelled"
 
+class ShipmentView(str, Enum):
+    SUMMARY = "summary"
+    FULL = "full"
+
 class RouteDetails(BaseModel):
     origin: str
     destination: str
@@ -34,37 +38,35 @@ class ShipmentBase(BaseModel):
     description: str | None = Field(None, description="Additional shipment details")
     status: ShipmentStatus = ShipmentStatus.PENDING
 
-@field_validator(
-    "po_number",
-    "ndc_number",
-    "container_number",
-    "delivery_number",
-    "batch_id"
-)
-
-@classmethod
-def validate_alphanumeric_hyphen(cls, value:str):
-    if not ALPHANUMERIC_HYPHEN.match(value):
-        raise ValueError(
-            "only letters, numbers, and hyphens are allowed"
-        )
-    return value
-
-@field_validator("serial_numbers")
-@classmethod
-def validate_serial_numbers(cls, values: List[str]):
-    if not values:
-        raise ValueError("At least one serial number is required")
-
-    for v in values:
-        if not ALPHANUMERIC_HYPHEN.match(v):
+class ShipmentCreate(ShipmentBase):
+    # Only new shipments are checked; stored ones may predate these rules
+    @field_validator(
+        "po_number",
+        "ndc_number",
+        "container_number",
+        "delivery_number",
+        "batch_id"
+    )
+    @classmethod
+    def validate_alphanumeric_hyphen(cls, value:str):
+        if not ALPHANUMERIC_HYPHEN.match(value):
             raise ValueError(
-                "serial numbers must contain only letters, numbers, and hyphens"
+                "only letters, numbers, and hyphens are allowed"
             )
-    return values
+        return value
 
-class ShipmentCreate(ShipmentBase):
-    pass
+    @field_validator("serial_numbers")
+    @classmethod
+    def validate_serial_numbers(cls, values: List[str]):
+        if not values:
+            raise ValueError("At least one serial number is required")
+
+        for v in values:
+            if not ALPHANUMERIC_HYPHEN.match(v):
+                raise ValueError(
+                    "serial numbers must contain only letters, numbers, and hyphens"
+                )
+        return values
 
 class ShipmentInDB(ShipmentBase):
     id: str
@@ -79,4 +81,9 @@ class ShipmentUpdate(BaseModel):
     status: Optional[ShipmentStatus] = None
     description: Optional[str] = None
     route: Optional[RouteDetails] = None
-    expected_delivery_date: Optional[datetime] = None
\ No newline at end of file
+    expected_delivery_date: Optional[datetime] = None
+
+class ShipmentStats(BaseModel):
+    total: int = 0
+    by_status: Dict[ShipmentStatus, int]
+    unique_devices: int = 0
@@ -1,12 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Dict, Any, List
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta, timezone
 from ..database import db
-from ..utils.security import get_current_user, is_admin
+from ..utils.security import get_current_user, is_admin, revoked_subjects
+from ..utils.device_state import device_states, DEVICE_TIMEOUT_MINUTES
+from ..utils.query_cache import query_cache
+from common.tracing import TRACE_FIELD, summarize
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-def require_admin(current_user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+# Whether the consumer maintains the rollup collections (same setting as the consumer's)
+ROLLUPS_ENABLED = os.getenv("ROLLUPS_ENABLED", "true").lower() == "true"
+# 1-minute rollups, counted by the device health check
+RECENT_ROLLUP_COLLECTION = "shipment_data_rollup_1m"
+
+# Device IDs the simulator generates (same settings as socket_server's)
+DEVICE_ID_START = int(os.getenv("DEVICE_ID_START", "1150"))
+DEVICE_COUNT = int(os.getenv("DEVICE_COUNT", "9"))
+
+# Most recent traced readings analysed per latency report
+TRACE_SAMPLE_LIMIT = int(os.getenv("TRACE_SAMPLE_LIMIT", "10000"))
+
+async def require_admin(current_user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
     """Dependency to ensure the current user is an admin."""
     if not current_user.get("is_admin"):
         raise HTTPException(
@@ -16,12 +32,12 @@ def require_admin(current_user: Dict[str, Any] = Depends(get_current_user)) -> D
     return current_user
 
 @router.get("/users", response_model=List[Dict[str, Any]])
-def get_all_users(current_user: Dict[str, Any] = Depends(require_admin)):
+async def get_all_users(current_user: Dict[str, Any] = Depends(require_admin)):
     """Get all users (admin only)."""
     users_collection = db.get_collection("users")
     users = []
     
-    for user in users_collection.find():
+    async for user in users_collection.find():
         users.append({
             "_id": str(user["_id"]),
             "email": user["email"],
@@ -32,7 +48,7 @@ def get_all_users(current_user: Dict[str, Any] = Depends(require_admin)):
     return users
 
 @router.delete("/users/{user_id}")
-def delete_user(user_id: str, current_user: Dict[str, Any] = Depends(require_admin)):
+async def delete_user(user_id: str, current_user: Dict[str, Any] = Depends(require_admin)):
     """Delete a user (admin only)."""
     from bson import ObjectId
     from bson.errors import InvalidId
@@ -54,60 +70,97 @@ def delete_user(user_id: str, current_user: Dict[str, Any] = Depends(require_adm
             detail="Invalid user ID format"
         )
     
-    result = users_collection.delete_one({"_id": object_id})
+    result = await users_collection.delete_one({"_id": object_id})
     
     if result.deleted_count == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+
+    # Tokens already issued to the user stop working before they expire
+    await revoked_subjects.revoke(user_id)
     
     return {"message": "User deleted successfully"}
 
 @router.get("/health/devices")
-def get_device_health(current_user: Dict[str, Any] = Depends(require_admin)):
+async def get_device_health(current_user: Dict[str, Any] = Depends(require_admin)):
     """Check which device IDs have been seen in recent data stream (admin only)."""
-    collection = db.get_collection("shipment_data")
+    # Expected device IDs based on the simulator
+    expected_devices = list(range(DEVICE_ID_START, DEVICE_ID_START + DEVICE_COUNT))
     
-    # Expected device IDs based on the simulator (1150-1158)
-    expected_devices = list(range(1150, 1159))
-    
-    # Check data from the last 5 minutes
-    time_threshold = datetime.now(timezone.utc) - timedelta(minutes=5)
-    
-    # Get unique device IDs from recent data
-    pipeline = [
-        {
-            "$match": {
-                "timestamp": {"$gte": time_threshold}
-            }
-        },
-        {
-            "$group": {
-                "_id": "$Device_ID"
-            }
-        }
-    ]
-    
-    recent_devices = set()
-    for doc in collection.aggregate(pipeline):
-        if doc["_id"]:
-            recent_devices.add(doc["_id"])
+    # Device status comes from the state the consumer maintains, one document per device
+    states = await device_states.get_all()
+    recent_devices = {state["Device_ID"] for state in states if state["status"] == "active"}
     
     # Classify devices
     active_devices = [dev for dev in expected_devices if dev in recent_devices]
     missing_devices = [dev for dev in expected_devices if dev not in recent_devices]
     
-    # Get total data points in the last 5 minutes
-    total_recent_data = collection.count_documents({
-        "timestamp": {"$gte": time_threshold}
-    })
+    # Count recent data points from the 1-minute rollups (indexed on bucket_start) when the
+    # consumer maintains them, otherwise from the raw readings' timestamp index
+    time_threshold = datetime.now(timezone.utc) - timedelta(minutes=DEVICE_TIMEOUT_MINUTES)
+    total_recent_data = 0
+    if ROLLUPS_ENABLED:
+        pipeline = [
+            {"$match": {"bucket_start": {"$gte": time_threshold.replace(second=0, microsecond=0)}}},
+            {"$group": {"_id": None, "count": {"$sum": "$count"}}}
+        ]
+        async for doc in db.get_collection(RECENT_ROLLUP_COLLECTION).aggregate(pipeline):
+            total_recent_data = doc["count"]
+    else:
+        total_recent_data = await db.get_collection("shipment_data").count_documents(
+            {"timestamp": {"$gte": time_threshold}}
+        )
     
     return {
-        "time_window_minutes": 5,
+        "time_window_minutes": DEVICE_TIMEOUT_MINUTES,
         "expected_devices": expected_devices,
         "active_devices": sorted(active_devices),
         "missing_devices": sorted(missing_devices),
         "total_recent_data_points": total_recent_data,
         "health_status": "healthy" if len(missing_devices) == 0 else "degraded"
     }
+
+@router.get("/pipeline/latency")
+async def get_pipeline_latency(
+    current_user: Dict[str, Any] = Depends(require_admin),
+    minutes: int = Query(15, ge=1, le=1440, description="Window of readings to analyse"),
+    device_id: Optional[int] = Query(None, description="Only readings from this device")
+):
+    """
+    Report p50/p95/p99 latency (ms) of each pipeline hop over recent readings (admin only).
+
+    Each stage is timed from the previous one (emitted -> framed -> produced ->
+    consumed -> persisted); `total` runs from the first to the last stage recorded.
+    At most TRACE_SAMPLE_LIMIT of the newest traced readings are analysed.
+    """
+    since = datetime.now(timezone.utc) - timedelta(minutes=minutes)
+    query: Dict[str, Any] = {"timestamp": {"$gte": since}, f"{TRACE_FIELD}.persisted": {"$exists": True}}
+    if device_id is not None:
+        query["Device_ID"] = device_id
+
+    cursor = db.get_collection("shipment_data") \
+               .find(query, {TRACE_FIELD: 1, "_id": 0}) \
+               .sort("timestamp", -1) \
+               .limit(TRACE_SAMPLE_LIMIT)
+    traces = [doc[TRACE_FIELD] async for doc in cursor]
+
+    return {
+        "time_window_minutes": minutes,
+        "device_id": device_id,
+        "samples": len(traces),
+        "truncated": len(traces) == TRACE_SAMPLE_LIMIT,
+        "stages": summarize(traces)
+    }
+
+@router.get("/cache")
+async def get_query_cache_stats(current_user: Dict[str, Any] = Depends(require_admin)):
+    """Hit, miss, single-flight and eviction counts of this worker's query cache (admin only)."""
+    return await query_cache.stats()
+
+@router.delete("/cache")
+async def clear_query_cache(current_user: Dict[str, Any] = Depends(require_admin)):
+    """Drop every cached query result (admin only)."""
+    await query_cache.clear()
+    return {"message": "Query cache cleared"}
@@ -1,8 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from datetime import datetime, timezone
-import os
 from dotenv import load_dotenv
-import httpx
 
 from pathlib import Path
 
@@ -11,28 +9,26 @@ load_dotenv(dotenv_path=env_path)
 
 from ..models.user_model import UserCreate, UserLogin, UserInDB
 from ..database import db
+from ..utils.recaptcha import verify_recaptcha
 from ..utils.security import (
     create_access_token,
     get_current_user,
-    verify_password,
+    verify_and_update_password,
     get_password_hash,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
-RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY")
-RECAPTCHA_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
 
-
-async def verify_recaptcha(token: str) -> bool:
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            RECAPTCHA_VERIFY_URL,
-            data={"secret": RECAPTCHA_SECRET_KEY, "response": token},
+async def _check_password(users_collection, user_data: dict, password: str) -> bool:
+    """Verify a login password, rehashing it if BCRYPT_ROUNDS changed since it was stored."""
+    valid, new_hash = await verify_and_update_password(password, user_data["hashed_password"])
+    if valid and new_hash:
+        await users_collection.update_one(
+            {"_id": user_data["_id"]}, {"$set": {"hashed_password": new_hash}}
         )
-        result = response.json()
-        return result.get("success", False)
+    return valid
 
 
 @router.post("/signup", response_model=dict)
@@ -41,26 +37,26 @@ async def signup(user: UserCreate):
     users_collection = db.get_collection("users")
 
     # verify recaptcha
-    if not verify_recaptcha(user.recaptcha_token):
+    if not await verify_recaptcha(user.recaptcha_token):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid reCAPTCHA token"
         )
 
     # Check if user exists
-    if users_collection.find_one({"email": user.email}):
+    if await users_collection.find_one({"email": user.email}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
     # Hash the password before storing
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
 
     # Create user data with hashed password
     user_data = user.model_dump(exclude={"password", "recaptcha_token"})
     user_data["hashed_password"] = hashed_password
     user_data["created_at"] = datetime.now(timezone.utc)
 
-    result = users_collection.insert_one(user_data)
+    result = await users_collection.insert_one(user_data)
 
     return {"message": "User created successfully", "user_id": str(result.inserted_id)}
 
@@ -73,7 +69,7 @@ async def login(user: UserLogin):
     users_collection = db.get_collection("users")
 
     # verify recaptcha
-    if not verify_recaptcha(user.recaptcha_token):
+    if not await verify_recaptcha(user.recaptcha_token):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid reCAPTCHA token"
         )
@@ -83,7 +79,7 @@ async def login(user: UserLogin):
     if ADMIN_MAIL and user.email == ADMIN_MAIL and ADMIN_PASSWORD:
         if user.password == ADMIN_PASSWORD:
             # Admin login with env password - find or verify user exists
-            user_data = users_collection.find_one({"email": user.email})
+            user_data = await users_collection.find_one({"email": user.email})
             if not user_data:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,10 +88,8 @@ async def login(user: UserLogin):
             is_admin_user = True
         else:
             # Admin email but wrong password - try normal auth
-            user_data = users_collection.find_one({"email": user.email})
-            if not user_data or not verify_password(
-                user.password, user_data["hashed_password"]
-            ):
+            user_data = await users_collection.find_one({"email": user.email})
+            if not user_data or not await _check_password(users_collection, user_data, user.password):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Incorrect email or password",
@@ -103,10 +97,8 @@ async def login(user: UserLogin):
             is_admin_user = True
     else:
         # Normal user login
-        user_data = users_collection.find_one({"email": user.email})
-        if not user_data or not verify_password(
-            user.password, user_data["hashed_password"]
-        ):
+        user_data = await users_collection.find_one({"email": user.email})
+        if not user_data or not await _check_password(users_collection, user_data, user.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
@@ -130,6 +122,6 @@ async def login(user: UserLogin):
 
 
 @router.get("/me", response_model=dict)
-def read_users_me(current_user: dict = Depends(get_current_user)):
+async def read_users_me(current_user: dict = Depends(get_current_user)):
     """Get current user information."""
     return current_user
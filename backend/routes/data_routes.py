@@ -1,64 +1,209 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import Dict, Any
-from ..models.data_model import PaginatedResponse
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Any, List, Optional
+from ..models.data_model import PaginatedResponse, CountMode, DeviceState, RollupBucket, SeriesResponse
 from ..database import db
 from ..utils.security import get_current_user
+from ..utils.pagination import KEYSET_SORT, keyset_page, time_bounded, encode_cursor, count_documents
+from ..utils.device_state import device_states
+from ..utils.query_cache import cache_key, ingest_versions, query_cache
+from ..utils.responses import READING_PROJECTION, dumps
+from ..utils.export import MEDIA_TYPES, ExportFormat, export_cursor, export_filename, export_query, export_stream, pa
 
 router = APIRouter(prefix="/data", tags=["shipment_data"])
 
+# Rollup collections maintained by the consumer
+ROLLUP_COLLECTIONS = {
+    RollupBucket.MINUTE: "shipment_data_rollup_1m",
+    RollupBucket.HOUR: "shipment_data_rollup_1h",
+    RollupBucket.DAY: "shipment_data_rollup_1d",
+}
+
+def _parse_device_id(device_id: str) -> int:
+    """Convert device_id to int for queries (matching the data format)."""
+    try:
+        return int(device_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid device_id format"
+        )
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat a naive query datetime as UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def _auto_bucket(span: timedelta) -> RollupBucket:
+    """Pick the finest bucket that keeps a chart to a few hundred points."""
+    if span <= timedelta(hours=6):
+        return RollupBucket.MINUTE
+    if span <= timedelta(days=14):
+        return RollupBucket.HOUR
+    return RollupBucket.DAY
+
+def _series_stats(stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not stats or not stats.get("count"):
+        return {}
+    return {
+        "min": stats.get("min"),
+        "max": stats.get("max"),
+        "mean": stats["sum"] / stats["count"],
+    }
+
+async def _load_page(collection, query, page, limit, cursor, count) -> bytes:
+    """Build an encoded PaginatedResponse in cursor mode (when `cursor` is given) or page mode."""
+    # The page query and the count run concurrently
+    if cursor is not None:
+        (documents, next_cursor, prev_cursor), total = await asyncio.gather(
+            keyset_page(collection, query, cursor, limit, projection=READING_PROJECTION),
+            count_documents(collection, query, count or CountMode.ESTIMATED)
+        )
+        page = None
+    else:
+        # Fetch one extra document to know whether there is a next page
+        async def fetch_page():
+            bounded = await time_bounded(collection, query, page * limit + 1)
+            return await collection.find(bounded, READING_PROJECTION) \
+                                   .sort(KEYSET_SORT) \
+                                   .skip((page - 1) * limit) \
+                                   .limit(limit + 1) \
+                                   .to_list(length=limit + 1)
+
+        documents, total = await asyncio.gather(
+            fetch_page(),
+            count_documents(collection, query, count or CountMode.EXACT)
+        )
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], "next") if has_more else None
+        prev_cursor = encode_cursor(documents[0], "prev") if documents and page > 1 else None
+
+    # Documents are encoded as they come from Mongo, ObjectId and datetime included
+    return dumps({
+        "data": documents,
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "total_pages": (total + limit - 1) // limit if total is not None else None,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
+    })
+
+async def _paginated_response(route, device_id, collection, query, page, limit, cursor, count) -> Response:
+    """
+    Serve a page through the query cache.
+
+    The key includes the ingest version of `device_id` (of all devices when
+    None), so a cached page is replaced as soon as the consumer writes newer
+    readings; identical concurrent requests share one database query.
+    """
+    version = await ingest_versions.get(device_id)
+    key = cache_key(route, version, None if cursor else page, limit, cursor, count.value if count else None)
+    body = await query_cache.get_or_load(
+        key, lambda: _load_page(collection, query, page, limit, cursor, count)
+    )
+    return Response(content=body, media_type="application/json")
+
 @router.get("/all", response_model=PaginatedResponse)
-def get_all_data(
+async def get_all_data(
     current_user: Dict[str, Any] = Depends(get_current_user),
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(10, ge=1, le=100, description="Items per page")
+    limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor/prev_cursor"),
+    count: Optional[CountMode] = Query(None, description="How to compute total")
 ):
     """
     Get paginated device data.
     
     - **page**: Page number (starts from 1)
     - **limit**: Number of items per page (max 100)
+    - **cursor**: next_cursor/prev_cursor of a previous response; seeks instead of skipping and overrides page
+    - **count**: exact, estimated or none (defaults to exact for page mode, estimated for cursor mode)
     """
-    # Calculate skip value
-    skip = (page - 1) * limit
-    
     # Get the collection
     collection = db.get_collection("shipment_data")
-    
-    # Get total count for pagination
-    total = collection.count_documents({})
-    total_pages = (total + limit - 1) // limit
-    
-    # Fetch paginated data
-    data = []
-    for item in collection.find().skip(skip).limit(limit):
-        item["_id"] = str(item["_id"])
-        data.append(item)
-        
-    return {
-        "data": data,
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": total_pages
-    }
+
+    return await _paginated_response("data:all", None, collection, {}, page, limit, cursor, count)
+
+@router.get("/export")
+async def export_data(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    device_id: Optional[str] = Query(None, description="Only this device (default: all devices)"),
+    start: Optional[datetime] = Query(None, alias="from", description="Readings at or after (UTC if no offset)"),
+    end: Optional[datetime] = Query(None, alias="to", description="Readings before (UTC if no offset)"),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="ndjson, csv or parquet"),
+    gzip: bool = Query(False, description="gzip the file"),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many readings")
+):
+    """
+    Stream device data oldest first as a file download.
+
+    Rows come straight from a MongoDB cursor and are written out in chunks,
+    so memory stays constant however large the range is.
+
+    - **device_id**: The ID of the device to export (default: all devices)
+    - **from** / **to**: Time range
+    - **format**: ndjson, csv or parquet (requires pyarrow)
+    - **gzip**: Compress the output
+    - **limit**: Maximum number of readings
+    """
+    device_id_int = _parse_device_id(device_id) if device_id is not None else None
+    start, end = _utc(start), _utc(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be before 'to'"
+        )
+    if export_format == ExportFormat.PARQUET and pa is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires pyarrow on the server"
+        )
+
+    collection = db.get_collection("shipment_data")
+    cursor = export_cursor(collection, export_query(device_id_int, start, end), limit)
+    filename = export_filename(export_format, device_id_int, gzip)
+    return StreamingResponse(
+        export_stream(cursor, export_format, gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/latest", response_model=Dict[str, Any])
-def get_latest_data(
+async def get_latest_data(
     current_user: Dict[str, Any] = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Get the latest data point from all devices."""
+    states = await device_states.get_all()
+    if states:
+        return dict(states[0]["reading"])
+
+    # Device state not materialized yet (e.g. consumer not running)
     collection = db.get_collection("shipment_data")
-    latest = collection.find_one(sort=[("timestamp", -1)])
+    latest = await collection.find_one({}, READING_PROJECTION, sort=[("timestamp", -1)])
     if latest:
         latest["_id"] = str(latest["_id"])
     return latest or {}
 
+@router.get("/devices/latest", response_model=List[DeviceState])
+async def get_devices_latest(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> List[Dict[str, Any]]:
+    """Get the last reading, last-seen time, message rate and status of every device."""
+    return await device_states.get_all()
+
 @router.get("/device/{device_id}", response_model=PaginatedResponse)
-def get_device_data(
+async def get_device_data(
     device_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user),
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(10, ge=1, le=100, description="Items per page")
+    limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor/prev_cursor"),
+    count: Optional[CountMode] = Query(None, description="How to compute total")
 ):
     """
     Get paginated data for a specific device.
@@ -66,39 +211,68 @@ def get_device_data(
     - **device_id**: The ID of the device to fetch data for
     - **page**: Page number (starts from 1)
     - **limit**: Number of items per page (max 100)
+    - **cursor**: next_cursor/prev_cursor of a previous response; seeks instead of skipping and overrides page
+    - **count**: exact, estimated or none (defaults to exact for page mode, estimated for cursor mode)
     """
-    # Calculate skip value
-    skip = (page - 1) * limit
-    
     # Get the collection
     collection = db.get_collection("shipment_data")
     
-    # Convert device_id to int for query (matching the data format)
-    try:
-        device_id_int = int(device_id)
-    except ValueError:
+    device_id_int = _parse_device_id(device_id)
+    
+    return await _paginated_response(
+        f"data:device:{device_id_int}", device_id_int,
+        collection, {"Device_ID": device_id_int}, page, limit, cursor, count
+    )
+
+@router.get("/device/{device_id}/series", response_model=SeriesResponse)
+async def get_device_series(
+    device_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    start: Optional[datetime] = Query(None, alias="from", description="Range start (default: 24 hours before `to`)"),
+    end: Optional[datetime] = Query(None, alias="to", description="Range end (default: now)"),
+    bucket: RollupBucket = Query(RollupBucket.AUTO, description="Bucket size: 1m, 1h, 1d or auto")
+):
+    """
+    Get temperature and battery statistics for a device over time, served from rollups.
+
+    - **device_id**: The ID of the device to fetch data for
+    - **from** / **to**: Time range (ISO 8601, UTC if no offset is given)
+    - **bucket**: 1m, 1h, 1d, or auto to pick one from the range length
+    """
+    device_id_int = _parse_device_id(device_id)
+
+    end = _utc(end) or datetime.now(timezone.utc)
+    start = _utc(start) or end - timedelta(hours=24)
+    if start >= end:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid device_id format"
+            detail="'from' must be before 'to'"
         )
-    
-    # Get total count for pagination
-    total = collection.count_documents({"Device_ID": device_id_int})
-    total_pages = (total + limit - 1) // limit
-    
-    # Fetch paginated data
-    data = []
-    for item in collection.find({"Device_ID": device_id_int})\
-                             .sort("timestamp", -1)\
-                             .skip(skip)\
-                             .limit(limit):
-        item["_id"] = str(item["_id"])
-        data.append(item)
-        
+    if bucket == RollupBucket.AUTO:
+        bucket = _auto_bucket(end - start)
+
+    collection = db.get_collection(ROLLUP_COLLECTIONS[bucket])
+    cursor = collection.find({
+        "Device_ID": device_id_int,
+        "bucket_start": {"$gte": start, "$lt": end}
+    }).sort("bucket_start", 1)
+
+    points = []
+    async for doc in cursor:
+        last = doc.get("last") or {}
+        points.append({
+            "timestamp": doc["bucket_start"],
+            "count": doc.get("count", 0),
+            "temperature": _series_stats(doc.get("temperature")),
+            "battery": _series_stats(doc.get("battery")),
+            "last_temperature": last.get("temperature"),
+            "last_battery": last.get("battery"),
+        })
+
     return {
-        "data": data,
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": total_pages
-    }
\ No newline at end of file
+        "device_id": device_id_int,
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "points": points
+    }
@@ -1,16 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+import asyncio
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from bson import ObjectId
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
 
-from ..models.shipment_model import ShipmentCreate, ShipmentInDB
+from ..models.data_model import CountMode, PaginatedResponse
+from ..models.shipment_model import ShipmentCreate, ShipmentInDB, ShipmentStats, ShipmentStatus, ShipmentView
 from ..database import db
 from ..utils.security import get_current_user
+from ..utils.pagination import count_documents, keyset_page
+from ..utils.responses import FastJSONResponse
+from ..utils.shipment_import import MAX_RECORD_CHARS, detect_format, parse_rows
+
+# Rows validated and inserted per insert_many during an import
+SHIPMENT_IMPORT_CHUNK = int(os.getenv("SHIPMENT_IMPORT_CHUNK", "1000"))
+# Row errors reported per import; the counts still cover every row
+SHIPMENT_IMPORT_MAX_ERRORS = int(os.getenv("SHIPMENT_IMPORT_MAX_ERRORS", "1000"))
+# Longest NDJSON line or CSV record accepted, in characters; longer ones are row errors
+SHIPMENT_IMPORT_MAX_RECORD = int(os.getenv("SHIPMENT_IMPORT_MAX_RECORD", str(MAX_RECORD_CHARS)))
 
 router = APIRouter(prefix="/shipments", tags=["shipments"])
 
 @router.post("/create", response_model=Dict[str, Any])
-def create_shipment(
+async def create_shipment(
     shipment: ShipmentCreate, 
     current_user: Dict[str, Any] = Depends(get_current_user)
 ) -> Dict[str, Any]:
@@ -20,70 +35,235 @@ def create_shipment(
     shipment_data["created_at"] = datetime.utcnow()
     
     shipments_collection = db.get_collection("shipments_usr")
-    result = shipments_collection.insert_one(shipment_data)
+    result = await shipments_collection.insert_one(shipment_data)
     return {
         "message": "Shipment created successfully", 
         "shipment_id": str(result.inserted_id)
     }
 
-@router.get("/all", response_model=List[Dict[str, Any]])
-def get_all_shipments(
+def _validation_messages(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    ]
+
+class _ImportReport:
+    """Counts and a capped list of per-row errors for one import."""
+
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.errors_truncated = False
+
+    def fail(self, row: int, messages: List[str]):
+        self.failed += 1
+        if len(self.errors) < SHIPMENT_IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "errors": messages})
+        else:
+            self.errors_truncated = True
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "errors_truncated": self.errors_truncated
+        }
+
+async def _insert_chunk(collection, chunk: List[Tuple[int, Dict[str, Any]]], report: _ImportReport):
+    """Unordered insert_many of validated rows; rejected documents are reported by row."""
+    try:
+        result = await collection.insert_many([document for _, document in chunk], ordered=False)
+        report.inserted += len(result.inserted_ids)
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        report.inserted += e.details.get("nInserted", len(chunk) - len(write_errors))
+        for write_error in write_errors:
+            report.fail(chunk[write_error["index"]][0], [write_error.get("errmsg", "write failed")])
+
+@router.post("/import", response_model=Dict[str, Any])
+async def import_shipments(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson; defaults to the Content-Type"),
     current_user: Dict[str, Any] = Depends(get_current_user)
-) -> List[Dict[str, Any]]:
-    """Get all shipments for the current user."""
-    # Get the collection
+) -> Dict[str, Any]:
+    """
+    Bulk-create shipments from a CSV or NDJSON request body.
+
+    The body is streamed and validated in chunks of SHIPMENT_IMPORT_CHUNK rows,
+    so memory stays bounded by the chunk size rather than the file; a line or
+    record over SHIPMENT_IMPORT_MAX_RECORD characters is a row error. Valid
+    rows are inserted even when others fail; the response reports each failed row.
+
+    CSV headers are field names, with route.origin, route.destination etc. for
+    the route and ';' between serial_numbers and route.waypoints.
+    """
+    fmt = import_format or detect_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson"
+        )
+
     collection = db.get_collection("shipments_usr")
-    
-    # Query for user's shipments
-    query = {"created_by": current_user["email"]}
-    
-    # Execute query
-    cursor = collection.find(query)
-    shipments = []
-    
-    # Convert ObjectId to string for JSON serialization
-    for shipment in cursor:
-        shipment["_id"] = str(shipment["_id"])
-        shipments.append(shipment)
-        
-    return shipments
+    report = _ImportReport()
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    async for row, record, error in parse_rows(request.stream(), fmt, SHIPMENT_IMPORT_MAX_RECORD):
+        report.received += 1
+        if error is not None:
+            report.fail(row, [error])
+            continue
+        try:
+            shipment = ShipmentCreate.model_validate(record)
+        except ValidationError as e:
+            report.fail(row, _validation_messages(e))
+            continue
+        document = shipment.model_dump()
+        document["created_by"] = current_user["email"]
+        document["created_at"] = datetime.utcnow()
+        chunk.append((row, document))
+        if len(chunk) >= SHIPMENT_IMPORT_CHUNK:
+            await _insert_chunk(collection, chunk, report)
+            chunk = []
+    if chunk:
+        await _insert_chunk(collection, chunk, report)
+
+    return report.as_dict()
 
-@router.get("/device/{device_id}", response_model=List[Dict[str, Any]])
-def get_shipments_by_device_id(
+# Fields the listings return in summary view; the full view returns everything
+SUMMARY_PROJECTION = {
+    "shipment_number": 1,
+    "device_id": 1,
+    "route.origin": 1,
+    "route.destination": 1,
+    "po_number": 1,
+    "goods_type": 1,
+    "status": 1,
+    "expected_delivery_date": 1,
+    "created_at": 1,
+}
+
+def _shipment_query(
+    current_user: Dict[str, Any],
+    shipment_status: Optional[ShipmentStatus],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    **extra: Any
+) -> Dict[str, Any]:
+    """Filter on the owner plus optional status and created_at range, in index prefix order."""
+    query: Dict[str, Any] = {"created_by": current_user["email"], **extra}
+    if shipment_status is not None:
+        query["status"] = shipment_status.value
+    if start is not None or end is not None:
+        created: Dict[str, Any] = {}
+        if start is not None:
+            created["$gte"] = start
+        if end is not None:
+            created["$lt"] = end
+        query["created_at"] = created
+    return query
+
+async def _shipment_page(query, view, limit, cursor, count) -> FastJSONResponse:
+    """One keyset page of shipments, newest first by created_at."""
+    collection = db.get_collection("shipments_usr")
+    projection = SUMMARY_PROJECTION if view == ShipmentView.SUMMARY else None
+    (documents, next_cursor, prev_cursor), total = await asyncio.gather(
+        keyset_page(collection, query, cursor, limit, field="created_at", projection=projection),
+        count_documents(collection, query, count)
+    )
+    return FastJSONResponse({
+        "data": documents,
+        "total": total,
+        "page": None,
+        "limit": limit,
+        "total_pages": (total + limit - 1) // limit if total is not None else None,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
+    })
+
+@router.get("/all", response_model=PaginatedResponse)
+async def get_all_shipments(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor/prev_cursor"),
+    view: ShipmentView = Query(ShipmentView.SUMMARY, description="summary or full documents"),
+    shipment_status: Optional[ShipmentStatus] = Query(None, alias="status", description="Only this status"),
+    start: Optional[datetime] = Query(None, alias="from", description="Created at or after"),
+    end: Optional[datetime] = Query(None, alias="to", description="Created before"),
+    count: CountMode = Query(CountMode.ESTIMATED, description="How to compute total")
+):
+    """
+    Get the current user's shipments, newest first.
+
+    - **limit**: Number of items per page (max 200)
+    - **cursor**: next_cursor/prev_cursor of a previous response
+    - **view**: summary (listing fields only) or full
+    - **status** / **from** / **to**: Filter by status and creation time
+    - **count**: exact, estimated (cached) or none
+    """
+    query = _shipment_query(current_user, shipment_status, start, end)
+    return await _shipment_page(query, view, limit, cursor, count)
+
+@router.get("/device/{device_id}", response_model=PaginatedResponse)
+async def get_shipments_by_device_id(
     device_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor/prev_cursor"),
+    view: ShipmentView = Query(ShipmentView.SUMMARY, description="summary or full documents"),
+    shipment_status: Optional[ShipmentStatus] = Query(None, alias="status", description="Only this status"),
+    start: Optional[datetime] = Query(None, alias="from", description="Created at or after"),
+    end: Optional[datetime] = Query(None, alias="to", description="Created before"),
+    count: CountMode = Query(CountMode.ESTIMATED, description="How to compute total")
+):
+    """Get the current user's shipments for a specific device ID, newest first."""
+    try:
+        device_id_int = int(device_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid device_id format"
+        )
+
+    query = _shipment_query(current_user, shipment_status, start, end, device_id=device_id_int)
+    return await _shipment_page(query, view, limit, cursor, count)
+
+@router.get("/stats", response_model=ShipmentStats)
+async def get_shipment_stats(
     current_user: Dict[str, Any] = Depends(get_current_user)
-) -> List[Dict[str, Any]]:
-    """Get all shipments for a specific device ID for the current user."""
-    # Get the collection
+) -> Dict[str, Any]:
+    """Count the current user's shipments by status, without listing them."""
     collection = db.get_collection("shipments_usr")
+    pipeline = [
+        {"$match": {"created_by": current_user["email"]}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}, "devices": {"$addToSet": "$device_id"}}}
+    ]
+    by_status = {shipment_status: 0 for shipment_status in ShipmentStatus}
+    total = 0
+    devices = set()
+    async for group in collection.aggregate(pipeline):
+        total += group["count"]
+        if group["_id"] in by_status:
+            by_status[ShipmentStatus(group["_id"])] = group["count"]
+        devices.update(group["devices"])
 
-    device_id_int = int(device_id)
-    
-    # Query for user's shipments with matching device_id
-    query = {
-        "created_by": current_user["email"],
-        "device_id": device_id_int
+    return {
+        "total": total,
+        "by_status": by_status,
+        "unique_devices": len(devices)
     }
-    
-    # Execute query
-    cursor = collection.find(query).sort("created_at", -1)
-    shipments = []
-    
-    # Convert ObjectId to string for JSON serialization
-    for shipment in cursor:
-        shipment["_id"] = str(shipment["_id"])
-        shipments.append(shipment)
-        
-    return shipments
 
 @router.get("/{shipment_id}", response_model=ShipmentInDB)
-def get_shipment(
+async def get_shipment(
     shipment_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ) -> ShipmentInDB:
     """Get a specific shipment by ID."""
     shipments_collection = db.get_collection("shipments_usr")
-    shipment = shipments_collection.find_one({
+    shipment = await shipments_collection.find_one({
         "_id": ObjectId(shipment_id),
         "created_by": current_user["email"]
     })
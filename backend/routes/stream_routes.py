@@ -0,0 +1,97 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Optional
+from ..utils.security import decode_access_token, get_current_user, revoked_subjects
+from ..utils.live_stream import live_hub
+
+router = APIRouter(prefix="/data/stream", tags=["live"])
+
+# Seconds between SSE keep-alive comments on an idle stream
+KEEPALIVE_SECONDS = 15
+
+
+def _request_token(token: Optional[str], authorization: Optional[str]) -> str:
+    """Browsers can't set headers on EventSource/WebSocket, so accept ?token= as well."""
+    if token:
+        return token
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return ""
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    token: Optional[str] = Query(None, description="Access token (alternative to the Authorization header)"),
+    device_id: Optional[int] = Query(None, description="Only stream readings from this device")
+):
+    """
+    Server-Sent Events stream of new readings.
+
+    - **device_id**: Only stream readings from this device (default: all devices)
+    """
+    await revoked_subjects.refresh()
+    decode_access_token(_request_token(token, request.headers.get("authorization")))
+    subscription = live_hub.subscribe(device_id)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not subscription.closed:
+                messages = await subscription.get(timeout=KEEPALIVE_SECONDS)
+                if messages:
+                    yield "".join(f"data: {message}\n\n" for message in messages)
+                else:
+                    yield ": keep-alive\n\n"
+        finally:
+            live_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def stream_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    device_id: Optional[int] = Query(None)
+):
+    """WebSocket stream of new readings, one JSON reading per text frame."""
+    await revoked_subjects.refresh()
+    try:
+        decode_access_token(_request_token(token, websocket.headers.get("authorization")))
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    subscription = live_hub.subscribe(device_id)
+
+    async def watch_disconnect():
+        # Clients only listen; any receive ends with their disconnect
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        while not subscription.closed:
+            for message in await subscription.get():
+                await websocket.send_text(message)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        watcher.cancel()
+        live_hub.unsubscribe(subscription)
+
+
+@router.get("/stats")
+async def stream_stats(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """Subscriber, published and dropped counters for this worker."""
+    return live_hub.stats()
@@ -0,0 +1,69 @@
+# backend/utils/device_state.py
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from ..database import db
+from .responses import public_reading
+
+# Materialized by the consumer, one document per device
+DEVICE_STATE_COLLECTION = os.getenv("DEVICE_STATE_COLLECTION", "device_state")
+DEVICE_STATE_CACHE_TTL = float(os.getenv("DEVICE_STATE_CACHE_TTL", "2"))
+# A device not seen for this long is reported as missing
+DEVICE_TIMEOUT_MINUTES = int(os.getenv("DEVICE_TIMEOUT_MINUTES", "5"))
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class DeviceStateCache:
+    """In-process snapshot of the device state collection, refreshed at most every TTL seconds."""
+
+    def __init__(self, ttl: float = DEVICE_STATE_CACHE_TTL):
+        self.ttl = ttl
+        self._states: List[Dict[str, Any]] = []
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _load(self) -> List[Dict[str, Any]]:
+        collection = db.get_collection(DEVICE_STATE_COLLECTION)
+        states = []
+        async for doc in collection.find().sort("last_seen", -1):
+            last = doc.get("last") or {}
+            reading = public_reading(last.get("reading") or {})
+            if "_id" in reading:
+                reading["_id"] = str(reading["_id"])
+            states.append({
+                "Device_ID": doc["_id"],
+                "last_seen": _as_utc(doc.get("last_seen")),
+                "message_count": doc.get("message_count", 0),
+                "message_rate": doc.get("message_rate", 0.0),
+                "reading": reading,
+            })
+        return states
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        """All device states, most recently seen first, with a derived status."""
+        if time.monotonic() >= self._expires:
+            async with self._lock:
+                # Another request may have refreshed while we waited
+                if time.monotonic() >= self._expires:
+                    self._states = await self._load()
+                    self._expires = time.monotonic() + self.ttl
+
+        threshold = datetime.now(timezone.utc) - timedelta(minutes=DEVICE_TIMEOUT_MINUTES)
+        return [
+            {**state, "status": "active" if state["last_seen"] and state["last_seen"] >= threshold else "missing"}
+            for state in self._states
+        ]
+
+    def invalidate(self):
+        self._expires = 0.0
+
+
+device_states = DeviceStateCache()
@@ -0,0 +1,228 @@
+# backend/utils/export.py
+import asyncio
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId
+
+from common.metrics import Counter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet export is unavailable
+    pa = pq = None
+
+# Documents fetched per cursor round trip
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+# Encoded bytes buffered before a chunk is handed to the response
+EXPORT_FLUSH_BYTES = int(os.getenv("EXPORT_FLUSH_BYTES", str(256 * 1024)))
+# Rows per Parquet row group; the only rows held in memory at once
+EXPORT_ROW_GROUP_ROWS = int(os.getenv("EXPORT_ROW_GROUP_ROWS", "50000"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+# Exported columns, in order; matches the layout the consumer normalizes readings to
+EXPORT_FIELDS = [
+    "_id", "Device_ID", "timestamp", "Battery_Level",
+    "First_Sensor_temperature", "Route_From", "Route_To",
+]
+EXPORT_PROJECTION = {field: 1 for field in EXPORT_FIELDS}
+
+EXPORTED_ROWS = Counter("telemetry_export_rows_total", "Telemetry rows written by exports", ["format"])
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def export_query(device_id: Optional[int], start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """Filter for one device (or all) and a [start, end) timestamp range."""
+    query: Dict[str, Any] = {}
+    if device_id is not None:
+        query["Device_ID"] = device_id
+    if start is not None or end is not None:
+        timestamp: Dict[str, Any] = {}
+        if start is not None:
+            timestamp["$gte"] = start
+        if end is not None:
+            timestamp["$lt"] = end
+        query["timestamp"] = timestamp
+    return query
+
+
+def export_cursor(collection, query: Dict[str, Any], limit: Optional[int] = None):
+    """Oldest-first cursor over the exported fields, fetching EXPORT_BATCH_SIZE documents per round trip."""
+    cursor = collection.find(query, EXPORT_PROJECTION).sort("timestamp", 1).batch_size(EXPORT_BATCH_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor
+
+
+def _text_value(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        # Stored datetimes are UTC, but come back naive
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+    return value
+
+
+async def ndjson_chunks(documents: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    buffer: List[str] = []
+    size = 0
+    rows = 0
+    async for document in documents:
+        line = json.dumps({field: _text_value(document.get(field)) for field in EXPORT_FIELDS}) + "\n"
+        buffer.append(line)
+        size += len(line)
+        rows += 1
+        if size >= EXPORT_FLUSH_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            EXPORTED_ROWS.labels(ExportFormat.NDJSON.value).inc(rows)
+            buffer, size, rows = [], 0, 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+        EXPORTED_ROWS.labels(ExportFormat.NDJSON.value).inc(rows)
+
+
+async def csv_chunks(documents: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    rows = 0
+    async for document in documents:
+        writer.writerow([_text_value(document.get(field)) for field in EXPORT_FIELDS])
+        rows += 1
+        if buffer.tell() >= EXPORT_FLUSH_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            EXPORTED_ROWS.labels(ExportFormat.CSV.value).inc(rows)
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+        EXPORTED_ROWS.labels(ExportFormat.CSV.value).inc(rows)
+
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter that hands out what was written since the last take()."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Parquet records absolute offsets in its footer, so this counts everything written
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("_id", pa.string()),
+        ("Device_ID", pa.int64()),
+        ("timestamp", pa.timestamp("ms", tz="UTC")),
+        ("Battery_Level", pa.float64()),
+        ("First_Sensor_temperature", pa.float64()),
+        ("Route_From", pa.string()),
+        ("Route_To", pa.string()),
+    ])
+
+
+async def parquet_chunks(documents: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    Parquet with one row group per EXPORT_ROW_GROUP_ROWS documents.
+
+    Each row group is encoded in a worker thread and sent as soon as it is
+    written; only the footer waits for the end of the cursor.
+    """
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def empty_columns():
+        return {field: [] for field in EXPORT_FIELDS}
+
+    def write(columns):
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema), row_group_size=EXPORT_ROW_GROUP_ROWS)
+
+    columns = empty_columns()
+    rows = 0
+    try:
+        async for document in documents:
+            columns["_id"].append(str(document["_id"]))
+            for field in EXPORT_FIELDS[1:]:
+                columns[field].append(document.get(field))
+            rows += 1
+            if rows >= EXPORT_ROW_GROUP_ROWS:
+                await asyncio.to_thread(write, columns)
+                EXPORTED_ROWS.labels(ExportFormat.PARQUET.value).inc(rows)
+                columns, rows = empty_columns(), 0
+                yield sink.take()
+        if rows:
+            await asyncio.to_thread(write, columns)
+            EXPORTED_ROWS.labels(ExportFormat.PARQUET.value).inc(rows)
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+ENCODERS = {
+    ExportFormat.NDJSON: ndjson_chunks,
+    ExportFormat.CSV: csv_chunks,
+    ExportFormat.PARQUET: parquet_chunks,
+}
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = EXPORT_GZIP_LEVEL) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(documents: AsyncIterator[Dict[str, Any]], fmt: ExportFormat, gzip: bool = False) -> AsyncIterator[bytes]:
+    """Encode documents as `fmt`, optionally gzipped, in chunks of about EXPORT_FLUSH_BYTES."""
+    if fmt == ExportFormat.PARQUET and pa is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+    chunks = ENCODERS[fmt](documents)
+    return gzip_chunks(chunks) if gzip else chunks
+
+
+def export_filename(fmt: ExportFormat, device_id: Optional[int], gzip: bool = False) -> str:
+    name = f"telemetry-{device_id}" if device_id is not None else "telemetry"
+    return f"{name}.{fmt.value}" + (".gz" if gzip else "")
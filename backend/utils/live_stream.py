@@ -0,0 +1,218 @@
+# backend/utils/live_stream.py
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from bson import ObjectId
+
+from common.normalize import RejectedRecord, normalize
+
+from ..database import db
+from .responses import public_reading
+
+# Upstream feed shared by every subscriber of this worker: changestream or kafka
+LIVE_STREAM_SOURCE = os.getenv("LIVE_STREAM_SOURCE", "changestream")
+# Per-subscriber buffer; the oldest readings are dropped when a client falls behind
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "100"))
+LIVE_RETRY_SECONDS = float(os.getenv("LIVE_RETRY_SECONDS", "5"))
+KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092").split(",")
+KAFKA_TOPIC = os.getenv("KAFKA_TOPIC", "shipment_data")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def kafka_reading(message) -> Optional[Dict[str, Any]]:
+    """
+    A raw telemetry record as the consumer will store it, or None when the consumer rejects it.
+
+    The stored document's ObjectId isn't known yet, so `_id` is the record's
+    topic:partition:offset, which is just as unique and stable.
+    """
+    try:
+        reading = normalize(json.loads(message.value), message.timestamp)
+    except (ValueError, TypeError, RejectedRecord):
+        return None
+    reading["_id"] = f"{message.topic}:{message.partition}:{message.offset}"
+    return reading
+
+
+def encode_reading(reading: Dict[str, Any]) -> str:
+    """Serialize a reading once for every subscriber, without its pipeline bookkeeping."""
+    return json.dumps(public_reading(reading), default=_json_default, separators=(",", ":"))
+
+
+class Subscription:
+    """A client's bounded queue of encoded readings with drop-oldest semantics."""
+
+    def __init__(self, device_id: Optional[int], maxsize: int = LIVE_QUEUE_SIZE):
+        self.device_id = device_id
+        self.queue: deque = deque(maxlen=maxsize)
+        self.dropped = 0
+        self.closed = False
+        self._event = asyncio.Event()
+
+    def push(self, message: str):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(message)
+        self._event.set()
+
+    def close(self):
+        self.closed = True
+        self._event.set()
+
+    async def get(self, timeout: Optional[float] = None) -> List[str]:
+        """Wait for readings and return everything queued (empty on timeout or close)."""
+        if not self.queue and not self.closed:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._event.clear()
+        messages = list(self.queue)
+        self.queue.clear()
+        return messages
+
+
+class LiveStreamHub:
+    """Fans readings from one upstream source out to all subscribers of this worker."""
+
+    def __init__(self, source: str = LIVE_STREAM_SOURCE):
+        self.source = source
+        self.published = 0
+        self.rejected = 0
+        self._all: Set[Subscription] = set()
+        self._by_device: Dict[int, Set[Subscription]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def subscribe(self, device_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(device_id)
+        if device_id is None:
+            self._all.add(subscription)
+        else:
+            self._by_device.setdefault(device_id, set()).add(subscription)
+        self._ensure_started()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        if subscription.device_id is None:
+            self._all.discard(subscription)
+        else:
+            subscribers = self._by_device.get(subscription.device_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_device[subscription.device_id]
+
+    def publish(self, reading: Dict[str, Any]):
+        """Queue a reading for every matching subscriber, encoding it once."""
+        subscribers = self._by_device.get(reading.get("Device_ID"))
+        if not self._all and not subscribers:
+            return
+        self.published += 1
+        message = encode_reading(reading)
+        for subscription in self._all:
+            subscription.push(message)
+        if subscribers:
+            for subscription in subscribers:
+                subscription.push(message)
+
+    def stats(self) -> Dict[str, Any]:
+        subscriptions = list(self._all) + [s for subs in self._by_device.values() for s in subs]
+        return {
+            "source": self.source,
+            "subscribers": len(subscriptions),
+            "published": self.published,
+            "rejected": self.rejected,
+            "dropped": sum(s.dropped for s in subscriptions),
+        }
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._stop.clear()
+            runner = self._run_kafka if self.source == "kafka" else self._run_change_stream
+            self._task = asyncio.get_running_loop().create_task(runner())
+
+    async def _run_change_stream(self):
+        """Tail inserts into shipment_data (requires a replica set)."""
+        collection = db.get_collection("shipment_data")
+        while True:
+            try:
+                async with collection.watch([{"$match": {"operationType": "insert"}}]) as stream:
+                    print("Live stream: watching shipment_data change stream")
+                    async for change in stream:
+                        self.publish(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Live stream change stream failed: {e}. Retrying in {LIVE_RETRY_SECONDS} seconds...")
+                await asyncio.sleep(LIVE_RETRY_SECONDS)
+
+    async def _run_kafka(self):
+        """
+        Read the telemetry topic in a thread, without a group so every worker sees every reading.
+
+        Records are normalized like the consumer does, so subscribers get the
+        same fields and types as the change stream and never see rejected records.
+        """
+        loop = asyncio.get_running_loop()
+
+        def consume():
+            from kafka import KafkaConsumer
+
+            consumer = KafkaConsumer(
+                KAFKA_TOPIC,
+                bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+                auto_offset_reset="latest",
+                enable_auto_commit=False,
+                group_id=None
+            )
+            print("Live stream: consuming Kafka topic", KAFKA_TOPIC)
+            try:
+                while not self._stop.is_set():
+                    for messages in consumer.poll(timeout_ms=500).values():
+                        for message in messages:
+                            reading = kafka_reading(message)
+                            if reading is None:
+                                self.rejected += 1
+                            else:
+                                loop.call_soon_threadsafe(self.publish, reading)
+            finally:
+                consumer.close()
+
+        while not self._stop.is_set():
+            try:
+                await asyncio.to_thread(consume)
+            except asyncio.CancelledError:
+                self._stop.set()
+                raise
+            except Exception as e:
+                print(f"Live stream Kafka consumer failed: {e}. Retrying in {LIVE_RETRY_SECONDS} seconds...")
+                await asyncio.sleep(LIVE_RETRY_SECONDS)
+
+    async def stop(self):
+        self._stop.set()
+        for subscription in list(self._all) + [s for subs in self._by_device.values() for s in subs]:
+            subscription.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+live_hub = LiveStreamHub()
@@ -0,0 +1,53 @@
+# backend/utils/metrics.py
+import os
+from time import perf_counter
+
+from common.metrics import Counter, Gauge, Histogram
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+REQUESTS = Counter("http_requests_total", "HTTP requests handled", ["method", "route", "status"])
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled", ["method"])
+
+# Label for requests no API route matched (static files, 404s), to keep cardinality bounded
+UNMATCHED_ROUTE = "other"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and status per route template.
+
+    Labels use the matched route's path (`/data/device/{device_id}`), not the
+    raw URL. The route is only known once routing has run, so in-flight
+    requests are tracked per method.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - started
+            in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            REQUEST_SECONDS.labels(method, route).observe(elapsed)
+            REQUESTS.labels(method, route, str(status_code)).inc()
@@ -0,0 +1,168 @@
+# backend/utils/pagination.py
+import base64
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId, json_util
+from fastapi import HTTPException, status
+
+from ..models.data_model import CountMode
+
+# Newest first; _id breaks ties between readings with the same timestamp
+KEYSET_SORT = [("timestamp", -1), ("_id", -1)]
+
+# Readings are stored in a time-series collection created by the consumer
+TIMESERIES_ENABLED = os.getenv("TIMESERIES_ENABLED", "false").lower() == "true"
+# Collections treated as MongoDB time-series collections (filled at startup)
+TIMESERIES_COLLECTIONS: Set[str] = set()
+
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", "30"))
+COUNT_CACHE_MAX_ENTRIES = 1024
+_count_cache: Dict[Tuple[str, str], Tuple[float, int]] = {}
+
+
+def encode_cursor(document: Dict[str, Any], direction: str, field: str = "timestamp") -> str:
+    """Build an opaque cursor pointing at `document`'s (field, _id) key."""
+    payload = json_util.dumps(
+        {"t": document.get(field), "i": document["_id"], "d": direction}
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any, str]:
+    """Decode a cursor into (timestamp, _id, direction)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json_util.loads(raw)
+        if not isinstance(payload, dict):
+            raise ValueError(payload)
+        direction = payload["d"]
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        # Only values encode_cursor produces; anything else (e.g. a {"$ne": ...} operator)
+        # would be spliced into the keyset filter as-is
+        timestamp, object_id = payload["t"], payload["i"]
+        if timestamp is not None and not isinstance(timestamp, datetime):
+            raise ValueError(timestamp)
+        if not isinstance(object_id, ObjectId):
+            raise ValueError(object_id)
+        return timestamp, object_id, direction
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset_filter(timestamp: Any, object_id: Any, direction: str, field: str = "timestamp") -> Dict[str, Any]:
+    """Filter for documents after (next) or before (prev) the key in (field desc, _id desc) order."""
+    op = "$lt" if direction == "next" else "$gt"
+    # Documents without the field sort after every one that has it
+    if timestamp is None:
+        if direction == "next":
+            return {field: None, "_id": {"$lt": object_id}}
+        return {"$or": [
+            {field: {"$ne": None}},
+            {field: None, "_id": {"$gt": object_id}},
+        ]}
+
+    clauses = [
+        {field: {op: timestamp}},
+        {field: timestamp, "_id": {op: object_id}},
+    ]
+    if direction == "next":
+        clauses.append({field: None})
+    return {"$or": clauses}
+
+
+async def time_bounded(collection, query: Dict[str, Any], n: int, direction: str = "next",
+                       beyond: Any = None) -> Dict[str, Any]:
+    """
+    On a time-series collection, narrow `query` to the timestamps of its first `n` documents.
+
+    A (timestamp, _id) sort can't use the time-series bucket ordering, so it
+    would unpack every bucket; a sort on timestamp alone can. Finding the n-th
+    timestamp first (strictly beyond the cursor's `beyond` timestamp) lets the
+    keyset sort run over about n documents. Other collections are unchanged.
+    """
+    if collection.name not in TIMESERIES_COLLECTIONS:
+        return query
+    order, op, beyond_op = (-1, "$gte", "$lt") if direction == "next" else (1, "$lte", "$gt")
+    probe = query if beyond is None else {"$and": [query, {"timestamp": {beyond_op: beyond}}]}
+    documents = await collection.find(probe, {"timestamp": 1, "_id": 0}) \
+                                .sort("timestamp", order) \
+                                .skip(n - 1) \
+                                .limit(1) \
+                                .to_list(length=1)
+    if not documents:
+        # Fewer than n documents remain; no bound needed
+        return query
+    return {"$and": [query, {"timestamp": {op: documents[0]["timestamp"]}}]}
+
+
+async def keyset_page(
+    collection, query: Dict[str, Any], cursor: Optional[str], limit: int,
+    field: str = "timestamp", projection: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+    """
+    Fetch one page by seeking past the cursor instead of skipping.
+
+    Documents are ordered newest first by (field, _id); a `projection` must
+    keep `field`. Returns (documents, next_cursor, prev_cursor).
+    """
+    direction = "next"
+    timestamp = None
+    if cursor:
+        timestamp, object_id, direction = decode_cursor(cursor)
+    bounded = await time_bounded(collection, query, limit + 1, direction, timestamp)
+    if cursor:
+        query = {"$and": [bounded, keyset_filter(timestamp, object_id, direction, field)]}
+    else:
+        query = bounded
+
+    order = -1 if direction == "next" else 1
+    sort = [(field, order), ("_id", order)]
+    documents = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    if direction == "prev":
+        documents.reverse()
+
+    next_cursor = prev_cursor = None
+    if documents:
+        if has_more or direction == "prev":
+            next_cursor = encode_cursor(documents[-1], "next", field)
+        if cursor and (has_more or direction == "next"):
+            prev_cursor = encode_cursor(documents[0], "prev", field)
+    return documents, next_cursor, prev_cursor
+
+
+async def count_documents(collection, query: Dict[str, Any], mode: CountMode) -> Optional[int]:
+    """
+    Count matching documents according to `mode`.
+
+    - **exact**: count_documents on every call
+    - **estimated**: collection metadata for unfiltered queries, otherwise an
+      exact count cached for COUNT_CACHE_TTL seconds
+    - **none**: skip counting
+    """
+    if mode == CountMode.NONE:
+        return None
+    if mode == CountMode.EXACT:
+        return await collection.count_documents(query)
+    # Time-series collections are views, which have no collection metadata count
+    if not query and collection.name not in TIMESERIES_COLLECTIONS:
+        return await collection.estimated_document_count()
+
+    key = (collection.name, json_util.dumps(query, sort_keys=True))
+    cached = _count_cache.get(key)
+    now = time.monotonic()
+    if cached and cached[0] > now:
+        return cached[1]
+    total = await collection.count_documents(query)
+    if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    _count_cache[key] = (now + COUNT_CACHE_TTL, total)
+    return total
@@ -0,0 +1,257 @@
+# backend/utils/query_cache.py
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from common.metrics import Counter, Gauge
+
+from ..database import db
+from .device_state import DEVICE_STATE_COLLECTION
+
+# memory (per worker), sqlite (shared by the workers on one host via QUERY_CACHE_PATH) or none
+QUERY_CACHE_BACKEND = os.getenv("QUERY_CACHE_BACKEND", "memory")
+# Upper bound on staleness when ingest versions are not advancing (e.g. device state disabled)
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "10"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024"))
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH", "/tmp/scmlite-query-cache.sqlite")
+# How often each worker re-reads the per-device ingest versions
+QUERY_CACHE_VERSION_TTL = float(os.getenv("QUERY_CACHE_VERSION_TTL", "1"))
+
+CACHE_REQUESTS = Counter("query_cache_requests_total", "Query cache lookups", ["result"])
+CACHE_EVICTIONS = Counter("query_cache_evictions_total", "Query cache entries evicted to stay within size")
+CACHE_ENTRIES = Gauge("query_cache_entries", "Entries in the query cache")
+
+
+class IngestVersions:
+    """
+    Per-device ingest versions from the device state collection.
+
+    The consumer bumps a device's version on every write that touches it, so
+    a cache key that includes the version stops matching as soon as new
+    readings land. Versions are re-read at most every QUERY_CACHE_VERSION_TTL
+    seconds; the collection has one small document per device.
+    """
+
+    def __init__(self, ttl: float = QUERY_CACHE_VERSION_TTL):
+        self.ttl = ttl
+        self._versions: Dict[int, int] = {}
+        self._total = 0
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _load(self) -> Dict[int, int]:
+        collection = db.get_collection(DEVICE_STATE_COLLECTION)
+        return {doc["_id"]: doc.get("version", 0) async for doc in collection.find({}, {"version": 1})}
+
+    async def get(self, device_id: Optional[int] = None) -> int:
+        """Version of one device, or of all devices together when `device_id` is None."""
+        if time.monotonic() >= self._expires:
+            async with self._lock:
+                # Another request may have refreshed while we waited
+                if time.monotonic() >= self._expires:
+                    self._versions = await self._load()
+                    self._total = sum(self._versions.values())
+                    self._expires = time.monotonic() + self.ttl
+        if device_id is None:
+            return self._total
+        return self._versions.get(device_id, 0)
+
+
+class MemoryResultStore:
+    """LRU of encoded results with a TTL, private to this worker."""
+
+    def __init__(self, ttl: float = QUERY_CACHE_TTL, max_entries: int = QUERY_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            del self._entries[key]
+            CACHE_ENTRIES.set(len(self._entries))
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: bytes):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            CACHE_EVICTIONS.inc()
+        CACHE_ENTRIES.set(len(self._entries))
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+    async def clear(self):
+        self._entries.clear()
+        CACHE_ENTRIES.set(0)
+
+
+class SqliteResultStore:
+    """
+    LRU of encoded results with a TTL in a SQLite file, shared by every worker on the host.
+
+    Put QUERY_CACHE_PATH on a tmpfs (e.g. /dev/shm) to keep it in memory.
+    Queries run in a worker thread so a busy file never blocks the event loop.
+    """
+
+    def __init__(self, path: str = QUERY_CACHE_PATH, ttl: float = QUERY_CACHE_TTL,
+                 max_entries: int = QUERY_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Evictions made by this worker
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def _get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now >= row[1]:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def _set(self, key: str, value: bytes):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now)
+            )
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if entries > self.max_entries:
+                # Expired entries go first, then the least recently used
+                evicted = self._conn.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY expires <= ? DESC, accessed LIMIT ?)",
+                    (now, entries - self.max_entries)
+                ).rowcount
+                self.evictions += evicted
+                CACHE_EVICTIONS.inc(evicted)
+                entries -= evicted
+        CACHE_ENTRIES.set(entries)
+
+    def _size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes):
+        await asyncio.to_thread(self._set, key, value)
+
+    async def size(self) -> int:
+        return await asyncio.to_thread(self._size)
+
+    async def clear(self):
+        await asyncio.to_thread(self._clear)
+        CACHE_ENTRIES.set(0)
+
+
+STORES = {
+    "memory": MemoryResultStore,
+    "sqlite": SqliteResultStore,
+    "none": None,
+}
+
+if QUERY_CACHE_BACKEND not in STORES:
+    raise ValueError(f"QUERY_CACHE_BACKEND must be one of {sorted(STORES)}")
+
+
+def cache_key(route: str, version: int, *parts: Any) -> str:
+    """Key for one route's result at an ingest version; `parts` are the query parameters."""
+    return ":".join([route, f"v{version}", *("" if part is None else str(part) for part in parts)])
+
+
+class QueryCache:
+    """
+    Read-through cache of encoded query results with single-flight loading.
+
+    Concurrent misses on the same key share one load, which runs as its own
+    task so a disconnecting client doesn't cancel it for the others. Results
+    are only stored when the load succeeds, so errors are never cached.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[bytes]]) -> bytes:
+        if self.store is None:
+            return await load()
+
+        value = await self.store.get(key)
+        if value is not None:
+            self.hits += 1
+            CACHE_REQUESTS.labels("hit").inc()
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels("miss").inc()
+            task = self._inflight[key] = asyncio.ensure_future(self._load(key, load))
+        else:
+            self.coalesced += 1
+            CACHE_REQUESTS.labels("coalesced").inc()
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, load: Callable[[], Awaitable[bytes]]) -> bytes:
+        try:
+            value = await load()
+            await self.store.set(key, value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "backend": QUERY_CACHE_BACKEND,
+            "entries": await self.store.size() if self.store is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.store.evictions if self.store is not None else 0,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+        }
+
+    async def clear(self):
+        if self.store is not None:
+            await self.store.clear()
+
+
+ingest_versions = IngestVersions()
+_store_class = STORES[QUERY_CACHE_BACKEND]
+query_cache = QueryCache(_store_class() if _store_class is not None else None)
@@ -0,0 +1,135 @@
+# backend/utils/recaptcha.py
+import asyncio
+import os
+import time
+from typing import Optional
+
+import httpx
+from fastapi import HTTPException, status
+
+from common.metrics import Counter, Histogram
+
+RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY")
+# Point at a local stub server in tests and benchmarks
+RECAPTCHA_VERIFY_URL = os.getenv("RECAPTCHA_VERIFY_URL", "https://www.google.com/recaptcha/api/siteverify")
+# http (siteverify at RECAPTCHA_VERIFY_URL) or none (accept every token); defaults to none without a secret
+RECAPTCHA_VERIFIER = os.getenv("RECAPTCHA_VERIFIER", "http" if RECAPTCHA_SECRET_KEY else "none")
+RECAPTCHA_CONNECT_TIMEOUT = float(os.getenv("RECAPTCHA_CONNECT_TIMEOUT", "2"))
+RECAPTCHA_READ_TIMEOUT = float(os.getenv("RECAPTCHA_READ_TIMEOUT", "3"))
+# Consecutive failures that open the circuit, and how long it stays open
+RECAPTCHA_FAILURE_THRESHOLD = int(os.getenv("RECAPTCHA_FAILURE_THRESHOLD", "5"))
+RECAPTCHA_OPEN_SECONDS = float(os.getenv("RECAPTCHA_OPEN_SECONDS", "30"))
+
+VERIFICATIONS = Counter("recaptcha_verifications_total", "reCAPTCHA verifications", ["result"])
+VERIFY_SECONDS = Histogram("recaptcha_verify_seconds", "reCAPTCHA siteverify round trip")
+
+
+class RecaptchaVerifier:
+    """Accepts every token; subclasses check them."""
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def verify(self, token: str) -> bool:
+        VERIFICATIONS.labels("skipped").inc()
+        return True
+
+
+class HttpRecaptchaVerifier(RecaptchaVerifier):
+    """
+    Verifies tokens against siteverify over one pooled client for the app's lifetime.
+
+    Timeouts and transport errors count towards a circuit breaker; while it is
+    open, verification fails fast with 503 instead of waiting on the upstream.
+    Once the open window ends a single request probes the upstream: success
+    closes the circuit, failure re-opens it. Tokens are single-use, so every
+    one is verified; none are remembered.
+    """
+
+    def __init__(self, url: str = RECAPTCHA_VERIFY_URL, secret: Optional[str] = RECAPTCHA_SECRET_KEY):
+        self.url = url
+        self.secret = secret
+        self.client: Optional[httpx.AsyncClient] = None
+        self.failures = 0
+        self.open_until = 0.0
+        self._probing = False
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(RECAPTCHA_READ_TIMEOUT, connect=RECAPTCHA_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _unavailable(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="reCAPTCHA verification is unavailable, try again shortly",
+            headers={"Retry-After": str(int(RECAPTCHA_OPEN_SECONDS))},
+        )
+
+    async def verify(self, token: str) -> bool:
+        if not token:
+            VERIFICATIONS.labels("rejected").inc()
+            return False
+        probe = False
+        if self.failures >= RECAPTCHA_FAILURE_THRESHOLD:
+            # Open, or half-open with another request already probing
+            if time.monotonic() < self.open_until or self._probing:
+                VERIFICATIONS.labels("circuit_open").inc()
+                raise self._unavailable()
+            probe = self._probing = True
+
+        if self.client is None:
+            async with self._lock:
+                await self.start()
+        try:
+            with VERIFY_SECONDS.time():
+                response = await self.client.post(self.url, data={"secret": self.secret, "response": token})
+            response.raise_for_status()
+            success = bool(response.json().get("success", False))
+        except (httpx.HTTPError, ValueError) as e:
+            self.failures += 1
+            if self.failures >= RECAPTCHA_FAILURE_THRESHOLD:
+                self.open_until = time.monotonic() + RECAPTCHA_OPEN_SECONDS
+                print(f"reCAPTCHA verification failing ({e}); failing fast for {RECAPTCHA_OPEN_SECONDS:.0f}s")
+            VERIFICATIONS.labels("error").inc()
+            raise self._unavailable()
+        finally:
+            if probe:
+                self._probing = False
+
+        self.failures = 0
+        VERIFICATIONS.labels("verified" if success else "rejected").inc()
+        return success
+
+
+VERIFIERS = {
+    "http": HttpRecaptchaVerifier,
+    "none": RecaptchaVerifier,
+}
+
+if RECAPTCHA_VERIFIER not in VERIFIERS:
+    raise ValueError(f"RECAPTCHA_VERIFIER must be one of {sorted(VERIFIERS)}")
+
+recaptcha_verifier: RecaptchaVerifier = VERIFIERS[RECAPTCHA_VERIFIER]()
+
+
+def set_verifier(verifier: RecaptchaVerifier):
+    """Swap in another verifier, e.g. a stub in tests."""
+    global recaptcha_verifier
+    recaptcha_verifier = verifier
+
+
+async def verify_recaptcha(token: str) -> bool:
+    """Whether `token` passes reCAPTCHA; raises 503 while the upstream is unavailable."""
+    return await recaptcha_verifier.verify(token)
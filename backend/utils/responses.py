@@ -0,0 +1,54 @@
+# backend/utils/responses.py
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # falls back to the standard library encoder
+    orjson = None
+
+# Pipeline bookkeeping stored on each reading that the API doesn't return
+READING_BOOKKEEPING_FIELDS = ("trace", "ingest_key")
+READING_PROJECTION = {field: 0 for field in READING_BOOKKEEPING_FIELDS}
+
+
+def public_reading(reading: Dict[str, Any]) -> Dict[str, Any]:
+    """A copy of a stored reading without its pipeline bookkeeping, as READING_PROJECTION returns it."""
+    return {k: v for k, v in reading.items() if k not in READING_BOOKKEEPING_FIELDS}
+
+
+def _default(value: Any) -> Any:
+    """Encode the BSON and model types that Mongo documents carry."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON-encode Mongo documents as-is, without converting them item by item first."""
+    if orjson is not None:
+        # Non-str dict keys (e.g. enum members) are allowed, as with jsonable_encoder
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that encodes ObjectId and datetime natively.
+
+    Read-only routes return it directly, so FastAPI skips validating the
+    content against the response_model and running jsonable_encoder over every
+    item; the response_model still documents the shape in OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
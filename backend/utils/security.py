@@ -1,5 +1,11 @@
 # backend/utils/security.py
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set, Tuple
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -9,21 +15,83 @@ from passlib.context import CryptContext
 
 from pathlib import Path
 
+from common.metrics import Counter, Gauge, Histogram
+from ..database import db
+
 env_path = Path(__file__).resolve().parent.parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
 # Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with any other work factor are upgraded on the user's next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt runs on this many threads (it releases the GIL), never on the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashes allowed to wait for a thread before new ones get 503 (0: unbounded)
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+HASH_PENDING = Gauge("password_hash_pending", "Password hashes queued or running")
+HASH_REJECTED = Counter("password_hash_rejected_total", "Password hashes refused because the queue was full")
+HASH_QUEUE_SECONDS = Histogram("password_hash_queue_seconds", "Time a password hash waits for a thread", ["operation"])
+HASH_SECONDS = Histogram("password_hash_seconds", "Time spent hashing a password", ["operation"])
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so logins don't stall other requests."""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+    async def run(self, operation: str, func, *args):
+        if self.max_queue and self.pending >= self.workers + self.max_queue:
+            HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many logins in progress, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        queued = time.perf_counter()
+
+        def timed():
+            HASH_QUEUE_SECONDS.labels(operation).observe(time.perf_counter() - queued)
+            with HASH_SECONDS.labels(operation).time():
+                return func(*args)
+
+        self.pending += 1
+        HASH_PENDING.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self.pending -= 1
+            HASH_PENDING.dec()
+
 
+password_hasher = PasswordHasher()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hasher.run("verify", pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a new hash when the stored one uses another work factor."""
+    return await password_hasher.run("verify", pwd_context.verify_and_update, plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Generate a password hash."""
-    return pwd_context.hash(password)
+    return await password_hasher.run("hash", pwd_context.hash, password)
 
 
 # JWT Configuration
@@ -40,6 +108,17 @@ REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 ADMIN_MAIL = os.getenv("ADMIN_MAIL", "")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "")
 
+# Verified token claims kept per worker, each until its token's exp
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+# Cache lifetime for tokens that carry no exp claim
+TOKEN_CACHE_MAX_TTL = float(os.getenv("TOKEN_CACHE_MAX_TTL", "300"))
+# Subjects (user ids) whose outstanding tokens are rejected, shared across workers
+REVOKED_SUBJECTS_COLLECTION = os.getenv("REVOKED_SUBJECTS_COLLECTION", "revoked_subjects")
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "5"))
+
+TOKEN_CACHE_LOOKUPS = Counter("auth_token_cache_total", "Access token cache lookups", ["result"])
+TOKEN_CACHE_ENTRIES = Gauge("auth_token_cache_entries", "Verified tokens cached by this worker")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
@@ -53,8 +132,96 @@ def create_access_token(
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
-    """Get the current authenticated user from the JWT token."""
+def _token_key(token: str) -> bytes:
+    # Digest, so the cache never holds usable credentials
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache:
+    """LRU of verified token claims keyed by token digest, each entry expiring at the token's exp."""
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE, max_ttl: float = TOKEN_CACHE_MAX_TTL):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            TOKEN_CACHE_LOOKUPS.labels("miss").inc()
+            return None
+        claims, expires = entry
+        if time.time() >= expires:
+            del self._entries[key]
+            TOKEN_CACHE_ENTRIES.set(len(self._entries))
+            TOKEN_CACHE_LOOKUPS.labels("expired").inc()
+            return None
+        self._entries.move_to_end(key)
+        TOKEN_CACHE_LOOKUPS.labels("hit").inc()
+        return claims
+
+    def put(self, key: bytes, claims: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        exp = claims.get("exp")
+        expires = float(exp) if isinstance(exp, (int, float)) else time.time() + self.max_ttl
+        self._entries[key] = (claims, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        TOKEN_CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self):
+        self._entries.clear()
+        TOKEN_CACHE_ENTRIES.set(0)
+
+
+class RevokedSubjects:
+    """Users whose tokens are no longer accepted, mirrored from MongoDB every few seconds."""
+
+    def __init__(self, refresh_seconds: float = REVOCATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._subjects: Set[str] = set()
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+
+    def __contains__(self, subject: Any) -> bool:
+        return subject in self._subjects
+
+    async def ensure_indexes(self):
+        # Outstanding tokens are all expired once the longest token lifetime has passed
+        await db.create_index(REVOKED_SUBJECTS_COLLECTION, "expires_at", expireAfterSeconds=0)
+
+    async def refresh(self):
+        """Reload the revoked subjects if the local copy is older than refresh_seconds."""
+        if time.monotonic() < self._expires:
+            return
+        async with self._lock:
+            # Another request may have refreshed while we waited
+            if time.monotonic() < self._expires:
+                return
+            collection = db.get_collection(REVOKED_SUBJECTS_COLLECTION)
+            self._subjects = {doc["_id"] async for doc in collection.find({}, {"_id": 1})}
+            self._expires = time.monotonic() + self.refresh_seconds
+
+    async def revoke(self, subject: str):
+        """Reject every outstanding token for `subject`, in this worker at once and in others after a refresh."""
+        self._subjects.add(subject)
+        now = datetime.now(timezone.utc)
+        lifetime = max(timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES), timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+        await db.get_collection(REVOKED_SUBJECTS_COLLECTION).update_one(
+            {"_id": subject},
+            {"$set": {"revoked_at": now, "expires_at": now + lifetime}},
+            upsert=True,
+        )
+
+
+token_cache = TokenCache()
+revoked_subjects = RevokedSubjects()
+
+
+def decode_access_token(token: str) -> dict:
+    """Validate a JWT access token and return its claims; raises 401 if invalid."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -64,24 +231,28 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     if not token or token.lower() in ("null", "undefined", "none"):
         raise credentials_exception
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-
-        # Check if token has expired (jwt.decode already validates exp, but we double-check)
-        exp = payload.get("exp")
-        if exp:
-            exp_datetime = datetime.fromtimestamp(exp, tz=timezone.utc)
-            if datetime.now(timezone.utc) >= exp_datetime:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token has expired",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-
-        return payload
-    except JWTError:
+    key = _token_key(token)
+    payload = token_cache.get(key)
+    if payload is None:
+        try:
+            # Verifies the signature and exp
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise credentials_exception
+        token_cache.put(key, payload)
+
+    if payload.get("sub") in revoked_subjects:
         raise credentials_exception
 
+    # Callers get their own copy of the cached claims
+    return dict(payload)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+    """Get the current authenticated user from the JWT token."""
+    await revoked_subjects.refresh()
+    return decode_access_token(token)
+
 
 def is_admin(user: dict) -> bool:
     """Check if the current user is an admin."""
@@ -0,0 +1,164 @@
+# backend/utils/shipment_import.py
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# CSV headers are ShipmentBase field names; route.<field> columns fill the nested
+# route and list columns are split on LIST_SEPARATOR
+LIST_COLUMNS = {"serial_numbers", "route.waypoints"}
+LIST_SEPARATOR = ";"
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+}
+
+# Longest line or CSV record accepted, in characters; longer ones become row errors
+MAX_RECORD_CHARS = 64 * 1024
+
+# (row number, parsed record or None, parse error or None)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """csv or ndjson from a Content-Type header, ignoring parameters."""
+    if not content_type:
+        return None
+    return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+async def _decoded(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    async for chunk in chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+async def _lines(chunks: AsyncIterator[bytes], max_chars: int = MAX_RECORD_CHARS) -> AsyncIterator[Optional[str]]:
+    """
+    Decode a byte stream into lines (with their newline).
+
+    Each chunk is scanned once and at most `max_chars` of a partial line are
+    held. A longer line is dropped up to its newline and yielded as None.
+    """
+    parts: List[str] = []
+    size = 0
+    oversized = False
+    async for text in _decoded(chunks):
+        start = 0
+        # Only \n ends a line; \r, U+2028 etc. may appear inside NDJSON strings and CSV fields
+        newline = text.find("\n")
+        while newline >= 0:
+            if oversized or size + newline + 1 - start > max_chars:
+                yield None
+            else:
+                parts.append(text[start:newline + 1])
+                yield "".join(parts)
+            parts, size, oversized = [], 0, False
+            start = newline + 1
+            newline = text.find("\n", start)
+        if start < len(text) and not oversized:
+            size += len(text) - start
+            if size > max_chars:
+                parts, oversized = [], True
+            else:
+                parts.append(text[start:])
+    if oversized:
+        yield None
+    elif parts:
+        yield "".join(parts)
+
+
+def csv_record(row: Dict[str, str]) -> Dict[str, Any]:
+    """Nest a flat CSV row into the ShipmentBase layout; empty cells are left out."""
+    record: Dict[str, Any] = {}
+    for column, value in row.items():
+        if column is None or value is None or value.strip() == "":
+            continue
+        value = value.strip()
+        if column in LIST_COLUMNS:
+            value = [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+        if column.startswith("route."):
+            record.setdefault("route", {})[column[len("route."):]] = value
+        else:
+            record[column] = value
+    return record
+
+
+async def _csv_rows(lines: AsyncIterator[Optional[str]], max_chars: int = MAX_RECORD_CHARS) -> AsyncIterator[ParsedRow]:
+    header: Optional[List[str]] = None
+    row_number = 0
+    record_lines: List[str] = []
+    record_size = 0
+    quotes = 0
+    async for line in lines:
+        if line is not None:
+            record_size += len(line)
+        if line is None or record_size > max_chars:
+            # Drop the record; the next line starts a new one
+            record_lines, record_size, quotes = [], 0, 0
+            if header is None:
+                yield 0, None, f"header exceeds {max_chars} characters"
+                return
+            row_number += 1
+            yield row_number, None, f"record exceeds {max_chars} characters"
+            continue
+        # A quoted field may span lines; a record is complete once its quotes balance
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "".join(record_lines)
+        record_lines, record_size, quotes = [], 0, 0
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row_number, csv_record(dict(zip(header, values))), None
+    if record_lines:
+        yield row_number + 1, None, "unterminated quoted field"
+
+
+async def _ndjson_rows(lines: AsyncIterator[Optional[str]], max_chars: int = MAX_RECORD_CHARS) -> AsyncIterator[ParsedRow]:
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if line is None:
+            yield line_number, None, f"line exceeds {max_chars} characters"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "not a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def parse_rows(chunks: AsyncIterator[bytes], fmt: str, max_chars: int = MAX_RECORD_CHARS) -> AsyncIterator[ParsedRow]:
+    """
+    Stream (row, record, error) from an uploaded CSV or NDJSON body.
+
+    Rows are numbered by data record for CSV (the header is not counted) and
+    by line for NDJSON. Only the current record is held in memory, and
+    records over `max_chars` are reported as row errors.
+    """
+    lines = _lines(chunks, max_chars)
+    if fmt == "csv":
+        return _csv_rows(lines, max_chars)
+    return _ndjson_rows(lines, max_chars)
@@ -0,0 +1,124 @@
+"""Closed-loop HTTP load generator for the FastAPI backend.
+
+Runs N concurrent clients against each endpoint for a fixed duration and
+reports requests/s and p50/p95/p99 latency, so the same command can be run
+before and after a change:
+
+    python benchmarks/api_bench.py --url http://localhost:8000 \\
+        --concurrency 50 100 250 500 --duration 15 --output results.json
+
+A bearer token is taken from --token / BENCH_TOKEN, or minted locally when
+JWT_SECRET is set (same secret as the backend).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+DEFAULT_ENDPOINTS = [
+    "/data/all?page=1&limit=100",
+    "/data/device/1150?page=1&limit=100",
+    "/data/latest",
+    "/shipments/all",
+]
+
+
+def mint_token(email):
+    """Create a short-lived token signed with JWT_SECRET."""
+    from jose import jwt
+
+    now = datetime.now(timezone.utc)
+    claims = {"sub": "benchmark", "email": email, "is_admin": False,
+              "iat": now, "exp": now + timedelta(hours=1)}
+    return jwt.encode(claims, os.environ["JWT_SECRET"], algorithm="HS256")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_level(client, endpoint, concurrency, duration):
+    """Run `concurrency` closed-loop workers against `endpoint` for `duration` seconds."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get(endpoint)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def main_async(args):
+    token = args.token or os.getenv("BENCH_TOKEN")
+    if not token and os.getenv("JWT_SECRET"):
+        token = mint_token(args.email)
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    results = []
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=args.timeout) as client:
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                result = await run_level(client, endpoint, concurrency, args.duration)
+                results.append(result)
+                print(f"{endpoint:<40} c={concurrency:<4} {result['requests_per_sec']:>9.1f} req/s  "
+                      f"p50={result['p50_ms']:>8.2f}ms  p99={result['p99_ms']:>8.2f}ms  errors={result['errors']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--endpoints", nargs="+", default=DEFAULT_ENDPOINTS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 100, 250, 500])
+    parser.add_argument("--duration", type=float, default=15, help="seconds per endpoint and concurrency level")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--token", help="bearer token (default: BENCH_TOKEN or minted from JWT_SECRET)")
+    parser.add_argument("--email", default="bench@example.com", help="email claim for a minted token")
+    parser.add_argument("--label", default="", help="free-form label stored with the results, e.g. a commit")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"label": args.label, "url": args.url, "results": results}, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Chaos test for exactly-once results: kill the consumer mid-batch, then verify MongoDB.
+
+Preloads a fresh topic, runs consumer/consumer.py against it and SIGKILLs
+the whole worker process group at random points (mid-batch, with batches in
+flight and offsets uncommitted) several times, then lets a final run drain
+the topic. Every record must be stored exactly once:
+
+    python benchmarks/consumer_chaos_bench.py --bootstrap-servers localhost:9092 \\
+        --mongo-uri mongodb://localhost:27017 --messages 200000 --kills 8
+
+Exits non-zero if any reading is missing or duplicated.
+"""
+import argparse
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from kafka.admin import KafkaAdminClient
+from pymongo import MongoClient
+
+from consumer_scaling_bench import committed, preload
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "producer"))
+from topics import ensure_topic  # noqa: E402
+
+
+def start_consumer(args, env):
+    # Own session, so a kill reaches every worker process
+    return subprocess.Popen(
+        [sys.executable, "consumer.py"], cwd=ROOT / "consumer", env=env, start_new_session=True,
+        stdout=subprocess.DEVNULL if not args.verbose else None
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bootstrap-servers", default=os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092"))
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="scmlite_bench")
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--kills", type=int, default=8)
+    parser.add_argument("--kill-after", type=float, nargs=2, default=[2.0, 6.0],
+                        metavar=("MIN", "MAX"), help="seconds to run before each kill")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--verbose", action="store_true", help="show consumer output")
+    args = parser.parse_args()
+
+    bootstrap = args.bootstrap_servers.split(",")
+    topic = f"chaos_{int(time.time())}"
+    collection_name = f"{topic}_readings"
+    ensure_topic(bootstrap, topic, args.partitions)
+    preload(bootstrap, topic, args.messages, args.devices)
+
+    env = dict(
+        os.environ,
+        KAFKA_BOOTSTRAP_SERVERS=args.bootstrap_servers,
+        KAFKA_TOPIC=topic,
+        MONGO_URI=args.mongo_uri,
+        DB_NAME=args.db,
+        COLLECTION_NAME=collection_name,
+        DEVICE_STATE_COLLECTION=f"{topic}_state",
+        CONSUMER_GROUP_ID=topic,
+        CONSUMER_WORKERS=str(args.workers),
+        BATCH_SIZE=str(args.batch_size),
+        MAX_IN_FLIGHT_BATCHES="4",
+        IDEMPOTENT_WRITES="true",
+    )
+    admin = KafkaAdminClient(bootstrap_servers=bootstrap)
+
+    for kill in range(1, args.kills + 1):
+        process = start_consumer(args, env)
+        time.sleep(random.uniform(*args.kill_after))
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+        print(f"kill {kill}/{args.kills}: committed {committed(admin, topic)}/{args.messages}", file=sys.stderr)
+
+    process = start_consumer(args, env)
+    deadline = time.monotonic() + args.timeout
+    while committed(admin, topic) < args.messages and time.monotonic() < deadline:
+        time.sleep(0.5)
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait(timeout=60)
+    admin.close()
+
+    client = MongoClient(args.mongo_uri)
+    collection = client[args.db][collection_name]
+    stored = collection.count_documents({})
+    distinct = next(collection.aggregate([
+        {"$group": {"_id": "$ingest_key"}},
+        {"$count": "n"},
+    ], allowDiskUse=True), {"n": 0})["n"]
+    rollup_total = next(client[args.db][f"{collection_name}_rollup_1d"].aggregate([
+        {"$group": {"_id": None, "n": {"$sum": "$count"}}},
+    ]), {"n": 0})["n"]
+    client.close()
+
+    duplicates, missing = stored - distinct, args.messages - distinct
+    print(f"messages={args.messages} stored={stored} distinct={distinct} "
+          f"duplicates={duplicates} missing={missing} rollup_count={rollup_total}")
+    if duplicates or missing:
+        print("FAIL: readings were lost or duplicated")
+        sys.exit(1)
+    print("PASS: every reading stored exactly once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Consumer throughput as the number of workers grows.
+
+Preloads a fresh multi-partition topic with readings keyed by Device_ID, then
+for each worker count runs consumer/consumer.py with CONSUMER_WORKERS=N in its
+own consumer group and collection, and measures steady-state throughput from
+the group's committed offsets (between 5% and 95% of the messages, so startup
+and the initial rebalance are excluded):
+
+    python benchmarks/consumer_scaling_bench.py --bootstrap-servers localhost:9092 \\
+        --mongo-uri mongodb://localhost:27017 --partitions 8 --workers 1 2 4 8
+
+Scaling flattens once MongoDB, not the consumers, is the bottleneck; watch
+its CPU while the larger worker counts run.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from kafka import KafkaProducer
+from kafka.admin import KafkaAdminClient
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "producer"))
+from topics import ensure_topic  # noqa: E402
+
+
+def preload(bootstrap_servers, topic, messages, devices):
+    producer = KafkaProducer(
+        bootstrap_servers=bootstrap_servers,
+        value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+        key_serializer=lambda k: str(k).encode("utf-8"),
+        linger_ms=20,
+        batch_size=65536,
+    )
+    started = time.monotonic()
+    for i in range(messages):
+        device_id = 1000 + i % devices
+        producer.send(topic, key=device_id, value={
+            "Device_ID": device_id,
+            "Battery_Level": round(random.uniform(2.5, 4.2), 2),
+            "First_Sensor_temperature": round(random.gauss(20, 5), 1),
+            "Route_From": "Chennai, India",
+            "Route_To": "London, UK",
+        })
+    producer.flush()
+    producer.close()
+    print(f"Preloaded {messages} messages in {time.monotonic() - started:.1f}s", file=sys.stderr)
+
+
+def committed(admin, group_id):
+    offsets = admin.list_consumer_group_offsets(group_id)
+    return sum(max(0, meta.offset) for meta in offsets.values())
+
+
+def run(args, topic, workers):
+    group_id = f"{topic}-w{workers}"
+    env = dict(
+        os.environ,
+        KAFKA_BOOTSTRAP_SERVERS=args.bootstrap_servers,
+        KAFKA_TOPIC=topic,
+        MONGO_URI=args.mongo_uri,
+        DB_NAME=args.db,
+        COLLECTION_NAME=f"scaling_w{workers}",
+        DEVICE_STATE_COLLECTION=f"scaling_w{workers}_state",
+        CONSUMER_GROUP_ID=group_id,
+        CONSUMER_WORKERS=str(workers),
+        STATS_INTERVAL="3600",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "consumer.py"], cwd=ROOT / "consumer", env=env,
+        stdout=subprocess.DEVNULL if not args.verbose else None
+    )
+    admin = KafkaAdminClient(bootstrap_servers=args.bootstrap_servers)
+    low, high = int(args.messages * 0.05), int(args.messages * 0.95)
+    t_low = t_high = None
+    deadline = time.monotonic() + args.timeout
+    try:
+        while time.monotonic() < deadline:
+            done = committed(admin, group_id)
+            now = time.monotonic()
+            if t_low is None and done >= low:
+                t_low, done_low = now, done
+            if done >= high:
+                t_high, done_high = now, done
+                break
+            time.sleep(0.2)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+        admin.close()
+
+    if t_low is None or t_high is None or t_high <= t_low:
+        return {"workers": workers, "error": "timed out"}
+    return {"workers": workers, "msgs_per_sec": round((done_high - done_low) / (t_high - t_low), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bootstrap-servers", default=os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092"))
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="scmlite_bench")
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--timeout", type=float, default=900, help="seconds allowed per worker count")
+    parser.add_argument("--verbose", action="store_true", help="show consumer output")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    topic = f"scaling_bench_{int(time.time())}"
+    ensure_topic(args.bootstrap_servers.split(","), topic, args.partitions)
+    preload(args.bootstrap_servers.split(","), topic, args.messages, args.devices)
+
+    results = []
+    for workers in args.workers:
+        result = run(args, topic, workers)
+        if results and "msgs_per_sec" in result and "msgs_per_sec" in results[0]:
+            speedup = result["msgs_per_sec"] / results[0]["msgs_per_sec"]
+            result["speedup"] = round(speedup, 2)
+            result["efficiency"] = round(speedup * results[0]["workers"] / workers, 2)
+        print(json.dumps(result), file=sys.stderr)
+        results.append(result)
+
+    summary = {"topic": topic, "partitions": args.partitions, "messages": args.messages, "results": results}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
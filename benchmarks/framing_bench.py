@@ -0,0 +1,118 @@
+"""Microbenchmark: producer/framing.py decoders vs. the original str-buffer loop.
+
+Replays a pre-encoded socket_server stream in BUFFER_SIZE chunks, the way
+recv() delivers it, and reports messages/s for each framing.
+
+    python benchmarks/framing_bench.py [--counts 10000 100000 1000000] [--chunk 4096]
+
+100,000 messages on Python 3.11, best of 5, in msgs/s (timings vary by about
+20% between runs on a shared host):
+
+    decoder                  --chunk 4096   --chunk 65536
+    legacy str loop               193,000         151,000
+    JSONStreamDecoder             290,000         445,000
+    NewlineDecoder                439,000         463,000
+    LengthPrefixedDecoder         352,000         384,000
+"""
+import argparse
+import gc
+import json
+import random
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "producer"))
+from framing import make_decoder  # noqa: E402
+
+ROUTES = ['Newyork,USA', 'Chennai, India', 'Bengaluru, India', 'London,UK']
+
+
+def sample_messages(count):
+    rng = random.Random(42)
+    for _ in range(count):
+        yield {
+            "Battery_Level": round(rng.uniform(2.00, 5.00), 2),
+            "Device_ID": rng.randint(1150, 1158),
+            "First_Sensor_temperature": round(rng.uniform(10, 40.0), 1),
+            "Route_From": rng.choice(ROUTES),
+            "Route_To": rng.choice(ROUTES),
+        }
+
+
+def encode(messages, framing):
+    if framing == 'json':
+        return b''.join(json.dumps(m, indent=1).encode('utf-8') for m in messages)
+    if framing == 'ndjson':
+        return b''.join(json.dumps(m).encode('utf-8') + b'\n' for m in messages)
+    parts = []
+    for m in messages:
+        payload = json.dumps(m).encode('utf-8')
+        parts.append(struct.pack('>I', len(payload)) + payload)
+    return b''.join(parts)
+
+
+def legacy_loop(chunks):
+    """The original producer loop: str buffer, split on the first '}'."""
+    count = 0
+    buffer = ""
+    for data in chunks:
+        buffer += data.decode('utf-8')
+        while '}' in buffer:
+            json_str, _, buffer = buffer.partition('}')
+            json.loads(json_str + '}')
+            count += 1
+    return count
+
+
+def decoder_loop(chunks, framing, chunk_size):
+    count = 0
+    decoder = make_decoder(framing, chunk_size)
+    for data in chunks:
+        decoder.feed(data)
+        for _ in decoder.messages():
+            count += 1
+    return count
+
+
+def run(count, chunk_size, repeat=3):
+    messages = list(sample_messages(count))
+    results = []
+    for name, framing, fn in [
+        ("legacy str loop", 'json', lambda c: legacy_loop(c)),
+        ("JSONStreamDecoder", 'json', lambda c: decoder_loop(c, 'json', chunk_size)),
+        ("NewlineDecoder", 'ndjson', lambda c: decoder_loop(c, 'ndjson', chunk_size)),
+        ("LengthPrefixedDecoder", 'length', lambda c: decoder_loop(c, 'length', chunk_size)),
+    ]:
+        stream = encode(messages, framing)
+        chunks = [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+        best = float('inf')
+        gc.disable()
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                decoded = fn(chunks)
+                best = min(best, time.perf_counter() - start)
+                assert decoded == count, f"{name} decoded {decoded}/{count}"
+        finally:
+            gc.enable()
+        results.append((name, best))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--chunk', type=int, default=4096, help="recv() chunk size in bytes")
+    parser.add_argument('--repeat', type=int, default=3, help="best-of-N timing")
+    args = parser.parse_args()
+
+    print(f"{'messages':>10}  {'decoder':<22} {'seconds':>9} {'msgs/s':>12}")
+    for count in args.counts:
+        for name, elapsed in run(count, args.chunk, args.repeat):
+            print(f"{count:>10}  {name:<22} {elapsed:>9.3f} {count / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Telemetry read latency with and without a concurrent burst of logins.
+
+Runs closed-loop readers against a /data endpoint twice: alone, then while
+a second set of clients logs in as fast as it can. With bcrypt on the event
+loop the second run's p99 grows by the hash cost times the burst size; with
+hashing offloaded it should stay close to the first:
+
+    python benchmarks/login_burst_bench.py --url http://localhost:8000 \\
+        --email bench@example.com --password bench-password --logins 50 --duration 15
+
+The login user is created through /auth/signup if it does not exist yet.
+The readers' bearer token comes from --token / BENCH_TOKEN, is minted from
+JWT_SECRET as in api_bench.py, or else is obtained by logging in once.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+
+from api_bench import mint_token, percentile, run_level
+
+
+async def login_burst(client, args, deadline):
+    """Log in from `args.logins` concurrent clients until `deadline`; returns latency stats."""
+    latencies = []
+    statuses = {}
+    body = {"email": args.email, "password": args.password, "recaptcha_token": args.recaptcha_token}
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/auth/login", json=body)
+                status = str(response.status_code)
+            except httpx.HTTPError:
+                status = "error"
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(args.logins)))
+    latencies.sort()
+    return {
+        "logins": len(latencies),
+        "statuses": statuses,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def main_async(args):
+    token = args.token or os.getenv("BENCH_TOKEN")
+    if not token and os.getenv("JWT_SECRET"):
+        token = mint_token(args.email)
+    limits = httpx.Limits(max_connections=args.concurrency + args.logins)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        await client.post("/auth/signup", json={
+            "email": args.email, "password": args.password,
+            "full_name": "Benchmark", "recaptcha_token": args.recaptcha_token,
+        })
+        if not token:
+            response = await client.post("/auth/login", json={
+                "email": args.email, "password": args.password, "recaptcha_token": args.recaptcha_token,
+            })
+            response.raise_for_status()
+            token = response.json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        baseline = await run_level(client, args.endpoint, args.concurrency, args.duration)
+        print(f"reads alone:        p50={baseline['p50_ms']:>8.2f}ms  p99={baseline['p99_ms']:>8.2f}ms", file=sys.stderr)
+
+        login_client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout)
+        async with login_client:
+            deadline = time.perf_counter() + args.duration
+            during, logins = await asyncio.gather(
+                run_level(client, args.endpoint, args.concurrency, args.duration),
+                login_burst(login_client, args, deadline),
+            )
+        print(f"reads under logins: p50={during['p50_ms']:>8.2f}ms  p99={during['p99_ms']:>8.2f}ms", file=sys.stderr)
+        print(f"logins:             p50={logins['p50_ms']:>8.2f}ms  p99={logins['p99_ms']:>8.2f}ms  "
+              f"{logins['logins']} total {logins['statuses']}", file=sys.stderr)
+
+    return {
+        "endpoint": args.endpoint,
+        "reads_alone": baseline,
+        "reads_during_logins": during,
+        "logins": logins,
+        "p99_inflation": round(during["p99_ms"] / baseline["p99_ms"], 2) if baseline["p99_ms"] else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--endpoint", default="/data/latest")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent readers")
+    parser.add_argument("--logins", type=int, default=50, help="concurrent login clients during the burst")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per phase")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--email", default="bench@example.com")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--recaptcha-token", default="bench")
+    parser.add_argument("--token", help="bearer token for the readers (default: BENCH_TOKEN, minted, or from a login)")
+    parser.add_argument("--label", default="", help="free-form label stored with the results, e.g. a commit")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"label": args.label, "url": args.url, **result}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
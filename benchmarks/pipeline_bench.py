@@ -0,0 +1,423 @@
+"""End-to-end throughput benchmark of the whole pipeline on one machine.
+
+Starts socket_server/server.py, producer/producer.py, consumer/consumer.py
+and the FastAPI backend as subprocesses against a local Kafka broker and
+MongoDB, drives each load profile through them and records:
+
+- sustained ingest (readings stored/s after warm-up) and consumer lag,
+  scraped from the services' /metrics
+- API p50/p99 for the dashboard endpoints while ingest is running
+- CPU (cores used) and peak RSS per service, when psutil is installed
+
+Each profile gets its own topic, database and consumer group. The services
+are separate processes, so the local stand-ins must speak the real wire
+protocols; docker-compose.bench.yml starts a throwaway broker and mongod:
+
+    docker compose -f benchmarks/docker-compose.bench.yml up -d
+    python benchmarks/pipeline_bench.py --profiles steady burst --duration 60 \\
+        --label "$(git rev-parse --short HEAD)" --output pipeline-before.json
+
+Compare two result files, e.g. before and after a change:
+
+    python benchmarks/pipeline_bench.py --compare pipeline-before.json pipeline-after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from api_bench import mint_token, run_level
+
+try:
+    import psutil
+except ImportError:  # CPU/RSS are left out of the results
+    psutil = None
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Socket server settings per load profile; FRAMING is shared with the producer
+PROFILES = {
+    "idle": {"DEVICE_COUNT": "9", "MESSAGE_RATE": "10"},
+    "steady": {"DEVICE_COUNT": "100", "MESSAGE_RATE": "1000"},
+    "burst": {"DEVICE_COUNT": "100", "MESSAGE_RATE": "1000",
+              "BURST_FACTOR": "5", "BURST_EVERY": "20", "BURST_DURATION": "5", "JITTER": "0.2"},
+    "high": {"DEVICE_COUNT": "1000", "MESSAGE_RATE": "10000", "FRAMING": "ndjson"},
+}
+
+DEFAULT_ENDPOINTS = [
+    "/data/all?page=1&limit=100",
+    "/data/device/1150?page=1&limit=100",
+    "/data/latest",
+    "/shipments/all",
+]
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{[^}]*\})?\s+(\S+)$')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_metrics(text):
+    """Sum the samples of each metric name in a Prometheus text exposition."""
+    totals = {}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if match:
+            name, value = match.groups()
+            totals[name] = totals.get(name, 0.0) + float(value)
+    return totals
+
+
+class Service:
+    """One pipeline process, with the /metrics URLs it exposes."""
+
+    def __init__(self, name, command, cwd, env, metrics_urls=(), verbose=False):
+        self.name = name
+        self.metrics_urls = list(metrics_urls)
+        output = None if verbose else subprocess.DEVNULL
+        self.process = subprocess.Popen(command, cwd=cwd, env=env, stdout=output, stderr=output)
+        self._cpu_started = None
+        self._wall_started = None
+        self.rss_peak = 0
+
+    def _processes(self):
+        parent = psutil.Process(self.process.pid)
+        return [parent] + parent.children(recursive=True)
+
+    def _cpu_seconds(self):
+        total = 0.0
+        for process in self._processes():
+            try:
+                times = process.cpu_times()
+                total += times.user + times.system
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    def start_usage(self):
+        if psutil:
+            self._cpu_started, self._wall_started = self._cpu_seconds(), time.monotonic()
+
+    def sample_usage(self):
+        if not psutil:
+            return
+        rss = 0
+        for process in self._processes():
+            try:
+                rss += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        self.rss_peak = max(self.rss_peak, rss)
+
+    def usage(self):
+        if not psutil or self._cpu_started is None:
+            return {}
+        elapsed = time.monotonic() - self._wall_started
+        return {
+            "cpu_cores": round((self._cpu_seconds() - self._cpu_started) / elapsed, 3),
+            "rss_peak_mb": round(self.rss_peak / 2 ** 20, 1),
+        }
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+async def scrape(client, service):
+    """Metric totals across every /metrics URL of a service."""
+    totals = {}
+    for url in service.metrics_urls:
+        try:
+            response = await client.get(url)
+        except httpx.HTTPError:
+            continue
+        for name, value in parse_metrics(response.text).items():
+            totals[name] = totals.get(name, 0.0) + value
+    return totals
+
+
+async def wait_until(check, timeout, what):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if await check():
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Timed out waiting for {what}")
+
+
+def start_services(args, profile, run_id, build_dir):
+    """Start backend, consumer, socket server and producer for one profile."""
+    settings = PROFILES[profile]
+    ports = {name: free_port() for name in ("socket", "backend", "socket_metrics", "producer_metrics")}
+    consumer_metrics = free_port()
+    base = dict(
+        os.environ,
+        KAFKA_BOOTSTRAP_SERVERS=args.bootstrap_servers,
+        KAFKA_TOPIC=run_id,
+        MONGO_URI=args.mongo_uri,
+        DB_NAME=run_id,
+        FRAMING="json",
+        JWT_SECRET=args.jwt_secret,
+        STATS_INTERVAL="3600",
+        PYTHONUNBUFFERED="1",
+    )
+    base.update(settings)
+    services = {}
+    services["backend"] = Service(
+        "backend",
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+         "--port", str(ports["backend"]), "--workers", str(args.backend_workers), "--log-level", "warning"],
+        # The app serves ./build, so it runs from a directory that has one
+        cwd=build_dir, env=dict(base, PYTHONPATH=str(ROOT), LIVE_STREAM_SOURCE="kafka"),
+        verbose=args.verbose,
+    )
+    services["consumer"] = Service(
+        "consumer", [sys.executable, "consumer.py"], cwd=ROOT / "consumer",
+        env=dict(base, CONSUMER_GROUP_ID=run_id, CONSUMER_WORKERS=str(args.workers),
+                 METRICS_PORT=str(consumer_metrics)),
+        # Worker N listens on METRICS_PORT + N
+        metrics_urls=[f"http://127.0.0.1:{consumer_metrics + i}/metrics" for i in range(args.workers)],
+        verbose=args.verbose,
+    )
+    services["socket_server"] = Service(
+        "socket_server", [sys.executable, "server.py"], cwd=ROOT / "socket_server",
+        env=dict(base, SOCKET_HOST="127.0.0.1", SOCKET_PORT=str(ports["socket"]),
+                 METRICS_PORT=str(ports["socket_metrics"])),
+        metrics_urls=[f"http://127.0.0.1:{ports['socket_metrics']}/metrics"],
+        verbose=args.verbose,
+    )
+    services["producer"] = Service(
+        "producer", [sys.executable, "producer.py"], cwd=ROOT / "producer",
+        env=dict(base, SOCKET_SERVER="127.0.0.1", SOCKET_PORT=str(ports["socket"]),
+                 KAFKA_TOPIC_PARTITIONS=str(args.partitions), METRICS_PORT=str(ports["producer_metrics"])),
+        metrics_urls=[f"http://127.0.0.1:{ports['producer_metrics']}/metrics"],
+        verbose=args.verbose,
+    )
+    return services, f"http://127.0.0.1:{ports['backend']}"
+
+
+async def run_profile(args, profile, build_dir):
+    run_id = f"pipeline_bench_{profile}_{int(time.time())}"
+    print(f"[{profile}] starting services ({run_id})", file=sys.stderr)
+    services, api_url = start_services(args, profile, run_id, build_dir)
+    headers = {"Authorization": f"Bearer {mint_token(args.email)}"}
+    limits = httpx.Limits(max_connections=args.api_concurrency, max_keepalive_connections=args.api_concurrency)
+    try:
+        async with httpx.AsyncClient(timeout=5) as metrics_client, \
+                httpx.AsyncClient(base_url=api_url, headers=headers, limits=limits, timeout=30) as api_client:
+
+            async def ready():
+                for service in services.values():
+                    if service.process.poll() is not None:
+                        raise RuntimeError(f"{service.name} exited with {service.process.returncode}")
+                stored = (await scrape(metrics_client, services["consumer"])).get("consumer_messages_total", 0)
+                return stored > 0 and (await api_client.get("/")).status_code == 200
+
+            await wait_until(ready, args.startup_timeout, "the first readings to reach the consumer")
+            print(f"[{profile}] warming up for {args.warmup}s", file=sys.stderr)
+            await asyncio.sleep(args.warmup)
+
+            async def counters():
+                consumer, producer, server = await asyncio.gather(
+                    scrape(metrics_client, services["consumer"]),
+                    scrape(metrics_client, services["producer"]),
+                    scrape(metrics_client, services["socket_server"]),
+                )
+                return {
+                    "emitted": server.get("socket_server_messages_sent_total", 0),
+                    "produced": producer.get("producer_messages_delivered_total", 0),
+                    "stored": consumer.get("consumer_readings_stored_total", 0),
+                    "lag": consumer.get("consumer_lag", 0),
+                }
+
+            lags = []
+            measuring = True
+
+            async def sample():
+                while measuring:
+                    lags.append((await counters())["lag"])
+                    for service in services.values():
+                        service.sample_usage()
+                    await asyncio.sleep(args.sample_interval)
+
+            for service in services.values():
+                service.start_usage()
+            started, start_counts = time.monotonic(), await counters()
+            sampler = asyncio.create_task(sample())
+
+            api_results = []
+            for endpoint in args.endpoints:
+                result = await run_level(api_client, endpoint, args.api_concurrency, args.api_duration)
+                api_results.append(result)
+                print(f"[{profile}] {endpoint:<40} p50={result['p50_ms']:>8.2f}ms  "
+                      f"p99={result['p99_ms']:>8.2f}ms  errors={result['errors']}", file=sys.stderr)
+            # Ingest keeps running for the full window even when the API phase is shorter
+            await asyncio.sleep(max(0.0, args.duration - (time.monotonic() - started)))
+
+            measuring = False
+            await sampler
+            elapsed, end_counts = time.monotonic() - started, await counters()
+    finally:
+        usage = {name: service.usage() for name, service in services.items()}
+        for name in ("producer", "socket_server", "consumer", "backend"):
+            services[name].stop()
+        if not args.keep_data:
+            drop_database(args.mongo_uri, run_id)
+
+    def rate(key):
+        return round((end_counts[key] - start_counts[key]) / elapsed, 1)
+
+    result = {
+        "profile": profile,
+        "settings": PROFILES[profile],
+        "seconds": round(elapsed, 1),
+        "emitted_msgs_per_sec": rate("emitted"),
+        "produced_msgs_per_sec": rate("produced"),
+        "ingest_msgs_per_sec": rate("stored"),
+        "consumer_lag_mean": round(sum(lags) / len(lags), 1) if lags else None,
+        "consumer_lag_max": max(lags) if lags else None,
+        "consumer_lag_end": end_counts["lag"],
+        "api": api_results,
+        "services": usage,
+    }
+    print(f"[{profile}] ingest={result['ingest_msgs_per_sec']}/s "
+          f"(emitted {result['emitted_msgs_per_sec']}/s) lag max={result['consumer_lag_max']}", file=sys.stderr)
+    return result
+
+
+def drop_database(mongo_uri, name):
+    from pymongo import MongoClient
+
+    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+    try:
+        client.drop_database(name)
+    finally:
+        client.close()
+
+
+def compare(old_path, new_path):
+    """Print the headline numbers of two result files side by side."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    old_profiles = {result["profile"]: result for result in old["results"]}
+    print(f"{'':<44} {old.get('label') or old_path:>14} {new.get('label') or new_path:>14} {'change':>8}")
+
+    def row(name, before, after):
+        if before is None or after is None:
+            return
+        change = f"{(after - before) / before * 100:+.1f}%" if before else ""
+        print(f"{name:<44} {before:>14} {after:>14} {change:>8}")
+
+    for result in new["results"]:
+        before = old_profiles.get(result["profile"])
+        if before is None:
+            continue
+        profile = result["profile"]
+        for key in ("ingest_msgs_per_sec", "consumer_lag_max"):
+            row(f"{profile} {key}", before.get(key), result.get(key))
+        old_api = {api["endpoint"]: api for api in before.get("api", [])}
+        for api in result.get("api", []):
+            if api["endpoint"] in old_api:
+                for key in ("p50_ms", "p99_ms"):
+                    row(f"{profile} {api['endpoint']} {key}", old_api[api["endpoint"]][key], api[key])
+        for name, usage in result.get("services", {}).items():
+            old_usage = before.get("services", {}).get(name, {})
+            for key in ("cpu_cores", "rss_peak_mb"):
+                row(f"{profile} {name} {key}", old_usage.get(key), usage.get(key))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=["steady"])
+    parser.add_argument("--bootstrap-servers", default=os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092"))
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=1, help="consumer worker processes")
+    parser.add_argument("--backend-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds per profile")
+    parser.add_argument("--warmup", type=float, default=10, help="seconds of ingest before measuring")
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="seconds between lag/RSS samples")
+    parser.add_argument("--endpoints", nargs="+", default=DEFAULT_ENDPOINTS)
+    parser.add_argument("--api-concurrency", type=int, default=50)
+    parser.add_argument("--api-duration", type=float, default=10, help="seconds per endpoint")
+    parser.add_argument("--jwt-secret", default=os.getenv("JWT_SECRET", "pipeline-bench-secret"))
+    parser.add_argument("--email", default="bench@example.com", help="email claim for the minted token")
+    parser.add_argument("--keep-data", action="store_true", help="keep each profile's database")
+    parser.add_argument("--verbose", action="store_true", help="show service output")
+    parser.add_argument("--label", default="", help="free-form label stored with the results, e.g. a commit")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if psutil is None:
+        print("psutil is not installed; CPU and RSS will not be recorded", file=sys.stderr)
+    # mint_token signs with the same secret the backend is started with
+    os.environ["JWT_SECRET"] = args.jwt_secret
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    results = []
+    with tempfile.TemporaryDirectory() as build_dir:
+        (Path(build_dir) / "build").mkdir()
+        for profile in args.profiles:
+            results.append(asyncio.run(run_profile(args, profile, build_dir)))
+
+    summary = {
+        "label": args.label,
+        "commit": git_commit(),
+        "started_at": started_at,
+        "config": {
+            "partitions": args.partitions,
+            "consumer_workers": args.workers,
+            "backend_workers": args.backend_workers,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "api_concurrency": args.api_concurrency,
+        },
+        "results": results,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
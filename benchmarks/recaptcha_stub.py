@@ -0,0 +1,58 @@
+"""Local stand-in for reCAPTCHA siteverify, for tests and auth benchmarks.
+
+Accepts every token except "invalid", optionally after a delay or with a
+share of 500s to exercise the backend's timeouts and circuit breaker:
+
+    python benchmarks/recaptcha_stub.py --port 8099 --delay-ms 50
+    RECAPTCHA_VERIFIER=http RECAPTCHA_VERIFY_URL=http://localhost:8099/siteverify uvicorn backend.main:app
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+def make_handler(delay, error_rate):
+    class SiteverifyHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            if delay:
+                time.sleep(delay)
+            if random.random() < error_rate:
+                self.send_error(500)
+                return
+            token = form.get("response", [""])[0]
+            body = json.dumps({"success": token != "invalid"}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SiteverifyHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--delay-ms", type=float, default=0, help="latency added to every response")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests answered with 500")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.delay_ms / 1000, args.error_rate))
+    print(f"reCAPTCHA stub on http://{args.host}:{args.port}/siteverify")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Microbenchmark: encode time per page, FastAPI's default path vs. FastJSONResponse.
+
+Builds pages shaped like what /data/all, /data/device/{id} and /shipments/all
+read from MongoDB (ObjectId and datetime values included) and times turning
+one page into response bytes:
+
+- default: stringify _id in a loop, validate against PaginatedResponse,
+  dump it in JSON mode and json.dumps the result, as FastAPI does for a
+  route that returns a dict with a response_model
+- fast: backend.utils.responses.FastJSONResponse on the projected documents
+
+    python benchmarks/serialization_bench.py [--limits 10 100 200] [--repeat 200]
+
+Runs in-process; no server or database is needed.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("JWT_SECRET", "benchmark")
+from backend.models.data_model import PaginatedResponse  # noqa: E402
+from backend.utils.responses import FastJSONResponse, orjson  # noqa: E402
+
+ROUTES = ['Newyork,USA', 'Chennai, India', 'Bengaluru, India', 'London,UK']
+START = datetime(2026, 1, 1)
+ADAPTER = TypeAdapter(PaginatedResponse)
+
+
+def reading(rng, i, device_id=None, bookkeeping=True):
+    document = {
+        "_id": ObjectId(),
+        "Device_ID": device_id or rng.randint(1150, 1158),
+        "Battery_Level": round(rng.uniform(2.00, 5.00), 2),
+        "First_Sensor_temperature": round(rng.uniform(10, 40.0), 1),
+        "Route_From": rng.choice(ROUTES),
+        "Route_To": rng.choice(ROUTES),
+        "timestamp": START - timedelta(seconds=i),
+    }
+    if bookkeeping:
+        # Fields the listings now leave out with a projection
+        document["ingest_key"] = f"shipment_data:0:{i}"
+        document["trace"] = {"emitted": 1767225600000 + i, "produced": 1767225600004 + i,
+                             "consumed": 1767225600011 + i, "persisted": 1767225600030 + i}
+    return document
+
+
+def shipment(rng, i):
+    return {
+        "_id": ObjectId(),
+        "shipment_number": f"SHP-{i:06d}",
+        "device_id": rng.randint(1150, 1158),
+        "route": {"origin": rng.choice(ROUTES), "destination": rng.choice(ROUTES)},
+        "po_number": f"PO-{i}",
+        "goods_type": "Pharmaceuticals",
+        "status": "in_transit",
+        "expected_delivery_date": START + timedelta(days=7),
+        "created_at": START - timedelta(minutes=i),
+    }
+
+
+def page(documents, limit):
+    return {
+        "data": documents,
+        "total": 1_000_000,
+        "page": 1,
+        "limit": limit,
+        "total_pages": 1_000_000 // limit,
+        "next_cursor": "eyJ0Ijp7IiRkYXRlIjoxNzY3MjI1NjAwMDAwfX0",
+        "prev_cursor": None,
+    }
+
+
+def default_path(documents, limit):
+    for item in documents:
+        item["_id"] = str(item["_id"])
+    content = ADAPTER.dump_python(ADAPTER.validate_python(page(documents, limit)), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(documents, limit):
+    return FastJSONResponse(page(documents, limit)).body
+
+
+def cases(limit, seed=42):
+    """(endpoint, default-path documents factory, fast-path documents factory)."""
+    rng = random.Random(seed)
+    readings = [reading(rng, i) for i in range(limit)]
+    device = [reading(rng, i, device_id=1150) for i in range(limit)]
+    shipments = [shipment(rng, i) for i in range(limit)]
+
+    def projected(documents):
+        return [{k: v for k, v in d.items() if k not in ("trace", "ingest_key")} for d in documents]
+
+    return [
+        ("/data/all", readings, projected(readings)),
+        ("/data/device/{id}", device, projected(device)),
+        ("/shipments/all", shipments, shipments),
+    ]
+
+
+def best_of(fn, documents, limit, repeat):
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            # Each request gets freshly read documents
+            batch = [dict(d) for d in documents]
+            start = time.perf_counter()
+            fn(batch, limit)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 100, 200], help="documents per page")
+    parser.add_argument("--repeat", type=int, default=200, help="best-of-N timing")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"{'endpoint':<20} {'limit':>5} {'default µs':>11} {'fast µs':>9} {'speedup':>8}")
+    results = []
+    for limit in args.limits:
+        for endpoint, default_docs, fast_docs in cases(limit):
+            default = best_of(default_path, default_docs, limit, args.repeat)
+            fast = best_of(fast_path, fast_docs, limit, args.repeat)
+            print(f"{endpoint:<20} {limit:>5} {default * 1e6:>11.1f} {fast * 1e6:>9.1f} {default / fast:>7.1f}x")
+            results.append({"endpoint": endpoint, "limit": limit,
+                            "default_us": round(default * 1e6, 1), "fast_us": round(fast * 1e6, 1)})
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
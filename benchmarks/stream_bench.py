@@ -0,0 +1,150 @@
+"""Load test for the live telemetry stream (/data/stream/ws).
+
+Network mode opens N WebSocket subscribers against a running backend and
+reports messages received per client and delivery latency (from each
+reading's `timestamp` to receipt):
+
+    python benchmarks/stream_bench.py --url ws://localhost:8000 --subscribers 1000 --duration 30
+
+In-process mode drives LiveStreamHub directly with N subscribers and a
+synthetic publisher, isolating fan-out cost from the network:
+
+    python benchmarks/stream_bench.py --inprocess --subscribers 1000 --rate 1000 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+def summarize(label, counts, latencies, elapsed, extra=None):
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * (len(latencies) - 1)))] * 1000 if latencies else 0.0
+
+    result = {
+        "mode": label,
+        "subscribers": len(counts),
+        "connected": sum(1 for c in counts if c is not None),
+        "messages_total": sum(c or 0 for c in counts),
+        "messages_per_client_min": min((c or 0 for c in counts), default=0),
+        "messages_per_client_mean": round(statistics.fmean(c or 0 for c in counts), 1) if counts else 0,
+        "deliveries_per_sec": round(sum(c or 0 for c in counts) / elapsed, 1),
+        "latency_p50_ms": round(pct(50), 2),
+        "latency_p99_ms": round(pct(99), 2),
+    }
+    result.update(extra or {})
+    return result
+
+
+async def run_network(args):
+    import websockets
+
+    token = args.token or os.getenv("BENCH_TOKEN")
+    if not token and os.getenv("JWT_SECRET"):
+        from jose import jwt
+        now = datetime.now(timezone.utc)
+        token = jwt.encode({"sub": "benchmark", "email": "bench@example.com", "iat": now,
+                            "exp": now + timedelta(hours=1)}, os.environ["JWT_SECRET"], algorithm="HS256")
+
+    counts = [None] * args.subscribers
+    latencies = []
+    deadline = time.monotonic() + args.duration
+
+    async def subscriber(index):
+        query = f"?token={token}" + (f"&device_id={args.device_id}" if args.device_id else "")
+        try:
+            async with websockets.connect(f"{args.url}/data/stream/ws{query}", max_queue=None) as ws:
+                counts[index] = 0
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        frame = await asyncio.wait_for(ws.recv(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    counts[index] += 1
+                    timestamp = json.loads(frame).get("timestamp")
+                    if isinstance(timestamp, str) and index % 10 == 0:
+                        sent = datetime.fromisoformat(timestamp)
+                        if sent.tzinfo is None:
+                            sent = sent.replace(tzinfo=timezone.utc)
+                        latencies.append((datetime.now(timezone.utc) - sent).total_seconds())
+        except Exception as e:
+            print(f"subscriber {index} failed: {e}", file=sys.stderr)
+
+    started = time.monotonic()
+    await asyncio.gather(*(subscriber(i) for i in range(args.subscribers)))
+    return summarize("network", counts, latencies, time.monotonic() - started)
+
+
+async def run_inprocess(args):
+    os.environ.setdefault("JWT_SECRET", "benchmark")
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from backend.utils.live_stream import LiveStreamHub
+
+    hub = LiveStreamHub()
+    hub._ensure_started = lambda: None  # no upstream; readings are published below
+    subscriptions = [hub.subscribe(args.device_id) for _ in range(args.subscribers)]
+    counts = [0] * args.subscribers
+    latencies = []
+
+    async def consumer(index, subscription):
+        while not subscription.closed:
+            messages = await subscription.get()
+            counts[index] += len(messages)
+            if index % 10 == 0:
+                now = time.perf_counter()
+                latencies.extend(now - json.loads(m)["sent"] for m in messages)
+
+    async def publisher():
+        interval = 1 / args.rate
+        next_at = time.perf_counter()
+        end = next_at + args.duration
+        while next_at < end:
+            hub.publish({"Device_ID": args.device_id or 1150, "First_Sensor_temperature": 21.5,
+                         "Battery_Level": 3.7, "sent": time.perf_counter()})
+            next_at += interval
+            await asyncio.sleep(max(0, next_at - time.perf_counter()))
+
+    tasks = [asyncio.create_task(consumer(i, s)) for i, s in enumerate(subscriptions)]
+    started = time.monotonic()
+    await publisher()
+    await asyncio.sleep(0.5)
+    elapsed = time.monotonic() - started
+    stats = hub.stats()
+    for subscription in subscriptions:
+        hub.unsubscribe(subscription)
+    await asyncio.gather(*tasks)
+    return summarize("inprocess", counts, latencies, elapsed,
+                     {"published": stats["published"], "dropped": stats["dropped"]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://localhost:8000")
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--device-id", type=int, help="subscribe to one device only")
+    parser.add_argument("--token", help="bearer token (default: BENCH_TOKEN or minted from JWT_SECRET)")
+    parser.add_argument("--inprocess", action="store_true", help="benchmark LiveStreamHub fan-out without a server")
+    parser.add_argument("--rate", type=float, default=100, help="in-process publish rate (readings/s)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_inprocess(args) if args.inprocess else run_network(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
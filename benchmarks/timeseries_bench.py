@@ -0,0 +1,150 @@
+"""Compare a regular readings collection with a time-series one.
+
+Loads the same synthetic readings into both layouts (with the indexes each
+service creates for it), then reports storage/index size from $collStats and
+latency of the read paths the backend serves: the newest page, a deep keyset
+page, one device's newest page and a one-hour range scan for one device.
+
+    python benchmarks/timeseries_bench.py --mongo-uri mongodb://localhost:27017 --readings 50000000
+
+Requires MongoDB 6.0+. Loading 50M readings takes a while; pass --skip-load
+to re-run the queries against previously loaded collections.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("JWT_SECRET", "benchmark")
+from backend.utils import pagination  # noqa: E402
+
+REGULAR, TIMESERIES = "readings_regular", "readings_timeseries"
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def reading(i, devices, interval):
+    return {
+        "Device_ID": 1000 + i % devices,
+        "Battery_Level": round(random.uniform(2.5, 4.2), 2),
+        "First_Sensor_temperature": round(random.gauss(20, 5), 1),
+        "Route_From": "Chennai, India",
+        "Route_To": "London, UK",
+        "timestamp": START + timedelta(seconds=(i // devices) * interval),
+    }
+
+
+async def load(db, args):
+    for name in (REGULAR, TIMESERIES):
+        await db.drop_collection(name)
+    await db.create_collection(TIMESERIES, timeseries={
+        "timeField": "timestamp", "metaField": "Device_ID", "granularity": args.granularity
+    })
+    await db[REGULAR].create_index([("timestamp", -1), ("_id", -1)])
+    await db[REGULAR].create_index([("Device_ID", 1), ("timestamp", -1), ("_id", -1)])
+    await db[TIMESERIES].create_index([("timestamp", -1)])
+    await db[TIMESERIES].create_index([("Device_ID", 1), ("timestamp", -1)])
+
+    started = time.monotonic()
+    for offset in range(0, args.readings, args.batch_size):
+        batch = [reading(i, args.devices, args.interval)
+                 for i in range(offset, min(offset + args.batch_size, args.readings))]
+        await db[REGULAR].insert_many(batch, ordered=False)
+        for document in batch:
+            document.pop("_id")
+        await db[TIMESERIES].insert_many(batch, ordered=False)
+        done = offset + len(batch)
+        if done % (args.batch_size * 100) == 0 or done == args.readings:
+            print(f"loaded {done}/{args.readings} ({done / (time.monotonic() - started):.0f}/s)", file=sys.stderr)
+
+
+async def storage(db, name):
+    stats = await db[name].aggregate([{"$collStats": {"storageStats": {}}}]).to_list(length=1)
+    storage_stats = stats[0]["storageStats"]
+    return {
+        "count": storage_stats.get("count"),
+        "storage_mb": round(storage_stats.get("storageSize", 0) / 2**20, 1),
+        "index_mb": round(storage_stats.get("totalIndexSize", 0) / 2**20, 1),
+    }
+
+
+async def timed(coroutine_factory, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coroutine_factory()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {"p50_ms": round(statistics.median(samples), 2), "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 2)}
+
+
+async def queries(db, name, args):
+    collection = db[name]
+    device = 1000 + args.devices // 2
+    span = (args.readings // args.devices) * args.interval
+    hour_start = START + timedelta(seconds=span // 2)
+
+    async def deep_page():
+        # Follow next_cursor a few pages in, as a client scrolling would
+        _, cursor, _ = await pagination.keyset_page(collection, {}, None, 50)
+        for _ in range(args.deep_pages):
+            _, cursor, _ = await pagination.keyset_page(collection, {}, cursor, 50)
+
+    async def range_scan():
+        return await collection.count_documents({
+            "Device_ID": device,
+            "timestamp": {"$gte": hour_start, "$lt": hour_start + timedelta(hours=1)},
+        })
+
+    return {
+        "newest_page": await timed(lambda: pagination.keyset_page(collection, {}, None, 50), args.repeat),
+        f"page_{args.deep_pages + 1}_by_cursor": await timed(deep_page, max(1, args.repeat // 5)),
+        "device_newest_page": await timed(
+            lambda: pagination.keyset_page(collection, {"Device_ID": device}, None, 50), args.repeat),
+        "device_hour_range": await timed(range_scan, args.repeat),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="scmlite_bench")
+    parser.add_argument("--readings", type=int, default=50_000_000)
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--interval", type=int, default=10, help="seconds between a device's readings")
+    parser.add_argument("--granularity", default="seconds")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--deep-pages", type=int, default=20)
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_uri)
+    db = client[args.db]
+    if not args.skip_load:
+        await load(db, args)
+
+    results = {}
+    for name in (REGULAR, TIMESERIES):
+        if name == TIMESERIES:
+            pagination.TIMESERIES_COLLECTIONS.add(name)
+        results[name] = {"storage": await storage(db, name), "queries": await queries(db, name, args)}
+    client.close()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""Ingest-time normalization of telemetry records.
+
+Every record is coerced into one stable layout before it is written:
+a BSON datetime `timestamp` taken from the Kafka record timestamp (the
+time the reading entered the pipeline), typed sensor fields, and nothing
+else. Records that cannot be coerced are rejected with a reason so they
+never reach the collection the read paths sort and filter on.
+
+Shared by the consumer, which stores the result, and the backend's Kafka
+live stream, which publishes what the consumer is about to store.
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Field -> (type, required). Output documents always carry these keys, in this order.
+SCHEMA = {
+    'Device_ID': (int, True),
+    'Battery_Level': (float, False),
+    'First_Sensor_temperature': (float, False),
+    'Route_From': (str, False),
+    'Route_To': (str, False),
+}
+
+
+class RejectedRecord(ValueError):
+    """A record that cannot be normalized; str(exc) is the reason."""
+
+
+def _to_int(value):
+    kind = type(value)
+    if kind is int:
+        return value
+    if kind is float and value.is_integer():
+        return int(value)
+    if kind is str:
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise RejectedRecord('not an integer')
+
+
+def _to_float(value):
+    kind = type(value)
+    if kind is float:
+        if value != value or value in (float('inf'), float('-inf')):
+            raise RejectedRecord('not a finite number')
+        return value
+    if kind is int:
+        return float(value)
+    if kind is str:
+        try:
+            return _to_float(float(value))
+        except ValueError:
+            pass
+    raise RejectedRecord('not a number')
+
+
+def _to_str(value):
+    if type(value) is str:
+        return value
+    if type(value) in (int, float):
+        return str(value)
+    raise RejectedRecord('not a string')
+
+
+_COERCE = {int: _to_int, float: _to_float, str: _to_str}
+_FIELDS = tuple((name, kind, _COERCE[kind], required) for name, (kind, required) in SCHEMA.items())
+
+
+def record_time(timestamp_ms):
+    """UTC datetime from a Kafka record timestamp in ms (now when the record has none)."""
+    if timestamp_ms is None or timestamp_ms < 0:
+        return datetime.now(timezone.utc)
+    # Millisecond precision, matching what BSON datetimes can store
+    return _EPOCH + timedelta(milliseconds=timestamp_ms)
+
+
+def normalize(value, timestamp_ms=None):
+    """Return `value` coerced to SCHEMA and stamped with `timestamp`, or raise RejectedRecord."""
+    if type(value) is not dict:
+        raise RejectedRecord('not a JSON object')
+    document = {}
+    for name, kind, coerce, required in _FIELDS:
+        raw = value.get(name)
+        # Fast path: already the right type (x - x is nan for nan/inf floats)
+        if type(raw) is kind and (kind is not float or raw - raw == 0):
+            document[name] = raw
+            continue
+        if raw is None:
+            if required:
+                raise RejectedRecord(f'missing {name}')
+            document[name] = None
+            continue
+        try:
+            document[name] = coerce(raw)
+        except RejectedRecord as e:
+            raise RejectedRecord(f'{name} {e}') from None
+    document['timestamp'] = record_time(timestamp_ms)
+    return document
+
+
+class Normalizer:
+    """Applies normalize() to consumed records and counts rejections by reason."""
+
+    def __init__(self):
+        self.accepted = 0
+        self.rejected = Counter()
+
+    def __call__(self, value, timestamp_ms=None):
+        """Normalized document for a parsed record; raises RejectedRecord."""
+        try:
+            document = normalize(value, timestamp_ms)
+        except RejectedRecord as e:
+            self.rejected[str(e)] += 1
+            raise
+        self.accepted += 1
+        return document
+
+    def snapshot(self):
+        return {
+            "accepted": self.accepted,
+            "rejected": sum(self.rejected.values()),
+            "rejected_by_reason": dict(self.rejected.most_common(5)),
+        }
@@ -0,0 +1,113 @@
+"""Per-reading pipeline traces: when each stage handled a reading.
+
+A trace maps stage name to a wall-clock time in epoch milliseconds:
+
+- **emitted**: the device (socket_server) created the reading, from its `timestamp`
+- **framed**: the producer decoded the reading's frame off the socket
+- **produced**: the producer handed the record to Kafka
+- **consumed**: the consumer polled the record from Kafka
+- **persisted**: the consumer issued the MongoDB write holding it
+
+The producer sends the first three as `trace.<stage>` Kafka headers, and the
+consumer stores the complete trace on the document under TRACE_FIELD.
+Stages run on different hosts, so hop latencies are only as good as their
+clock sync.
+
+    trace = {'emitted': emitted_ms(reading.get('timestamp')), 'framed': now_ms()}
+    producer.send(topic, value=reading, headers=to_headers(trace))
+"""
+import math
+import time
+from datetime import datetime, timezone
+
+STAGES = ('emitted', 'framed', 'produced', 'consumed', 'persisted')
+TRACE_FIELD = 'trace'
+HEADER_PREFIX = 'trace.'
+# Latency from the first to the last stage of a trace
+TOTAL = 'total'
+
+_HEADER_STAGES = {f'{HEADER_PREFIX}{stage}': stage for stage in STAGES}
+
+
+def now_ms():
+    """Current wall-clock time in epoch milliseconds."""
+    return time.time() * 1000
+
+
+def emitted_ms(timestamp):
+    """Epoch milliseconds of a reading's ISO 8601 `timestamp` (UTC if naive), or None."""
+    if type(timestamp) is not str:
+        return None
+    try:
+        emitted = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+    if emitted.tzinfo is None:
+        emitted = emitted.replace(tzinfo=timezone.utc)
+    return emitted.timestamp() * 1000
+
+
+def to_headers(trace):
+    """Kafka headers carrying the stages recorded in `trace`."""
+    return [
+        (f'{HEADER_PREFIX}{stage}', f'{value:.3f}'.encode('ascii'))
+        for stage, value in trace.items() if value is not None
+    ]
+
+
+def from_headers(headers):
+    """The trace carried by a Kafka record's headers; malformed values are skipped."""
+    trace = {}
+    for key, value in headers or ():
+        stage = _HEADER_STAGES.get(key)
+        if stage is None:
+            continue
+        try:
+            trace[stage] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return trace
+
+
+def hop_latencies(trace):
+    """Milliseconds spent reaching each stage from the previous recorded one, plus TOTAL."""
+    latencies = {}
+    first = previous = None
+    for stage in STAGES:
+        value = trace.get(stage)
+        if value is None:
+            continue
+        if previous is None:
+            first = value
+        else:
+            latencies[stage] = value - previous
+        previous = value
+    if latencies:
+        latencies[TOTAL] = previous - first
+    return latencies
+
+
+def _percentile(ordered, q):
+    # Nearest rank
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(traces, quantiles=(50, 95, 99)):
+    """Per-stage count, percentiles and max of hop latencies (ms) over `traces`."""
+    samples = {}
+    for trace in traces:
+        for stage, latency in hop_latencies(trace).items():
+            samples.setdefault(stage, []).append(latency)
+
+    summary = {}
+    for stage in STAGES[1:] + (TOTAL,):
+        values = samples.get(stage)
+        if not values:
+            continue
+        values.sort()
+        stats = {'count': len(values)}
+        for q in quantiles:
+            stats[f'p{q}'] = round(_percentile(values, q), 3)
+        stats['max'] = round(values[-1], 3)
+        summary[stage] = stats
+    return summary
@@ -1,14 +1,31 @@
 import json
+import multiprocessing
 import signal
 import ssl
 import sys
-from kafka import KafkaConsumer
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from kafka import ConsumerRebalanceListener, KafkaConsumer, KafkaProducer
 from kafka.errors import KafkaError, NoBrokersAvailable
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, PyMongoError
-from time import sleep
+from kafka.structs import OffsetAndMetadata, TopicPartition
+from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo.errors import BulkWriteError, ConnectionFailure, PyMongoError, WriteError
+from time import sleep, monotonic
 from dotenv import load_dotenv
 import os
+from rollups import RollupWriter
+from device_state import DeviceStateWriter
+from timeseries import ensure_timeseries_collection
+from idempotency import KEY_FIELD, KEY_FUNCTIONS, IdempotentWriter, split_write_errors
+from dead_letters import DeadLetterSink, KafkaDeadLetterSink, MongoDeadLetterSink, record_source
+
+# Shared modules live in common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.metrics import SIZE_BUCKETS, Counter, Gauge, Histogram, serve  # noqa: E402
+from common.normalize import Normalizer, RejectedRecord  # noqa: E402
+from common.tracing import TRACE_FIELD, from_headers, hop_latencies, now_ms  # noqa: E402
 
 load_dotenv()
 
@@ -18,13 +35,140 @@ KAFKA_TOPIC = os.getenv('KAFKA_TOPIC', 'shipment_data')
 MONGO_URI = os.getenv('MONGO_URI')
 DB_NAME = os.getenv('DB_NAME', 'scmlitedb')
 COLLECTION_NAME = os.getenv('COLLECTION_NAME', 'shipment_data')
+CONSUMER_GROUP_ID = os.getenv('CONSUMER_GROUP_ID', 'shipment_consumer_group')
+# Worker processes in the consumer group; useful up to the topic's partition count
+CONSUMER_WORKERS = max(1, int(os.getenv('CONSUMER_WORKERS', 1)))
+
+# Batching configuration
+BATCH_ENABLED = os.getenv('BATCH_ENABLED', 'true').lower() == 'true'
+BATCH_SIZE = int(os.getenv('BATCH_SIZE', 500))
+BATCH_LINGER_MS = int(os.getenv('BATCH_LINGER_MS', 200))
+MAX_IN_FLIGHT_BATCHES = max(1, int(os.getenv('MAX_IN_FLIGHT_BATCHES', 2)))
+STATS_INTERVAL = int(os.getenv('STATS_INTERVAL', 30))
+
+# Key every reading and skip redelivered ones, so replays never duplicate
+IDEMPOTENT_WRITES = os.getenv('IDEMPOTENT_WRITES', 'true').lower() == 'true'
+# offset (topic:partition:offset) or reading (Device_ID + reported timestamp)
+IDEMPOTENCY_KEY = os.getenv('IDEMPOTENCY_KEY', 'offset')
+
+# Where records that fail to parse, validate or write go: mongo, kafka or none
+DEAD_LETTER_SINK = os.getenv('DEAD_LETTER_SINK', 'mongo')
+DEAD_LETTER_COLLECTION = os.getenv('DEAD_LETTER_COLLECTION', f'{COLLECTION_NAME}_dead_letters')
+DEAD_LETTER_TOPIC = os.getenv('DEAD_LETTER_TOPIC', f'{KAFKA_TOPIC}_dlq')
+# MongoDB connection errors are retried in place, with exponential backoff
+WRITE_RETRIES = int(os.getenv('WRITE_RETRIES', 5))
+WRITE_RETRY_BACKOFF = float(os.getenv('WRITE_RETRY_BACKOFF', 0.5))
+
+# Per-device 1m/1h/1d rollups maintained alongside the raw readings
+ROLLUPS_ENABLED = os.getenv('ROLLUPS_ENABLED', 'true').lower() == 'true'
+# Last-known state per device, read by /data/latest and /admin/health/devices
+DEVICE_STATE_COLLECTION = os.getenv('DEVICE_STATE_COLLECTION', 'device_state')
+
+# Store readings in a native time-series collection (MongoDB 5.0+)
+TIMESERIES_ENABLED = os.getenv('TIMESERIES_ENABLED', 'false').lower() == 'true'
+# seconds, minutes or hours: the expected interval between a device's readings
+TIMESERIES_GRANULARITY = os.getenv('TIMESERIES_GRANULARITY', 'seconds')
+# Drop readings older than this many seconds (0 keeps them forever)
+TIMESERIES_EXPIRE_AFTER_SECONDS = int(os.getenv('TIMESERIES_EXPIRE_AFTER_SECONDS', 0))
+
+# Store each reading's stage times (from the producer's trace headers) under `trace`
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+
+# Sidecar port for /metrics (0 disables it); worker N listens on METRICS_PORT + N
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9102))
+
+# Metrics
+MESSAGES_IN = Counter('consumer_messages_total', 'Records consumed from Kafka')
+BYTES_IN = Counter('consumer_bytes_total', 'Record value bytes consumed from Kafka')
+READINGS_STORED = Counter('consumer_readings_stored_total', 'New readings persisted to MongoDB')
+DEAD_LETTERS = Counter('consumer_dead_letters_total', 'Records dead-lettered, by failed stage', ['stage'])
+BATCH_SIZE_RECORDS = Histogram('consumer_batch_size', 'Documents per insert_many batch', buckets=SIZE_BUCKETS)
+WRITE_SECONDS = Histogram('consumer_mongo_write_seconds', 'MongoDB insert latency', ['operation'])
+BATCHES_IN_FLIGHT = Gauge('consumer_batches_in_flight', 'Batches submitted but not yet committed')
+CONSUMER_LAG = Gauge('consumer_lag', 'Records behind the partition high watermark', ['topic', 'partition'])
+PIPELINE_SECONDS = Histogram(
+    'pipeline_stage_seconds', 'Time for a reading to reach each pipeline stage from the previous one', ['stage']
+)
+
+# Indexes the read paths sort and filter on; same specs as the backend's keyset indexes
+READING_INDEXES = [
+    [('timestamp', DESCENDING), ('_id', DESCENDING)],
+    [('Device_ID', ASCENDING), ('timestamp', DESCENDING), ('_id', DESCENDING)],
+]
+
+
+def _commit_offset(offset):
+    """Build an OffsetAndMetadata across kafka-python versions."""
+    fields = (offset, None, -1)
+    return OffsetAndMetadata(*fields[:len(OffsetAndMetadata._fields)])
+
+
+class BatchStats:
+    """Per-batch write latency and throughput counters."""
+
+    def __init__(self):
+        self.batches = 0
+        self.documents = 0
+        self.write_seconds = 0.0
+        self.last_latency_ms = 0.0
+        self.last_docs_per_sec = 0.0
+        self.started = monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, count, seconds):
+        """Record one persisted batch of `count` documents."""
+        with self._lock:
+            self.batches += 1
+            self.documents += count
+            self.write_seconds += seconds
+            self.last_latency_ms = seconds * 1000
+            self.last_docs_per_sec = count / seconds if seconds > 0 else 0.0
+
+    def snapshot(self):
+        """Return the current metrics as a dict."""
+        elapsed = monotonic() - self.started
+        return {
+            "batches": self.batches,
+            "documents": self.documents,
+            "last_batch_latency_ms": round(self.last_latency_ms, 2),
+            "avg_batch_latency_ms": round(self.write_seconds * 1000 / self.batches, 2) if self.batches else 0.0,
+            "last_batch_docs_per_sec": round(self.last_docs_per_sec, 1),
+            "docs_per_sec": round(self.documents / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+class BatchRebalanceListener(ConsumerRebalanceListener):
+    """Commits a worker's consumed records before its partitions move to another worker."""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def on_partitions_revoked(self, revoked):
+        self.owner._on_partitions_revoked(revoked)
+
+    def on_partitions_assigned(self, assigned):
+        partitions = sorted(tp.partition for tp in assigned)
+        print(f"Worker {os.getpid()} assigned partitions {partitions}")
+
 
 class KafkaMongoConsumer:
     def __init__(self):
         self.consumer = None
         self.mongo_client = None
         self.collection = None
+        self.rollups = None
+        self.device_state = None
+        self.writer = None
+        self.ingest_key = KEY_FUNCTIONS[IDEMPOTENCY_KEY]
         self.running = True
+        self.stats = BatchStats()
+        self.normalize = Normalizer()
+        self.dead_letters = DeadLetterSink()
+        self.dead_letter_producer = None
+        # Batch loop state, shared with the rebalance listener (both run in poll()'s thread).
+        # _messages holds the source message of each buffered document, for dead-lettering.
+        self._executor = None
+        self._in_flight = deque()
+        self._documents, self._messages, self._offsets, self._deadline = [], [], {}, None
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._shutdown)
@@ -40,13 +184,14 @@ class KafkaMongoConsumer:
         while retry_count < max_retries:
             try:
                 self.consumer = KafkaConsumer(
-                    KAFKA_TOPIC,
                     bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
-                    value_deserializer=lambda x: self._safe_json_loads(x),
+                    # Raw bytes; parsed per record so bad ones can be dead-lettered as received
                     auto_offset_reset='earliest',
-                    enable_auto_commit=True,
-                    group_id='shipment_consumer_group'
+                    # Offsets are committed only once the records are persisted
+                    enable_auto_commit=False,
+                    group_id=CONSUMER_GROUP_ID
                 )
+                self.consumer.subscribe([KAFKA_TOPIC], listener=BatchRebalanceListener(self))
                 print("Kafka consumer connected")
                 return
             except NoBrokersAvailable:
@@ -71,12 +216,28 @@ class KafkaMongoConsumer:
                     serverSelectionTimeoutMS=5000,
                     connectTimeoutMS=30000,
                     socketTimeoutMS=30000,
-                    maxPoolSize=10
+                    maxPoolSize=max(10, MAX_IN_FLIGHT_BATCHES)
                 )
                 # Force connection to verify it works
                 self.mongo_client.server_info()
                 db = self.mongo_client[DB_NAME]
                 self.collection = db[COLLECTION_NAME]
+                timeseries = TIMESERIES_ENABLED and ensure_timeseries_collection(
+                    db, COLLECTION_NAME, TIMESERIES_GRANULARITY, TIMESERIES_EXPIRE_AFTER_SECONDS
+                )
+                if not timeseries:
+                    for keys in READING_INDEXES:
+                        self.collection.create_index(keys)
+                if IDEMPOTENT_WRITES:
+                    self.writer = IdempotentWriter(self.collection, unique=not timeseries)
+                    self.writer.ensure_indexes()
+                if ROLLUPS_ENABLED:
+                    self.rollups = RollupWriter(db, COLLECTION_NAME)
+                    self.rollups.ensure_indexes()
+                if DEVICE_STATE_COLLECTION:
+                    self.device_state = DeviceStateWriter(db[DEVICE_STATE_COLLECTION])
+                    self.device_state.ensure_indexes()
+                self._setup_dead_letters(db)
                 print(f"MongoDB connected. Database: {DB_NAME}, Collection: {COLLECTION_NAME}")
                 return
             except ConnectionFailure as e:
@@ -90,30 +251,232 @@ class KafkaMongoConsumer:
                 print(f"Error setting up MongoDB: {e}")
                 raise
 
-    @staticmethod
-    def _safe_json_loads(json_str):
-        """Safely deserialize JSON string."""
+    def _setup_dead_letters(self, db):
+        """Create the dead-letter sink selected by DEAD_LETTER_SINK."""
+        if DEAD_LETTER_SINK == 'mongo':
+            self.dead_letters = MongoDeadLetterSink(db[DEAD_LETTER_COLLECTION])
+            self.dead_letters.ensure_indexes()
+        elif DEAD_LETTER_SINK == 'kafka':
+            self.dead_letter_producer = KafkaProducer(bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS, acks='all')
+            self.dead_letters = KafkaDeadLetterSink(self.dead_letter_producer, DEAD_LETTER_TOPIC)
+        print(f"Dead letters: {DEAD_LETTER_SINK}")
+
+    def _retry(self, operation, *args):
+        """Run a MongoDB operation, retrying connection errors in place instead of restarting."""
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                return operation(*args)
+            except ConnectionFailure as e:
+                if attempt == WRITE_RETRIES:
+                    raise
+                delay = WRITE_RETRY_BACKOFF * 2 ** attempt
+                print(f"MongoDB write failed: {e}. Retrying in {delay:.1f} seconds...")
+                sleep(delay)
+
+    def _dead_letter(self, message, stage, error):
+        self.dead_letters.send(record_source(message), stage, error)
+        DEAD_LETTERS.labels(stage).inc()
+
+    def _track(self, tp, messages):
+        """Count consumed records and update the partition's lag from the fetched high watermark."""
+        MESSAGES_IN.inc(len(messages))
+        BYTES_IN.inc(sum(message.serialized_value_size for message in messages))
+        highwater = self.consumer.highwater(tp)
+        if highwater is not None:
+            CONSUMER_LAG.labels(tp.topic, tp.partition).set(max(0, highwater - messages[-1].offset - 1))
+
+    def _prepare(self, message):
+        """Parse, normalize and key a message; dead-letters it and returns None on failure."""
+        try:
+            value = json.loads(message.value)
+        except (ValueError, TypeError) as e:
+            self._dead_letter(message, 'parse', e)
+            return None
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
+            document = self.normalize(value, message.timestamp)
+        except RejectedRecord as e:
+            self._dead_letter(message, 'validation', e)
             return None
+        if self.writer:
+            document[KEY_FIELD] = self.ingest_key(message, value)
+        if TRACING_ENABLED:
+            trace = from_headers(message.headers)
+            trace['consumed'] = now_ms()
+            document[TRACE_FIELD] = trace
+        return document
 
-    def _process_message(self, message):
-        """Process a single message and insert into MongoDB."""
-        if not message.value:
+    def _stamp_persisted(self, documents):
+        """Record the write in each document's trace; the last point the consumer can stamp it."""
+        if not TRACING_ENABLED:
             return
+        persisted = now_ms()
+        for document in documents:
+            document[TRACE_FIELD]['persisted'] = persisted
 
-        data = message.value
-        if not isinstance(data, dict):
+    def _observe_traces(self, documents):
+        """Feed the hop latencies of stored readings into the pipeline_stage_seconds histogram."""
+        if not TRACING_ENABLED:
             return
-            
-        # Insert into MongoDB
-        self.collection.insert_one(data)
+        for document in documents:
+            for stage, latency in hop_latencies(document[TRACE_FIELD]).items():
+                PIPELINE_SECONDS.labels(stage).observe(latency / 1000)
+
+    def _insert_one(self, document):
+        with WRITE_SECONDS.labels('insert_one').time():
+            if self.writer:
+                return self.writer.insert_one(document)
+            self.collection.insert_one(document)
+            return True
+
+    def _insert_many(self, documents):
+        """Insert a batch unordered; returns (new documents, [(document, write error)])."""
+        with WRITE_SECONDS.labels('insert_many').time():
+            if self.writer:
+                # Redelivered readings are skipped so rollups don't count them twice
+                return self.writer.insert_many(documents)
+            try:
+                self.collection.insert_many(documents, ordered=False)
+                return documents, []
+            except BulkWriteError as e:
+                inserted, _, failed = split_write_errors(documents, e, duplicates_ok=False)
+                return inserted, failed
+
+    def _process_message(self, message):
+        """Process a single message, insert it into MongoDB and commit its offset."""
+        tp = TopicPartition(message.topic, message.partition)
+        self._track(tp, [message])
+        data = self._prepare(message)
+        if data is not None:
+            # Insert into MongoDB
+            self._stamp_persisted([data])
+            try:
+                inserted = self._retry(self._insert_one, data)
+            except WriteError as e:
+                self._dead_letter(message, 'write', e)
+                inserted = False
+            if inserted:
+                READINGS_STORED.inc()
+                self._observe_traces([data])
+                self._apply_derived([data])
+
+        self.dead_letters.flush()
+        self.consumer.commit(offsets={tp: _commit_offset(message.offset + 1)})
+
+    def _apply_derived(self, documents):
+        """Update rollups and device state from persisted readings."""
+        try:
+            if self.rollups:
+                self._retry(self.rollups.apply, documents)
+            if self.device_state:
+                self._retry(self.device_state.apply, documents)
+        except ConnectionFailure:
+            raise
+        except PyMongoError as e:
+            # The readings themselves are stored; don't stall ingest over derived data
+            print(f"Failed to update rollups/device state for {len(documents)} readings: {e}")
+
+    def _write_batch(self, documents, messages):
+        """Persist a batch with a single unordered insert_many; returns the number of new readings."""
+        if not documents:
+            return 0
+        start = monotonic()
+        BATCH_SIZE_RECORDS.observe(len(documents))
+        self._stamp_persisted(documents)
+        inserted, failed = self._retry(self._insert_many, documents)
+        if failed:
+            # Only the rejected records are dead-lettered; the rest of the batch is kept
+            sources = {id(document): message for document, message in zip(documents, messages)}
+            for document, error in failed:
+                self._dead_letter(
+                    sources[id(document)], 'write', WriteError(error.get('errmsg'), error.get('code'), error)
+                )
+        if inserted:
+            READINGS_STORED.inc(len(inserted))
+            self._observe_traces(inserted)
+            self._apply_derived(inserted)
+        self.stats.record(len(documents), monotonic() - start)
+        return len(inserted)
+
+    def _reap_batches(self, in_flight, limit):
+        """Commit offsets of completed batches, oldest first, waiting while more than `limit` are in flight."""
+        while in_flight and (len(in_flight) > limit or in_flight[0][0].done()):
+            future, offsets = in_flight.popleft()
+            # Re-raises write errors; uncommitted offsets are redelivered on restart
+            future.result()
+            self.dead_letters.flush()
+            self.consumer.commit(offsets={tp: _commit_offset(offset) for tp, offset in offsets.items()})
+            BATCHES_IN_FLIGHT.dec()
+
+    def _submit_batch(self):
+        """Hand the buffered batch to the writer pool and start a new one."""
+        if self._offsets:
+            future = self._executor.submit(self._write_batch, self._documents, self._messages)
+            self._in_flight.append((future, self._offsets))
+            BATCHES_IN_FLIGHT.inc()
+        self._documents, self._messages, self._offsets, self._deadline = [], [], {}, None
+
+    def _on_partitions_revoked(self, revoked):
+        """Flush and commit everything consumed so far, so the next owner starts after it."""
+        # Lag is reported again for whichever partitions this worker is assigned next
+        CONSUMER_LAG.clear()
+        if not BATCH_ENABLED or self._executor is None:
+            return
+        self._submit_batch()
+        self._reap_batches(self._in_flight, 0)
+        print(f"Worker {os.getpid()} committed before revocation of {len(revoked)} partition(s)")
+
+    def _run_batched(self):
+        """Drain poll() into micro-batches bounded by size and linger time."""
+        self._executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT_BATCHES)
+        last_report = monotonic()
+
+        try:
+            while self.running:
+                timeout_ms = BATCH_LINGER_MS
+                if self._deadline is not None:
+                    timeout_ms = max(0, int((self._deadline - monotonic()) * 1000))
+                records = self.consumer.poll(timeout_ms=timeout_ms, max_records=BATCH_SIZE - len(self._documents))
+
+                for tp, messages in records.items():
+                    self._track(tp, messages)
+                    for message in messages:
+                        self._offsets[tp] = message.offset + 1
+                        document = self._prepare(message)
+                        if document is not None:
+                            self._documents.append(document)
+                            self._messages.append(message)
+                if self._offsets and self._deadline is None:
+                    self._deadline = monotonic() + BATCH_LINGER_MS / 1000
+
+                if self._offsets and (len(self._documents) >= BATCH_SIZE or monotonic() >= self._deadline):
+                    self._submit_batch()
+
+                self._reap_batches(self._in_flight, MAX_IN_FLIGHT_BATCHES - 1)
+
+                if monotonic() - last_report >= STATS_INTERVAL:
+                    print(f"Batch stats: {self.stats.snapshot()}")
+                    print(f"Normalization: {self.normalize.snapshot()}")
+                    print(f"Dead letters: {self.dead_letters.snapshot()}")
+                    if self.writer:
+                        print(f"Duplicates skipped: {self.writer.duplicates}")
+                    last_report = monotonic()
+
+            # Flush whatever is still buffered before shutting down
+            self._submit_batch()
+            self._reap_batches(self._in_flight, 0)
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            # Uncommitted batches are redelivered to the restarted consumer
+            BATCHES_IN_FLIGHT.set(0)
 
     def _shutdown(self, signum, frame):
         """Handle shutdown signals."""
         print("Shutdown signal received. Closing connections...")
         self.running = False
+        if BATCH_ENABLED:
+            # Let the batch loop flush and commit before closing; run_worker then exits
+            return
         self.close()
         sys.exit(0)
 
@@ -123,6 +486,9 @@ class KafkaMongoConsumer:
             self.consumer.close()
             print("Kafka consumer closed")
         
+        if self.dead_letter_producer:
+            self.dead_letter_producer.close()
+
         if self.mongo_client:
             self.mongo_client.close()
             print("MongoDB connection closed")
@@ -130,7 +496,14 @@ class KafkaMongoConsumer:
     def run(self):
         """Main consumer loop."""
         print("Starting consumer loop...")
-        
+
+        if BATCH_ENABLED:
+            print(f"Batch mode: size={BATCH_SIZE}, linger={BATCH_LINGER_MS}ms, in_flight={MAX_IN_FLIGHT_BATCHES}")
+            self._run_batched()
+            self.close()
+            print(f"Consumer loop ended. Batch stats: {self.stats.snapshot()}")
+            return
+
         for message in self.consumer:
             if not self.running:
                 break
@@ -139,13 +512,20 @@ class KafkaMongoConsumer:
         self.close()
         print("Consumer loop ended")
 
-def main():
-    print("Starting consumer...")
+def run_worker(index=0):
+    """Run one consumer, restarting it after failures until it is shut down."""
+    print(f"Starting consumer worker {os.getpid()}...")
+    if METRICS_PORT:
+        serve(METRICS_PORT + index)
     consumer = None
     while True:
         try:
+            consumer = None
             consumer = KafkaMongoConsumer()
             consumer.run()
+            # In batch mode SIGTERM/SIGINT only stop the loop (so it can flush); don't restart
+            if not consumer.running:
+                break
         except KeyboardInterrupt:
             print("Shutdown requested. Exiting...")
             if consumer:
@@ -153,9 +533,40 @@ def main():
             break
         except Exception as e:
             print(f"Consumer failed: {e}")
+            if consumer is not None and not consumer.running:
+                # Failed while shutting down (e.g. flushing the last batch)
+                break
             print("Restarting consumer in 10 seconds...")
             sleep(10)
+    print(f"Consumer worker {os.getpid()} ended")
+
+def main():
+    print("Starting consumer...")
+    if CONSUMER_WORKERS == 1:
+        run_worker()
+        return
+
+    # Each worker joins the same group; Kafka spreads the partitions across them
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(i,), name=f"consumer-worker-{i}")
+        for i in range(CONSUMER_WORKERS)
+    ]
+
+    def stop_workers(signum, frame):
+        print("Shutdown signal received. Stopping workers...")
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    for worker in workers:
+        worker.start()
+    # Installed after forking so workers keep their own handlers
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+    print(f"Started {CONSUMER_WORKERS} consumer workers")
+    for worker in workers:
+        worker.join()
     print("Consumer ended")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,126 @@
+"""Dead-letter sinks for records the ingest pipeline cannot store.
+
+A record that fails to parse, fails validation or is rejected by MongoDB is
+dead-lettered with its original bytes and error metadata, and the rest of
+its batch carries on. Dead letters are flushed before the batch's offsets are
+committed, so a failed record is never both uncommitted-and-lost.
+
+Sinks:
+- **mongo**: one document per record in DEAD_LETTER_COLLECTION, keyed by
+  topic:partition:offset so redeliveries don't duplicate it
+- **kafka**: the original bytes re-published to DEAD_LETTER_TOPIC with the
+  metadata in `dlq.*` headers
+- **none**: count and log only
+
+The mongo and kafka sinks keep the original Kafka record timestamp (the
+`timestamp` field, or the `dlq.timestamp` header), which the consumer stamps
+readings with.
+replay_dead_letters.py re-feeds them into the source topic after a fix,
+re-publishing each record with that timestamp.
+"""
+import json
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING
+
+# Pipeline stages a record can fail in
+STAGES = ('parse', 'validation', 'write')
+
+# Original record timestamp (ms) of a Kafka dead letter; the dead letter itself is timestamped when it failed
+TIMESTAMP_HEADER = 'dlq.timestamp'
+
+
+def original_timestamp(timestamp_ms):
+    """Record timestamp to re-publish a dead letter with, or None when the record had none."""
+    if timestamp_ms is None:
+        return None
+    timestamp_ms = int(timestamp_ms)
+    return timestamp_ms if timestamp_ms >= 0 else None
+
+
+def header_timestamp(headers):
+    """Original record timestamp of a Kafka dead letter from its decoded `dlq.*` headers."""
+    if TIMESTAMP_HEADER in headers:
+        return original_timestamp(headers[TIMESTAMP_HEADER])
+    # Dead letters written before the header existed
+    source = json.loads(headers.get('dlq.source') or '{}')
+    return original_timestamp(source.get('timestamp'))
+
+
+def record_source(message):
+    """What a dead letter needs to keep from a Kafka message."""
+    return {
+        'topic': message.topic,
+        'partition': message.partition,
+        'offset': message.offset,
+        'timestamp': message.timestamp,
+        'key': message.key,
+        'value': message.value,
+    }
+
+
+class DeadLetterSink:
+    """Counts failures per stage; subclasses also persist the record."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def send(self, source, stage, error):
+        """Dead-letter one record. `source` comes from record_source()."""
+        with self._lock:
+            self.counts[stage] += 1
+        self._store(source, stage, error)
+
+    def _store(self, source, stage, error):
+        print(f"Dropped record {source['topic']}:{source['partition']}:{source['offset']} ({stage}): {error}")
+
+    def flush(self):
+        """Make every dead letter sent so far durable."""
+
+    def snapshot(self):
+        return {f"{stage}_errors": self.counts[stage] for stage in STAGES}
+
+
+class MongoDeadLetterSink(DeadLetterSink):
+    def __init__(self, collection):
+        super().__init__()
+        self.collection = collection
+
+    def ensure_indexes(self):
+        self.collection.create_index([('replayed', ASCENDING), ('failed_at', ASCENDING)])
+
+    def _store(self, source, stage, error):
+        record_id = f"{source['topic']}:{source['partition']}:{source['offset']}"
+        self.collection.replace_one({'_id': record_id}, {
+            **source,
+            'stage': stage,
+            'error': str(error),
+            'error_type': type(error).__name__,
+            'failed_at': datetime.now(timezone.utc),
+            'replayed': False,
+        }, upsert=True)
+
+
+class KafkaDeadLetterSink(DeadLetterSink):
+    def __init__(self, producer, topic):
+        super().__init__()
+        self.producer = producer
+        self.topic = topic
+
+    def _store(self, source, stage, error):
+        headers = [
+            ('dlq.stage', stage.encode('utf-8')),
+            ('dlq.error', str(error).encode('utf-8')),
+            ('dlq.error_type', type(error).__name__.encode('utf-8')),
+            (TIMESTAMP_HEADER, str(source['timestamp']).encode('utf-8')),
+            ('dlq.source', json.dumps({
+                key: source[key] for key in ('topic', 'partition', 'offset', 'timestamp')
+            }).encode('utf-8')),
+        ]
+        self.producer.send(self.topic, key=source['key'], value=source['value'], headers=headers)
+
+    def flush(self):
+        self.producer.flush()
@@ -0,0 +1,85 @@
+"""Last-known state per device, materialized by the consumer on every write.
+
+The consumer keeps an in-process cache of each device's message rate and
+last reading time, and upserts one document per device touched by a batch
+into the device state collection, so readers can answer "latest reading"
+and "is this device alive" in O(devices). Each upsert also bumps the
+device's `version`, which the backend's query cache keys its results on.
+"""
+import math
+import threading
+from time import monotonic
+
+from pymongo import DESCENDING, UpdateOne
+
+from rollups import reading_time
+
+# Time constant (seconds) of the exponentially decayed message rate
+RATE_TIME_CONSTANT = 60.0
+
+
+class DeviceStateWriter:
+    """Tracks per-device rates in memory and upserts the state collection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        # device_id -> {"rate": msgs/s, "updated": monotonic seconds, "last_seen": datetime}
+        self.cache = {}
+        self._lock = threading.Lock()
+
+    def ensure_indexes(self):
+        self.collection.create_index([('last_seen', DESCENDING)])
+
+    def _update_rate(self, device_id, count, now):
+        entry = self.cache.get(device_id)
+        if entry is None:
+            entry = self.cache[device_id] = {'rate': 0.0, 'updated': now, 'last_seen': None}
+            return entry
+        elapsed = now - entry['updated']
+        if elapsed > 0:
+            # Time-decayed average of the instantaneous rate since the last batch
+            alpha = 1 - math.exp(-elapsed / RATE_TIME_CONSTANT)
+            entry['rate'] = alpha * (count / elapsed) + (1 - alpha) * entry['rate']
+            entry['updated'] = now
+        return entry
+
+    def operations(self, documents):
+        """Build one upsert per device in `documents`."""
+        latest = {}
+        counts = {}
+        for document in documents:
+            device_id = document.get('Device_ID')
+            if device_id is None:
+                continue
+            ts = reading_time(document)
+            counts[device_id] = counts.get(device_id, 0) + 1
+            if device_id not in latest or ts >= latest[device_id][0]:
+                latest[device_id] = (ts, document)
+
+        now = monotonic()
+        operations = []
+        for device_id, (ts, document) in latest.items():
+            entry = self._update_rate(device_id, counts[device_id], now)
+            if entry['last_seen'] is None or ts > entry['last_seen']:
+                entry['last_seen'] = ts
+            operations.append(UpdateOne(
+                {'_id': device_id},
+                {
+                    '$inc': {'message_count': counts[device_id], 'version': 1},
+                    '$set': {'message_rate': entry['rate']},
+                    # Batches may land out of order; $max keeps the newest reading
+                    '$max': {
+                        'last_seen': ts,
+                        'last': {'timestamp': ts, 'reading': document},
+                    },
+                },
+                upsert=True
+            ))
+        return operations
+
+    def apply(self, documents):
+        """Fold a persisted batch into the device state collection."""
+        with self._lock:
+            operations = self.operations(documents)
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
@@ -0,0 +1,134 @@
+"""Idempotent writes: every reading carries a deterministic key stored under a unique index.
+
+Offsets are committed only after a batch is persisted, so a crash or a
+rebalance redelivers records that may already be in MongoDB. With a key per
+record those redeliveries are recognised as duplicates and skipped, and the
+derived rollups and device state are only updated for readings that were
+actually new.
+
+Keys:
+- **offset**: topic:partition:offset of the Kafka record (default)
+- **reading**: hash of Device_ID and the device-reported timestamp, which also
+  collapses duplicates the producer created by resending a reading; records
+  without a reported timestamp fall back to the offset key
+
+Time-series collections can't carry a unique index, so there the writer
+checks which keys are stored before inserting, holding a lock so batches
+written concurrently by this consumer can't both pass the check.
+"""
+import hashlib
+import threading
+
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+KEY_FIELD = 'ingest_key'
+DUPLICATE_KEY = 11000
+
+
+def offset_key(message, value):
+    return f"{message.topic}:{message.partition}:{message.offset}"
+
+
+def reading_key(message, value):
+    """`value` is the parsed record, before normalization replaces its timestamp."""
+    reported = value.get('timestamp') if isinstance(value, dict) else None
+    if reported is None:
+        return offset_key(message, value)
+    digest = hashlib.blake2b(f"{value.get('Device_ID')}|{reported}".encode('utf-8'), digest_size=12)
+    return digest.hexdigest()
+
+
+KEY_FUNCTIONS = {'offset': offset_key, 'reading': reading_key}
+
+
+def split_write_errors(documents, error, duplicates_ok=True):
+    """
+    Split a batch after an unordered insert_many raised BulkWriteError.
+
+    Returns (inserted, duplicates, failed) where `failed` pairs each rejected
+    document with its write error.
+    """
+    errors = {item['index']: item for item in error.details.get('writeErrors', [])}
+    inserted, duplicates, failed = [], 0, []
+    for i, document in enumerate(documents):
+        item = errors.get(i)
+        if item is None:
+            inserted.append(document)
+        elif duplicates_ok and item.get('code') == DUPLICATE_KEY:
+            duplicates += 1
+        else:
+            failed.append((document, item))
+    return inserted, duplicates, failed
+
+
+class IdempotentWriter:
+    """Inserts readings, skipping those whose key is already stored."""
+
+    def __init__(self, collection, unique=True):
+        self.collection = collection
+        # Time-series collections can't have unique indexes; check keys before inserting instead
+        self.unique = unique
+        self.duplicates = 0
+        # Without a unique index the check and the insert must not interleave with another
+        # in-flight batch (e.g. a redelivery racing its original), so they run one at a time
+        self._check_lock = threading.Lock()
+
+    def ensure_indexes(self):
+        if self.unique:
+            # Partial, so readings written before keys existed don't collide on null
+            self.collection.create_index(
+                [(KEY_FIELD, ASCENDING)], unique=True,
+                partialFilterExpression={KEY_FIELD: {'$exists': True}}
+            )
+        else:
+            self.collection.create_index([(KEY_FIELD, ASCENDING)])
+
+    def insert_one(self, document):
+        """Insert one reading; returns False if it was already stored, raises on other write errors."""
+        if not self.unique:
+            with self._check_lock:
+                if self.collection.find_one({KEY_FIELD: document[KEY_FIELD]}, {'_id': 1}):
+                    self.duplicates += 1
+                    return False
+                self.collection.insert_one(document)
+            return True
+        try:
+            self.collection.insert_one(document)
+        except DuplicateKeyError:
+            self.duplicates += 1
+            return False
+        return True
+
+    def insert_many(self, documents):
+        """Insert a batch unordered; returns (new documents, [(document, write error)])."""
+        if not self.unique:
+            with self._check_lock:
+                return self._insert_unseen(documents)
+        return self._insert(documents)
+
+    def _insert_unseen(self, documents):
+        """Check-then-insert for collections without a unique index; caller holds _check_lock."""
+        keys = [document[KEY_FIELD] for document in documents]
+        stored = {
+            doc[KEY_FIELD]
+            for doc in self.collection.find({KEY_FIELD: {'$in': keys}}, {KEY_FIELD: 1, '_id': 0})
+        }
+        fresh = []
+        for document in documents:
+            if document[KEY_FIELD] not in stored:
+                stored.add(document[KEY_FIELD])
+                fresh.append(document)
+        self.duplicates += len(documents) - len(fresh)
+        if not fresh:
+            return [], []
+        return self._insert(fresh)
+
+    def _insert(self, documents):
+        try:
+            self.collection.insert_many(documents, ordered=False)
+            return documents, []
+        except BulkWriteError as e:
+            inserted, duplicates, failed = split_write_errors(documents, e)
+            self.duplicates += duplicates
+            return inserted, failed
@@ -0,0 +1,136 @@
+"""Convert the readings collection into a MongoDB time-series collection.
+
+The existing collection is renamed to `<name>_legacy`, a time-series
+collection is created under the original name, and the legacy documents are
+streamed over in _id order in batches. Each document goes through the same
+normalization as live records; its timestamp is the stored `timestamp` when
+usable, otherwise the insert time encoded in its ObjectId. Progress is
+checkpointed after every batch, so an interrupted run resumes where it
+stopped when started again with the same arguments.
+
+Stop the consumer (or start it with TIMESERIES_ENABLED=true) before running:
+
+    python migrate_timeseries.py --batch-size 5000 --drop-legacy
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from time import monotonic
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from rollups import reading_time
+from timeseries import collection_info, ensure_timeseries_collection
+
+# Shared modules live in common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.normalize import RejectedRecord, normalize  # noqa: E402
+
+load_dotenv()
+
+CHECKPOINT_COLLECTION = 'migrations'
+
+
+def legacy_time_ms(document):
+    """Milliseconds since the epoch for a legacy reading."""
+    if document.get('timestamp') is None and isinstance(document.get('_id'), ObjectId):
+        ts = document['_id'].generation_time
+    else:
+        ts = reading_time(document)
+    return int(ts.timestamp() * 1000)
+
+
+def prepare(db, source, legacy, granularity, expire_after_seconds):
+    """Move `source` aside (first run only) and make sure the time-series target exists."""
+    source_info = collection_info(db, source)
+    if source_info is not None and source_info.get('type') != 'timeseries':
+        if collection_info(db, legacy) is not None:
+            raise SystemExit(f"Both {source} and {legacy} exist as regular collections; refusing to continue")
+        db[source].rename(legacy)
+        print(f"Renamed {source} -> {legacy}")
+    elif collection_info(db, legacy) is None:
+        raise SystemExit(f"Nothing to migrate: {legacy} does not exist")
+
+    ensure_timeseries_collection(db, source, granularity, expire_after_seconds)
+
+
+def migrate(db, source, legacy, batch_size):
+    """Stream `legacy` into `source`, resuming from the stored checkpoint."""
+    checkpoints = db[CHECKPOINT_COLLECTION]
+    checkpoint_id = f"timeseries:{source}"
+    checkpoint = checkpoints.find_one({'_id': checkpoint_id}) or {}
+    query = {'_id': {'$gt': checkpoint['last_id']}} if 'last_id' in checkpoint else {}
+    copied = checkpoint.get('copied', 0)
+    rejected = checkpoint.get('rejected', 0)
+    if query:
+        print(f"Resuming after {checkpoint['last_id']} ({copied} already copied)")
+
+    target = db[source]
+    resumed_at = copied
+    started = monotonic()
+    batch, last_id = [], None
+
+    def flush():
+        nonlocal batch
+        if batch:
+            target.insert_many(batch, ordered=False)
+        checkpoints.update_one(
+            {'_id': checkpoint_id},
+            {'$set': {'last_id': last_id, 'copied': copied, 'rejected': rejected}},
+            upsert=True
+        )
+        batch = []
+
+    for document in db[legacy].find(query).sort('_id', 1).batch_size(batch_size):
+        last_id = document['_id']
+        try:
+            reading = normalize(document, legacy_time_ms(document))
+        except RejectedRecord:
+            rejected += 1
+        else:
+            reading['_id'] = last_id
+            batch.append(reading)
+            copied += 1
+        if len(batch) >= batch_size:
+            flush()
+            elapsed = monotonic() - started
+            print(f"Copied {copied} readings ({rejected} rejected), {(copied - resumed_at) / elapsed:.0f}/s, last _id {last_id}")
+
+    if last_id is not None:
+        flush()
+    print(f"Migration complete: {copied} copied, {rejected} rejected")
+    return copied, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the readings collection into a time-series collection")
+    parser.add_argument('--mongo-uri', default=os.getenv('MONGO_URI'))
+    parser.add_argument('--db', default=os.getenv('DB_NAME', 'scmlitedb'))
+    parser.add_argument('--collection', default=os.getenv('COLLECTION_NAME', 'shipment_data'))
+    parser.add_argument('--legacy', help="name for the original collection (default: <collection>_legacy)")
+    parser.add_argument('--granularity', default=os.getenv('TIMESERIES_GRANULARITY', 'seconds'))
+    parser.add_argument('--expire-after-seconds', type=int,
+                        default=int(os.getenv('TIMESERIES_EXPIRE_AFTER_SECONDS', 0)))
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--drop-legacy', action='store_true', help="drop the original collection once copied")
+    args = parser.parse_args()
+
+    legacy = args.legacy or f"{args.collection}_legacy"
+    client = MongoClient(args.mongo_uri)
+    db = client[args.db]
+    try:
+        prepare(db, args.collection, legacy, args.granularity, args.expire_after_seconds)
+        migrate(db, args.collection, legacy, args.batch_size)
+        if args.drop_legacy:
+            db.drop_collection(legacy)
+            db[CHECKPOINT_COLLECTION].delete_one({'_id': f"timeseries:{args.collection}"})
+            print(f"Dropped {legacy}")
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Re-feed dead-lettered records into the source topic after a fix.
+
+Records are re-published with their original key, bytes and record
+timestamp, so they go through parsing, validation and the idempotent write
+path again and keep the reading time they were produced with. Mongo dead
+letters are marked replayed once Kafka has acknowledged them; Kafka dead
+letters are tracked by the replay consumer group's committed offsets.
+
+Each set of --stage filters gets its own consumer group
+(dead_letter_replay.<stages>, or dead_letter_replay for all stages), since a
+group commits past the records it skips. Replaying one stage therefore
+leaves the other stages' records to a later run; a record replayed under
+two groups is written once thanks to the idempotent write path.
+
+    python replay_dead_letters.py --stage validation --dry-run
+    python replay_dead_letters.py --stage validation --stage write
+"""
+import argparse
+import os
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from kafka import KafkaConsumer, KafkaProducer
+from pymongo import MongoClient
+
+from dead_letters import STAGES, header_timestamp, original_timestamp
+
+load_dotenv()
+
+KAFKA_BOOTSTRAP_SERVERS = os.getenv('KAFKA_BOOTSTRAP_SERVERS', 'kafka:9092').split(',')
+KAFKA_TOPIC = os.getenv('KAFKA_TOPIC', 'shipment_data')
+COLLECTION_NAME = os.getenv('COLLECTION_NAME', 'shipment_data')
+REPLAY_BATCH_SIZE = 500
+
+
+def replay_from_mongo(args, producer):
+    client = MongoClient(args.mongo_uri)
+    collection = client[args.db][args.collection]
+    query = {'stage': {'$in': args.stage}}
+    if not args.include_replayed:
+        query['replayed'] = False
+    replayed = 0
+    try:
+        cursor = collection.find(query).sort('failed_at', 1)
+        if args.limit:
+            cursor = cursor.limit(args.limit)
+        batch = []
+        for record in cursor:
+            if args.dry_run:
+                print(f"{record['_id']} ({record['stage']}): {record['error']}")
+                replayed += 1
+                continue
+            producer.send(args.topic, key=record.get('key'), value=bytes(record['value']),
+                          timestamp_ms=original_timestamp(record.get('timestamp')))
+            batch.append(record['_id'])
+            if len(batch) >= REPLAY_BATCH_SIZE:
+                replayed += _mark_replayed(collection, producer, batch)
+                batch = []
+        if batch:
+            replayed += _mark_replayed(collection, producer, batch)
+    finally:
+        client.close()
+    return replayed
+
+
+def _mark_replayed(collection, producer, ids):
+    # Only mark records Kafka has acknowledged
+    producer.flush()
+    collection.update_many(
+        {'_id': {'$in': ids}},
+        {'$set': {'replayed': True, 'replayed_at': datetime.now(timezone.utc)}}
+    )
+    return len(ids)
+
+
+def replay_group_id(stages):
+    """Consumer group for replaying `stages`; separate per stage set, as skipped records get committed."""
+    if set(stages) == set(STAGES):
+        return 'dead_letter_replay'
+    return 'dead_letter_replay.' + '+'.join(sorted(set(stages)))
+
+
+def replay_from_kafka(args, producer):
+    consumer = KafkaConsumer(
+        args.dead_letter_topic,
+        bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+        group_id=args.group_id,
+        auto_offset_reset='earliest',
+        enable_auto_commit=False,
+        # Stop once the dead-letter topic is drained
+        consumer_timeout_ms=5000
+    )
+    replayed = 0
+    try:
+        for message in consumer:
+            headers = {key: value.decode('utf-8') for key, value in message.headers or []}
+            if headers.get('dlq.stage') not in args.stage:
+                continue
+            if args.dry_run:
+                print(f"{headers.get('dlq.source')} ({headers.get('dlq.stage')}): {headers.get('dlq.error')}")
+            else:
+                producer.send(args.topic, key=message.key, value=message.value,
+                              timestamp_ms=header_timestamp(headers))
+            replayed += 1
+            if replayed % REPLAY_BATCH_SIZE == 0 and not args.dry_run:
+                producer.flush()
+                consumer.commit()
+            if args.limit and replayed >= args.limit:
+                break
+        if not args.dry_run:
+            producer.flush()
+            consumer.commit()
+    finally:
+        consumer.close()
+    return replayed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-feed dead-lettered records into the source topic")
+    parser.add_argument('--sink', choices=['mongo', 'kafka'], default=os.getenv('DEAD_LETTER_SINK', 'mongo'),
+                        help="where the dead letters are stored")
+    parser.add_argument('--stage', action='append', choices=STAGES,
+                        help="only replay records that failed in this stage (repeatable; default: all)")
+    parser.add_argument('--topic', default=KAFKA_TOPIC, help="topic to re-publish to")
+    parser.add_argument('--limit', type=int, default=0)
+    parser.add_argument('--dry-run', action='store_true', help="list the records without replaying them")
+    parser.add_argument('--include-replayed', action='store_true', help="mongo: replay records replayed before")
+    parser.add_argument('--mongo-uri', default=os.getenv('MONGO_URI'))
+    parser.add_argument('--db', default=os.getenv('DB_NAME', 'scmlitedb'))
+    parser.add_argument('--collection', default=os.getenv('DEAD_LETTER_COLLECTION', f'{COLLECTION_NAME}_dead_letters'))
+    parser.add_argument('--dead-letter-topic', default=os.getenv('DEAD_LETTER_TOPIC', f'{KAFKA_TOPIC}_dlq'))
+    parser.add_argument('--group-id', help="kafka: replay consumer group (default: one per set of stages)")
+    args = parser.parse_args()
+    args.stage = args.stage or list(STAGES)
+    if args.group_id is None:
+        args.group_id = replay_group_id(args.stage)
+
+    producer = None if args.dry_run else KafkaProducer(bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS, acks='all')
+    try:
+        if args.sink == 'mongo':
+            replayed = replay_from_mongo(args, producer)
+        else:
+            replayed = replay_from_kafka(args, producer)
+    finally:
+        if producer:
+            producer.close()
+    print(f"{'Would replay' if args.dry_run else 'Replayed'} {replayed} dead-lettered records")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Per-device time-bucket rollups maintained incrementally by the consumer.
+
+Each batch is pre-aggregated in memory by (Device_ID, bucket) and applied
+with one upsert per bucket using $inc/$min/$max, so rollup cost grows with
+the number of active devices, not the number of readings.
+"""
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, UpdateOne
+
+# Bucket name -> function truncating a datetime to the bucket start
+BUCKETS = {
+    '1m': lambda ts: ts.replace(second=0, microsecond=0),
+    '1h': lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    '1d': lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+}
+
+# Reading field -> rollup field
+METRICS = {
+    'First_Sensor_temperature': 'temperature',
+    'Battery_Level': 'battery',
+}
+
+
+def rollup_collection_name(collection_name, bucket):
+    return f"{collection_name}_rollup_{bucket}"
+
+
+def reading_time(document):
+    """UTC time of a reading: its timestamp field if usable, otherwise now."""
+    ts = document.get('timestamp')
+    if isinstance(ts, str):
+        try:
+            ts = datetime.fromisoformat(ts)
+        except ValueError:
+            ts = None
+    if isinstance(ts, datetime):
+        return ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc)
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def _aggregate(documents, truncate):
+    """Fold documents into {(device_id, bucket_start): partial stats}."""
+    buckets = {}
+    for document in documents:
+        device_id = document.get('Device_ID')
+        if device_id is None:
+            continue
+        ts = reading_time(document)
+        key = (device_id, truncate(ts))
+        entry = buckets.get(key)
+        if entry is None:
+            entry = buckets[key] = {'count': 0, 'last': None, 'metrics': {}}
+        entry['count'] += 1
+
+        values = {}
+        for field, name in METRICS.items():
+            value = _number(document.get(field))
+            values[name] = value
+            if value is None:
+                continue
+            stats = entry['metrics'].get(name)
+            if stats is None:
+                entry['metrics'][name] = {'count': 1, 'sum': value, 'min': value, 'max': value}
+            else:
+                stats['count'] += 1
+                stats['sum'] += value
+                stats['min'] = min(stats['min'], value)
+                stats['max'] = max(stats['max'], value)
+
+        if entry['last'] is None or ts >= entry['last']['timestamp']:
+            entry['last'] = {'timestamp': ts, **values}
+    return buckets
+
+
+def rollup_operations(documents, truncate):
+    """Build one UpdateOne upsert per (device, bucket) touched by `documents`."""
+    operations = []
+    for (device_id, bucket_start), entry in _aggregate(documents, truncate).items():
+        inc = {'count': entry['count']}
+        minimum, maximum = {}, {}
+        for name, stats in entry['metrics'].items():
+            inc[f'{name}.count'] = stats['count']
+            inc[f'{name}.sum'] = stats['sum']
+            minimum[f'{name}.min'] = stats['min']
+            maximum[f'{name}.max'] = stats['max']
+        # Embedded documents compare field by field, so $max keeps the newest reading
+        maximum['last'] = entry['last']
+
+        update = {'$inc': inc, '$max': maximum}
+        if minimum:
+            update['$min'] = minimum
+        operations.append(UpdateOne(
+            {'Device_ID': device_id, 'bucket_start': bucket_start},
+            update,
+            upsert=True
+        ))
+    return operations
+
+
+class RollupWriter:
+    """Applies rollup upserts for every bucket size to its own collection."""
+
+    def __init__(self, db, collection_name):
+        self.collections = {
+            bucket: db[rollup_collection_name(collection_name, bucket)]
+            for bucket in BUCKETS
+        }
+
+    def ensure_indexes(self):
+        for collection in self.collections.values():
+            collection.create_index(
+                [('Device_ID', ASCENDING), ('bucket_start', ASCENDING)],
+                unique=True
+            )
+
+    def apply(self, documents):
+        """Fold a persisted batch into every rollup collection."""
+        for bucket, collection in self.collections.items():
+            operations = rollup_operations(documents, BUCKETS[bucket])
+            if operations:
+                collection.bulk_write(operations, ordered=False)
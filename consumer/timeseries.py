@@ -0,0 +1,76 @@
+"""Helpers for storing readings in a native MongoDB time-series collection.
+
+Time-series collections group readings into compressed buckets per
+(Device_ID, time window), so storage and index size grow with the number of
+buckets instead of the number of readings and range scans read contiguous
+buckets. They require MongoDB 5.0+ and a BSON datetime `timestamp` on every
+document, which the normalization stage guarantees.
+"""
+from pymongo import ASCENDING, DESCENDING
+
+TIME_FIELD = 'timestamp'
+META_FIELD = 'Device_ID'
+GRANULARITIES = ('seconds', 'minutes', 'hours')
+
+# Secondary indexes for the read paths; time-series collections have no _id index
+TIMESERIES_INDEXES = [
+    [(TIME_FIELD, DESCENDING)],
+    [(META_FIELD, ASCENDING), (TIME_FIELD, DESCENDING)],
+]
+
+
+def collection_info(db, name):
+    """listCollections entry for `name`, or None if it does not exist."""
+    for info in db.list_collections(filter={'name': name}):
+        return info
+    return None
+
+
+def is_timeseries(db, name):
+    info = collection_info(db, name)
+    return info is not None and info.get('type') == 'timeseries'
+
+
+def create_timeseries_collection(db, name, granularity='seconds', expire_after_seconds=0):
+    """Create `name` as a time-series collection with its read-path indexes."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    options = {}
+    if expire_after_seconds:
+        options['expireAfterSeconds'] = expire_after_seconds
+    collection = db.create_collection(
+        name,
+        timeseries={'timeField': TIME_FIELD, 'metaField': META_FIELD, 'granularity': granularity},
+        **options
+    )
+    for keys in TIMESERIES_INDEXES:
+        collection.create_index(keys)
+    return collection
+
+
+def ensure_timeseries_collection(db, name, granularity='seconds', expire_after_seconds=0):
+    """
+    Make sure `name` is a time-series collection and return True if it is.
+
+    A missing collection is created. An existing regular collection is left
+    alone (convert it with migrate_timeseries.py) and False is returned.
+    """
+    info = collection_info(db, name)
+    if info is None:
+        create_timeseries_collection(db, name, granularity, expire_after_seconds)
+        print(f"Created time-series collection {name} (granularity={granularity})")
+        return True
+    if info.get('type') != 'timeseries':
+        print(f"Collection {name} exists as a regular collection; "
+              f"run migrate_timeseries.py to convert it. Writing to it as-is.")
+        return False
+
+    # Keep the TTL in sync with the configuration
+    current = info.get('options', {}).get('expireAfterSeconds')
+    wanted = expire_after_seconds or 'off'
+    if current != wanted and not (current is None and wanted == 'off'):
+        db.command('collMod', name, expireAfterSeconds=wanted)
+        print(f"Set expireAfterSeconds={wanted} on {name}")
+    for keys in TIMESERIES_INDEXES:
+        db[name].create_index(keys)
+    return True
@@ -74,34 +74,30 @@ export function Dashboard() {
   useEffect(() => {
     fetchData();
     fetchLatestData();
+    return deviceApi.subscribe((reading) => setLatestData(reading));
   }, []);
 
   const fetchData = async () => {
     try {
       setLoading(true);
-      const [shipmentsData, deviceDataResponse] = await Promise.all([
-        shipmentApi.getAll(),
-        deviceApi.getAll(1, 1), // Just get count
-      ]);
+      const [shipmentsData, shipmentStats, deviceDataResponse] =
+        await Promise.all([
+          shipmentApi.getAll(5), // Only the most recent are listed
+          shipmentApi.getStats(),
+          deviceApi.getAll(1, 1), // Just get count
+        ]);
 
       setShipments(shipmentsData);
 
-      // Calculate statistics
+      // Statistics are counted server-side
       const stats: Statistics = {
-        totalShipments: shipmentsData.length,
+        totalShipments: shipmentStats.total,
         totalDeviceData: deviceDataResponse.total,
-        pendingShipments: shipmentsData.filter((s) => s.status === "pending")
-          .length,
-        inTransitShipments: shipmentsData.filter(
-          (s) => s.status === "in_transit",
-        ).length,
-        deliveredShipments: shipmentsData.filter(
-          (s) => s.status === "delivered",
-        ).length,
-        cancelledShipments: shipmentsData.filter(
-          (s) => s.status === "cancelled",
-        ).length,
-        uniqueDevices: new Set(shipmentsData.map((s) => s.device_id)).size,
+        pendingShipments: shipmentStats.by_status.pending ?? 0,
+        inTransitShipments: shipmentStats.by_status.in_transit ?? 0,
+        deliveredShipments: shipmentStats.by_status.delivered ?? 0,
+        cancelledShipments: shipmentStats.by_status.cancelled ?? 0,
+        uniqueDevices: shipmentStats.unique_devices,
       };
 
       setStatistics(stats);
@@ -1,7 +1,7 @@
 import React, { useEffect, useState, useCallback } from "react";
 import { useNavigate } from "react-router-dom";
 import { Navigation } from "../components/Navigation";
-import { deviceApi, shipmentApi } from "../utils/api";
+import { deviceApi, shipmentApi, Page } from "../utils/api";
 import { useSearchParams } from "react-router-dom";
 
 interface DeviceDataPoint {
@@ -31,13 +31,19 @@ interface Shipment {
   [key: string]: any;
 }
 
-interface PaginatedResponse {
-  data: DeviceDataPoint[];
-  total: number;
-  page: number;
-  limit: number;
-  total_pages: number;
-}
+// Readings are paged with cursors: page 1 has none, later pages use the
+// next_cursor/prev_cursor of the page they were reached from
+const FIRST_PAGE: { number: number; cursor: string | null } = {
+  number: 1,
+  cursor: null,
+};
+
+// Device IDs are integers; anything else would get a 422 from the API
+const DEVICE_ID_PATTERN = /^\d+$/;
+// Typing only applies the filter once the input has settled for this long
+const FILTER_DEBOUNCE_MS = 400;
+
+const isDeviceId = (value: string) => DEVICE_ID_PATTERN.test(value.trim());
 
 export function DeviceDataPage() {
   const navigate = useNavigate();
@@ -45,106 +51,168 @@ export function DeviceDataPage() {
   const [shipments, setShipments] = useState<Shipment[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
-  const [page, setPage] = useState(1);
+  const [page, setPage] = useState(FIRST_PAGE);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [prevCursor, setPrevCursor] = useState<string | null>(null);
   const [limit] = useState(20);
-  const [totalPages, setTotalPages] = useState(1);
+  const [totalPages, setTotalPages] = useState<number | null>(null);
   const [total, setTotal] = useState(0);
   const [searchParams] = useSearchParams();
   const deviceIdFromUrl = searchParams.get("device_id");
-  const [filterDeviceId, setFilterDeviceId] = useState(deviceIdFromUrl || "");
-  const [showAllDevices, setShowAllDevices] = useState(!deviceIdFromUrl);
+  const validDeviceIdFromUrl =
+    deviceIdFromUrl && isDeviceId(deviceIdFromUrl)
+      ? deviceIdFromUrl.trim()
+      : null;
+  // What is typed vs. the validated device ID the page fetches and streams
+  const [deviceIdInput, setDeviceIdInput] = useState(deviceIdFromUrl || "");
+  const [filterDeviceId, setFilterDeviceId] = useState(
+    validDeviceIdFromUrl || "",
+  );
+  const [showAllDevices, setShowAllDevices] = useState(!validDeviceIdFromUrl);
   const [loadingShipments, setLoadingShipments] = useState(false);
+  const [shipmentsCursor, setShipmentsCursor] = useState<string | null>(null);
 
-  const fetchDeviceData = useCallback(async (deviceId: string) => {
-    try {
-      setLoading(true);
-      setError(null);
-      const response: PaginatedResponse = await deviceApi.getDeviceData(
-        deviceId,
-        page,
-        limit,
-      );
-      setDeviceData(response.data);
-      setTotalPages(response.total_pages);
-      setTotal(response.total);
-    } catch (err) {
-      setError(
-        err instanceof Error ? err.message : "Failed to fetch device data",
-      );
-      setDeviceData([]);
-    } finally {
-      setLoading(false);
-    }
-  }, []);
+  const fetchReadings = useCallback(
+    async (deviceId: string | null, cursor: string | null) => {
+      try {
+        setLoading(true);
+        setError(null);
+        const response: Page<DeviceDataPoint> = deviceId
+          ? await deviceApi.getDeviceData(deviceId, 1, limit, cursor)
+          : await deviceApi.getAll(1, limit, cursor);
+        setDeviceData(response.data);
+        setNextCursor(response.next_cursor);
+        setPrevCursor(response.prev_cursor);
+        setTotalPages(response.total_pages);
+        setTotal(response.total ?? 0);
+      } catch (err) {
+        setError(
+          err instanceof Error ? err.message : "Failed to fetch device data",
+        );
+        setDeviceData([]);
+        setNextCursor(null);
+        setPrevCursor(null);
+      } finally {
+        setLoading(false);
+      }
+    },
+    [limit],
+  );
 
-  const fetchShipmentsByDeviceId = useCallback(async (deviceId: string) => {
-    try {
-      setLoadingShipments(true);
-      const shipmentData = await shipmentApi.getByDeviceId(deviceId);
-      setShipments(shipmentData);
-    } catch (err) {
-      console.error("Failed to fetch shipments:", err);
-      setShipments([]);
-    } finally {
-      setLoadingShipments(false);
-    }
-  }, []);
+  // Loads the newest shipments, or appends the page after `cursor`
+  const fetchShipmentsByDeviceId = useCallback(
+    async (deviceId: string, cursor: string | null = null) => {
+      try {
+        setLoadingShipments(true);
+        const response = await shipmentApi.getByDeviceId(deviceId, cursor);
+        setShipments((current) =>
+          cursor ? [...current, ...response.data] : response.data,
+        );
+        setShipmentsCursor(response.next_cursor);
+      } catch (err) {
+        console.error("Failed to fetch shipments:", err);
+        if (!cursor) {
+          setShipments([]);
+        }
+        setShipmentsCursor(null);
+      } finally {
+        setLoadingShipments(false);
+      }
+    },
+    [],
+  );
 
-  const fetchAllDeviceData = useCallback(async () => {
-    try {
-      setLoading(true);
-      setError(null);
-      const response: PaginatedResponse = await deviceApi.getAll(page, limit);
-      setDeviceData(response.data);
-      setTotalPages(response.total_pages);
-      setTotal(response.total);
-    } catch (err) {
-      setError(
-        err instanceof Error ? err.message : "Failed to fetch device data",
-      );
-      setDeviceData([]);
-    } finally {
-      setLoading(false);
-    }
-  }, []);
+  const applyFilter = useCallback(
+    (deviceId: string) => {
+      if (deviceId !== filterDeviceId) {
+        setFilterDeviceId(deviceId);
+        setPage(FIRST_PAGE);
+      }
+    },
+    [filterDeviceId],
+  );
 
   const handleFilter = () => {
-    if (filterDeviceId.trim()) {
+    if (isDeviceId(deviceIdInput)) {
+      applyFilter(deviceIdInput.trim());
       setShowAllDevices(false);
-      setPage(1);
-      fetchDeviceData(filterDeviceId.trim());
-      fetchShipmentsByDeviceId(filterDeviceId.trim());
     }
   };
 
   const handleShowAll = () => {
     setShowAllDevices(true);
+    setDeviceIdInput("");
     setFilterDeviceId("");
-    setPage(1);
-    setShipments([]);
-    fetchAllDeviceData();
+    setPage(FIRST_PAGE);
+  };
+
+  // While filtering, follow the input once it holds a valid ID and has settled
+  useEffect(() => {
+    if (showAllDevices || !isDeviceId(deviceIdInput)) {
+      return;
+    }
+    const timer = setTimeout(
+      () => applyFilter(deviceIdInput.trim()),
+      FILTER_DEBOUNCE_MS,
+    );
+    return () => clearTimeout(timer);
+  }, [deviceIdInput, showAllDevices, applyFilter]);
+
+  const handleNextPage = () => {
+    if (nextCursor) {
+      setPage((current) => ({ number: current.number + 1, cursor: nextCursor }));
+    }
+  };
+
+  const handlePreviousPage = () => {
+    setPage((current) =>
+      current.number <= 2
+        ? FIRST_PAGE
+        : { number: current.number - 1, cursor: prevCursor },
+    );
   };
 
   useEffect(() => {
     if (deviceIdFromUrl) {
-      setFilterDeviceId(deviceIdFromUrl);
+      setDeviceIdInput(deviceIdFromUrl);
+    }
+    if (validDeviceIdFromUrl) {
+      setFilterDeviceId(validDeviceIdFromUrl);
       setShowAllDevices(false);
-      fetchDeviceData(deviceIdFromUrl);
-      fetchShipmentsByDeviceId(deviceIdFromUrl);
-    } else {
-      fetchAllDeviceData();
+      setPage(FIRST_PAGE);
     }
-  }, [deviceIdFromUrl, fetchDeviceData, fetchShipmentsByDeviceId]);
+  }, [deviceIdFromUrl, validDeviceIdFromUrl]);
 
   useEffect(() => {
     if (showAllDevices) {
-      fetchAllDeviceData();
-      setShipments([]);
+      fetchReadings(null, page.cursor);
     } else if (filterDeviceId) {
-      fetchDeviceData(filterDeviceId);
+      fetchReadings(filterDeviceId, page.cursor);
+    }
+  }, [page, filterDeviceId, showAllDevices, fetchReadings]);
+
+  useEffect(() => {
+    setShipmentsCursor(null);
+    if (!showAllDevices && filterDeviceId) {
       fetchShipmentsByDeviceId(filterDeviceId);
+    } else {
+      setShipments([]);
+    }
+  }, [filterDeviceId, showAllDevices, fetchShipmentsByDeviceId]);
+
+  // Prepend live readings while viewing the newest page
+  useEffect(() => {
+    if (page.number !== 1 || (!showAllDevices && !filterDeviceId)) {
+      return;
     }
-  }, [page, filterDeviceId, showAllDevices]);
+    return deviceApi.subscribe(
+      (reading) => {
+        setDeviceData((current) => [reading, ...current].slice(0, limit));
+        setTotal((current) => current + 1);
+      },
+      showAllDevices ? undefined : filterDeviceId,
+    );
+  }, [page.number, filterDeviceId, showAllDevices, limit]);
 
   return (
     <div className="min-h-screen bg-[var(--color-background)]">
@@ -176,17 +244,23 @@ export function DeviceDataPage() {
               <input
                 id="device_filter"
                 type="text"
-                value={filterDeviceId}
-                onChange={(e) => setFilterDeviceId(e.target.value)}
+                inputMode="numeric"
+                value={deviceIdInput}
+                onChange={(e) => setDeviceIdInput(e.target.value)}
                 onKeyPress={(e) => e.key === "Enter" && handleFilter()}
                 placeholder="Enter device ID (e.g., 1150)"
                 className="w-full px-4 py-3 bg-[var(--color-background)] border border-[var(--color-secondary)] rounded text-[var(--color-text)] placeholder-[var(--color-text-muted)] focus:outline-none focus:border-[var(--color-primary)]"
               />
+              {deviceIdInput.trim() && !isDeviceId(deviceIdInput) && (
+                <p className="mt-2 text-sm text-red-400">
+                  Device IDs are whole numbers
+                </p>
+              )}
             </div>
             <div className="flex gap-2">
               <button
                 onClick={handleFilter}
-                disabled={!filterDeviceId.trim()}
+                disabled={!isDeviceId(deviceIdInput)}
                 className="px-6 py-3 bg-[var(--color-primary)] text-[var(--color-background)] rounded hover:bg-[var(--color-accent)] transition-colors disabled:opacity-50 disabled:cursor-not-allowed font-medium"
               >
                 Filter
@@ -210,7 +284,8 @@ export function DeviceDataPage() {
                 </span>
                 {shipments.length > 0 && (
                   <span className="ml-2 text-[var(--color-accent)]">
-                    • {shipments.length} shipment
+                    • {shipments.length}
+                    {shipmentsCursor ? "+" : ""} shipment
                     {shipments.length !== 1 ? "s" : ""} found
                   </span>
                 )}
@@ -227,7 +302,7 @@ export function DeviceDataPage() {
                 Shipments for Device {filterDeviceId}
               </h2>
             </div>
-            {loadingShipments ? (
+            {loadingShipments && shipments.length === 0 ? (
               <div className="text-center py-8">
                 <div className="inline-block w-6 h-6 border-4 border-[var(--color-primary)] border-t-transparent rounded-full animate-spin"></div>
                 <p className="text-[var(--color-text-muted)] mt-2 text-sm">
@@ -308,6 +383,19 @@ export function DeviceDataPage() {
                     ))}
                   </tbody>
                 </table>
+                {shipmentsCursor && (
+                  <div className="px-6 py-4 border-t border-[var(--color-secondary)] text-center">
+                    <button
+                      onClick={() =>
+                        fetchShipmentsByDeviceId(filterDeviceId, shipmentsCursor)
+                      }
+                      disabled={loadingShipments}
+                      className="px-4 py-2 bg-[var(--color-secondary)] text-[var(--color-text)] rounded hover:bg-[var(--color-accent)] transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
+                    >
+                      {loadingShipments ? "Loading..." : "Load more shipments"}
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
@@ -406,24 +494,23 @@ export function DeviceDataPage() {
                 </div>
 
                 {/* Pagination */}
-                {totalPages > 1 && (
+                {(page.number > 1 || nextCursor) && (
                   <div className="px-6 py-4 border-t border-[#1e2a45] flex items-center justify-between">
                     <div className="text-[#8b92a7] text-sm">
-                      Page {page} of {totalPages}
+                      Page {page.number}
+                      {totalPages ? ` of about ${totalPages}` : ""}
                     </div>
                     <div className="flex gap-2">
                       <button
-                        onClick={() => setPage((p) => Math.max(1, p - 1))}
-                        disabled={page === 1}
+                        onClick={handlePreviousPage}
+                        disabled={page.number === 1}
                         className="px-4 py-2 bg-[#1e2a45] text-white rounded hover:bg-[#2a3654] transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
                       >
                         Previous
                       </button>
                       <button
-                        onClick={() =>
-                          setPage((p) => Math.min(totalPages, p + 1))
-                        }
-                        disabled={page === totalPages}
+                        onClick={handleNextPage}
+                        disabled={!nextCursor}
                         className="px-4 py-2 bg-[#1e2a45] text-white rounded hover:bg-[#2a3654] transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
                       >
                         Next
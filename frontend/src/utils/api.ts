@@ -131,6 +131,27 @@ export async function apiRequest<T>(
   }
 }
 
+// One page of a listing; pass next_cursor/prev_cursor back to move between pages
+export interface Page<T = any> {
+  data: T[];
+  total: number | null;
+  page: number | null;
+  limit: number;
+  total_pages: number | null;
+  next_cursor: string | null;
+  prev_cursor: string | null;
+}
+
+function pageQuery(params: Record<string, string | number | null | undefined>) {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== null && value !== undefined) {
+      query.set(key, String(value));
+    }
+  });
+  return query.toString();
+}
+
 // Auth API calls
 export const authApi = {
   signup: (data: {
@@ -166,8 +187,23 @@ export const authApi = {
 
 // Shipment API calls
 export const shipmentApi = {
-  getAll: () =>
-    apiRequest<any[]>("/shipments/all", {
+  // Newest first; one page of `limit` summaries
+  getAll: async (limit: number = 50) => {
+    const response = await apiRequest<{ data: any[]; next_cursor: string | null }>(
+      `/shipments/all?limit=${limit}&count=none`,
+      {
+        requiresAuth: true,
+      },
+    );
+    return response.data;
+  },
+
+  getStats: () =>
+    apiRequest<{
+      total: number;
+      by_status: Record<string, number>;
+      unique_devices: number;
+    }>("/shipments/stats", {
       requiresAuth: true,
     }),
 
@@ -178,41 +214,59 @@ export const shipmentApi = {
       body: JSON.stringify(data),
     }),
 
-  getByDeviceId: (deviceId: string) =>
-    apiRequest<any[]>(`/shipments/device/${deviceId}`, {
-      requiresAuth: true,
-    }),
+  // Newest first; follow next_cursor for older shipments
+  getByDeviceId: (deviceId: string, cursor?: string | null, limit: number = 50) =>
+    apiRequest<Page>(
+      `/shipments/device/${deviceId}?${pageQuery({ limit, cursor, count: "none" })}`,
+      {
+        requiresAuth: true,
+      },
+    ),
 };
 
 // Device data API calls
 export const deviceApi = {
-  getAll: async (page: number = 1, limit: number = 10) => {
-    return apiRequest<{
-      data: any[];
-      total: number;
-      page: number;
-      limit: number;
-      total_pages: number;
-    }>(`/data?page=${page}&limit=${limit}`, {
-      requiresAuth: true,
-    });
-  },
-
-  getDeviceData: (deviceId: string, page: number = 1, limit: number = 10) =>
-    apiRequest<{
-      data: any[];
-      total: number;
-      page: number;
-      limit: number;
-      total_pages: number;
-    }>(`/data/device/${deviceId}?page=${page}&limit=${limit}`, {
+  // A cursor (next_cursor/prev_cursor of a previous page) overrides `page`
+  getAll: (page: number = 1, limit: number = 10, cursor?: string | null) =>
+    apiRequest<Page>(`/data/all?${pageQuery({ page, limit, cursor })}`, {
       requiresAuth: true,
     }),
 
+  getDeviceData: (
+    deviceId: string,
+    page: number = 1,
+    limit: number = 10,
+    cursor?: string | null,
+  ) =>
+    apiRequest<Page>(
+      `/data/device/${deviceId}?${pageQuery({ page, limit, cursor })}`,
+      {
+        requiresAuth: true,
+      },
+    ),
+
   getLatestData: () =>
     apiRequest<any>("/data/latest", {
       requiresAuth: true,
     }),
+
+  // Live readings pushed by the server; returns a function that closes the stream
+  subscribe: (onReading: (reading: any) => void, deviceId?: string) => {
+    const token = localStorage.getItem("auth_token") || "";
+    const params = new URLSearchParams({ token });
+    if (deviceId) {
+      params.set("device_id", deviceId);
+    }
+    const source = new EventSource(`${BASE_URL}/data/stream?${params}`);
+    source.onmessage = (event) => {
+      try {
+        onReading(JSON.parse(event.data));
+      } catch (error) {
+        console.error("Failed to parse live reading:", error);
+      }
+    };
+    return () => source.close();
+  },
 };
 
 // Admin API calls
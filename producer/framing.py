@@ -0,0 +1,337 @@
+"""Incremental framing decoders for the socket -> Kafka producer.
+
+Bytes are received straight into a reusable bytearray with ``recv_into`` and
+complete frames are sliced out of it. Scan state is kept between reads, so
+each byte is examined once no matter how large the backlog grows, and
+multi-byte UTF-8 characters split across reads are only decoded once the
+whole frame has arrived.
+
+messages() handles everything buffered per read in one pass: complete lines
+are split out together, and back-to-back JSON objects are decoded straight
+from one str with the json module's C scanner, which also finds where each
+object ends. The byte-level frame scan is only needed for a frame split
+across reads or a malformed one.
+"""
+import json
+import re
+import struct
+
+# A complete JSON string, a brace, or the opening quote of a string still in flight
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]|"')
+# A complete object with no nested objects, matched in a single pass
+_FLAT_OBJECT = re.compile(rb'\{[^{}"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^{}"]*)*\}')
+# Whitespace between objects in a JSON stream
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_LENGTH_PREFIX = struct.Struct('>I')
+# Parses one JSON value at an index of a str: (value, end); what json.loads runs underneath
+_scan_once = json.JSONDecoder().scan_once
+
+
+class FramingError(ValueError):
+    """The stream can't be split into frames any more, e.g. a frame over max_frame_size."""
+
+
+class FrameDecoder:
+    """Base decoder holding the receive buffer; subclasses find frame boundaries."""
+
+    def __init__(self, buffer_size=65536, max_frame_size=16 * 1024 * 1024):
+        self.buffer_size = buffer_size
+        self.max_frame_size = max_frame_size
+        self.decode_errors = 0
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._start = 0  # first unconsumed byte
+        self._end = 0    # end of received data
+
+    def _reserve(self, size):
+        """Make room for `size` more bytes, compacting before growing."""
+        if len(self._buf) - self._end >= size:
+            return
+        pending = self._end - self._start
+        if self._start and len(self._buf) - pending >= size:
+            self._buf[:pending] = self._buf[self._start:self._end]
+        else:
+            new_buf = bytearray(max(len(self._buf) * 2, pending + size))
+            new_buf[:pending] = self._view[self._start:self._end]
+            self._view.release()
+            self._buf = new_buf
+            self._view = memoryview(self._buf)
+        self._shift(self._start)
+        self._end = pending
+        self._start = 0
+
+    def _shift(self, offset):
+        """Hook for subclasses to rebase scan positions after compaction."""
+
+    def recv_into(self, sock):
+        """Read from `sock` directly into the buffer; returns the byte count (0 on EOF)."""
+        self._reserve(self.buffer_size)
+        n = sock.recv_into(self._view[self._end:], self.buffer_size)
+        self._end += n
+        return n
+
+    def feed(self, data):
+        """Append already-received bytes to the buffer."""
+        size = len(data)
+        self._reserve(size)
+        self._buf[self._end:self._end + size] = data
+        self._end += size
+
+    def _next_frame(self):
+        """Return (start, stop) of the next complete frame, or None."""
+        raise NotImplementedError
+
+    def _drained(self):
+        """Reset the buffer once everything is consumed and enforce the frame size limit."""
+        if self._start == self._end:
+            self._shift(self._start)
+            self._start = self._end = 0
+        elif self._end - self._start > self.max_frame_size:
+            raise FramingError(f"Frame exceeds {self.max_frame_size} bytes")
+
+    def frames(self):
+        """Yield a copy of every complete frame currently buffered."""
+        next_frame = self._next_frame
+        bounds = next_frame()
+        while bounds is not None:
+            yield self._buf[bounds[0]:bounds[1]]
+            bounds = next_frame()
+        self._drained()
+
+    def _decode(self, frame):
+        """Decoded JSON of one frame, or None (counted unless blank) if it fails to parse."""
+        try:
+            return json.loads(frame.decode('utf-8'))
+        except (ValueError, RecursionError) as e:
+            # Blank keep-alive lines are not errors
+            if frame.strip():
+                self.decode_errors += 1
+                print(f"Skipping undecodable frame: {e}")
+            return None
+
+    def messages(self):
+        """Yield decoded JSON objects, skipping frames that fail to parse."""
+        next_frame, decode = self._next_frame, self._decode
+        bounds = next_frame()
+        while bounds is not None:
+            message = decode(self._buf[bounds[0]:bounds[1]])
+            if message is not None:
+                yield message
+            bounds = next_frame()
+        self._drained()
+
+
+class NewlineDecoder(FrameDecoder):
+    """Newline-delimited JSON (one document per line)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._scan = 0
+
+    def _shift(self, offset):
+        self._scan = max(0, self._scan - offset)
+
+    def _next_frame(self):
+        newline = self._buf.find(b'\n', max(self._scan, self._start), self._end)
+        if newline < 0:
+            self._scan = self._end
+            return None
+        start = self._start
+        self._start = self._scan = newline + 1
+        return start, newline
+
+    def messages(self):
+        """Yield decoded JSON objects, splitting every complete line out at once."""
+        last = self._buf.rfind(b'\n', max(self._scan, self._start), self._end)
+        if last < 0:
+            self._scan = self._end
+            self._drained()
+            return
+        region = self._buf[self._start:last]
+        self._start = self._scan = last + 1
+        try:
+            lines = region.decode('utf-8').split('\n')
+        except UnicodeDecodeError:
+            # Find the bad lines one by one
+            lines = region.split(b'\n')
+        scan = _scan_once
+        for line in lines:
+            try:
+                message, end = scan(line, 0)
+                if end == len(line):
+                    yield message
+                    continue
+            except (ValueError, StopIteration, TypeError, RecursionError):
+                pass
+            # Surrounding whitespace, blank lines and errors take the json.loads path
+            message = self._decode(line.encode('utf-8') if isinstance(line, str) else line)
+            if message is not None:
+                yield message
+        self._drained()
+
+
+class LengthPrefixedDecoder(FrameDecoder):
+    """Frames prefixed with a 4-byte big-endian payload length."""
+
+    def _next_frame(self):
+        if self._end - self._start < _LENGTH_PREFIX.size:
+            return None
+        (length,) = _LENGTH_PREFIX.unpack_from(self._buf, self._start)
+        if length > self.max_frame_size:
+            raise FramingError(f"Frame exceeds {self.max_frame_size} bytes")
+        start = self._start + _LENGTH_PREFIX.size
+        stop = start + length
+        if stop > self._end:
+            return None
+        self._start = stop
+        return start, stop
+
+    def messages(self):
+        """Yield decoded JSON objects for every complete frame buffered."""
+        buf, unpack, prefix = self._buf, _LENGTH_PREFIX.unpack_from, _LENGTH_PREFIX.size
+        scan = _scan_once
+        start, end = self._start, self._end
+        try:
+            while end - start >= prefix:
+                (length,) = unpack(buf, start)
+                if length > self.max_frame_size:
+                    raise FramingError(f"Frame exceeds {self.max_frame_size} bytes")
+                stop = start + prefix + length
+                if stop > end:
+                    break
+                frame = buf[start + prefix:stop]
+                start = stop
+                try:
+                    text = frame.decode('utf-8')
+                    message, offset = scan(text, 0)
+                    if offset == len(text):
+                        yield message
+                        continue
+                except (ValueError, StopIteration, RecursionError):
+                    pass
+                message = self._decode(frame)
+                if message is not None:
+                    yield message
+        finally:
+            self._start = start
+        self._drained()
+
+
+class JSONStreamDecoder(FrameDecoder):
+    """Back-to-back JSON objects, e.g. the ``json.dumps(indent=1)`` stream from socket_server.
+
+    Tracks brace depth and string/escape state, so nested objects and braces
+    inside strings are handled; whitespace between objects is ignored.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._scan = 0
+        self._depth = 0
+        self._frame_start = 0
+
+    def _shift(self, offset):
+        self._scan = max(0, self._scan - offset)
+        self._frame_start = max(0, self._frame_start - offset)
+
+    def _next_frame(self):
+        buf = self._buf
+        depth = self._depth
+        pos = max(self._scan, self._start)
+        if depth == 0:
+            # Fast path: the next object is flat and fully buffered
+            brace = buf.find(b'{', pos, self._end)
+            if brace < 0:
+                self._start = self._scan = self._end
+                return None
+            match = _FLAT_OBJECT.match(buf, brace, self._end)
+            if match is not None:
+                self._start = self._scan = match.end()
+                return brace, match.end()
+            self._start = pos = brace
+
+        resume = self._end
+        for match in _TOKEN.finditer(buf, pos, self._end):
+            token_start = match.start()
+            char = buf[token_start]
+            if char == 0x7B:  # {
+                if depth == 0:
+                    self._frame_start = token_start
+                depth += 1
+            elif char == 0x7D:  # }
+                if depth:
+                    depth -= 1
+                    if depth == 0:
+                        self._depth = 0
+                        self._start = self._scan = match.end()
+                        return self._frame_start, match.end()
+            elif match.end() - token_start == 1:
+                # Unterminated string: rescan it once the rest arrives
+                resume = token_start
+                break
+
+        self._depth = depth
+        self._scan = resume
+        # Drop whitespace between objects
+        if depth == 0:
+            self._start = resume
+        return None
+
+    def messages(self):
+        """Yield decoded JSON objects, decoding runs of complete objects with the C scanner."""
+        while True:
+            if self._depth == 0:
+                yield from self._scan_objects()
+            # An object split across reads, or one the scanner rejected
+            bounds = self._next_frame()
+            if bounds is None:
+                break
+            message = self._decode(self._buf[bounds[0]:bounds[1]])
+            if message is not None:
+                yield message
+        self._drained()
+
+    def _scan_objects(self):
+        """Decode back-to-back objects from the start of the buffer up to the last '}'."""
+        start = self._start
+        last = self._buf.rfind(b'}', start, self._end)
+        if last < 0:
+            return
+        try:
+            # '}' is ASCII, so this never splits a multi-byte character
+            text = self._buf[start:last + 1].decode('utf-8')
+        except UnicodeDecodeError:
+            return
+        scan, skip = _scan_once, _WHITESPACE.match
+        size = len(text)
+        pos = 0
+        try:
+            while pos < size:
+                if text[pos] != '{':
+                    pos = skip(text, pos).end()
+                    if pos == size or text[pos] != '{':
+                        break
+                try:
+                    message, pos = scan(text, pos)
+                except (ValueError, StopIteration, RecursionError):
+                    # Incomplete or malformed: left to the byte-level scan
+                    break
+                yield message
+        finally:
+            if pos:
+                self._start = self._scan = start + (pos if text.isascii() else len(text[:pos].encode('utf-8')))
+
+
+DECODERS = {
+    'json': JSONStreamDecoder,
+    'ndjson': NewlineDecoder,
+    'length': LengthPrefixedDecoder,
+}
+
+
+def make_decoder(framing='json', buffer_size=65536):
+    """Create a decoder for one of the DECODERS framing names."""
+    try:
+        return DECODERS[framing](buffer_size)
+    except KeyError:
+        raise ValueError(f"Unknown framing '{framing}', expected one of {sorted(DECODERS)}")
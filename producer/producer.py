@@ -1,9 +1,20 @@
 import socket
 import json
+import sys
+import threading
+from collections import deque
+from pathlib import Path
 from kafka import KafkaProducer
 import time
 import os
 from dotenv import load_dotenv
+from framing import FramingError, make_decoder
+from topics import KAFKA_TOPIC_PARTITIONS, KAFKA_REPLICATION_FACTOR, ensure_topic
+
+# Shared modules live in common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.metrics import Counter, Gauge, Histogram, serve  # noqa: E402
+from common.tracing import emitted_ms, now_ms, to_headers  # noqa: E402
 
 load_dotenv()
 
@@ -13,6 +24,32 @@ SOCKET_PORT = int(os.getenv('SOCKET_PORT', 5050))
 KAFKA_BOOTSTRAP_SERVERS = os.getenv('KAFKA_BOOTSTRAP_SERVERS', 'kafka:9092').split(',')
 KAFKA_TOPIC = os.getenv('KAFKA_TOPIC', 'shipment_data')
 BUFFER_SIZE = int(os.getenv('BUFFER_SIZE', 4096))
+FRAMING = os.getenv('FRAMING', 'json')  # json, ndjson or length
+
+# Pipelined send configuration
+PIPELINED_SENDS = os.getenv('PIPELINED_SENDS', 'true').lower() == 'true'
+PRODUCER_LINGER_MS = int(os.getenv('PRODUCER_LINGER_MS', 20))
+PRODUCER_BATCH_SIZE = int(os.getenv('PRODUCER_BATCH_SIZE', 65536))
+COMPRESSION_TYPE = os.getenv('COMPRESSION_TYPE') or None  # lz4, zstd, gzip or unset
+MAX_IN_FLIGHT_SENDS = int(os.getenv('MAX_IN_FLIGHT_SENDS', 10000))
+SEND_RETRIES = int(os.getenv('SEND_RETRIES', 3))
+FLUSH_INTERVAL = float(os.getenv('FLUSH_INTERVAL', 5))
+SOCKET_POLL_TIMEOUT = float(os.getenv('SOCKET_POLL_TIMEOUT', 1))
+# Send emitted/framed/produced stage times as Kafka headers
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+# Sidecar port for /metrics (0 disables it)
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9101))
+
+# Metrics
+SOCKET_BYTES = Counter('producer_socket_bytes_total', 'Bytes read from the socket server')
+MESSAGES_IN = Counter('producer_messages_received_total', 'Messages decoded from the socket stream')
+MESSAGES_SENT = Counter('producer_messages_sent_total', 'Messages handed to the Kafka producer')
+MESSAGES_DELIVERED = Counter('producer_messages_delivered_total', 'Messages acknowledged by Kafka')
+SEND_ERRORS = Counter('producer_send_errors_total', 'Failed Kafka sends, including retried ones')
+MESSAGES_DROPPED = Counter('producer_messages_dropped_total', 'Messages dropped after exhausting retries')
+FRAMING_ERRORS = Counter('producer_framing_errors_total', 'Connections dropped because the stream could not be framed')
+IN_FLIGHT_SENDS = Gauge('producer_in_flight_sends', 'Sends awaiting a Kafka acknowledgement')
+SEND_SECONDS = Histogram('producer_kafka_send_seconds', 'Time from send() to Kafka acknowledgement')
 
 def create_kafka_producer():
     """Create and return a Kafka producer instance."""
@@ -21,8 +58,13 @@ def create_kafka_producer():
         producer = KafkaProducer(
             bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
             value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+            # Keyed by Device_ID so each device's readings stay in order on one partition
+            key_serializer=lambda k: str(k).encode('utf-8') if k is not None else None,
             acks='all',
-            retries=3
+            retries=3,
+            linger_ms=PRODUCER_LINGER_MS,
+            batch_size=PRODUCER_BATCH_SIZE,
+            compression_type=COMPRESSION_TYPE
         )
         print("Kafka producer connected")
         return producer
@@ -30,6 +72,92 @@ def create_kafka_producer():
         print(f"Failed to create Kafka producer: {e}")
         raise
 
+class PipelinedSender:
+    """Fire-and-forget Kafka sends with delivery callbacks and bounded in-flight backpressure."""
+
+    def __init__(self, producer, topic, pipelined=PIPELINED_SENDS):
+        self.producer = producer
+        self.topic = topic
+        self.pipelined = pipelined
+        self.sent = 0
+        self.delivered = 0
+        self.errors = 0
+        self.dropped = 0
+        self._slots = threading.BoundedSemaphore(MAX_IN_FLIGHT_SENDS)
+        self._retries = deque()
+        self._last_flush = time.monotonic()
+
+    def send(self, message, attempt=0, trace=None):
+        """Queue a message for delivery, blocking only when too many sends are in flight."""
+        self._slots.acquire()
+        try:
+            key = message.get('Device_ID') if isinstance(message, dict) else None
+            headers = None
+            if trace is not None:
+                trace['produced'] = now_ms()
+                headers = to_headers(trace)
+            started = time.perf_counter()
+            future = self.producer.send(self.topic, key=key, value=message, headers=headers)
+        except Exception as e:
+            self._on_error(message, attempt, e, trace)
+            return
+        self.sent += 1
+        MESSAGES_SENT.inc()
+        IN_FLIGHT_SENDS.inc()
+        future.add_callback(self._on_delivery, started)
+        future.add_errback(self._on_send_error, message, attempt, trace)
+
+        if not self.pipelined:
+            self.producer.flush()
+
+    def _on_delivery(self, started, metadata):
+        """Delivery callback, runs on the producer I/O thread."""
+        self._slots.release()
+        self.delivered += 1
+        IN_FLIGHT_SENDS.dec()
+        MESSAGES_DELIVERED.inc()
+        SEND_SECONDS.observe(time.perf_counter() - started)
+
+    def _on_send_error(self, message, attempt, trace, exc):
+        IN_FLIGHT_SENDS.dec()
+        self._on_error(message, attempt, exc, trace)
+
+    def _on_error(self, message, attempt, exc, trace=None):
+        """Delivery errback; hands the message back to the read loop for a retry."""
+        self._slots.release()
+        self.errors += 1
+        SEND_ERRORS.inc()
+        if attempt < SEND_RETRIES:
+            self._retries.append((message, attempt + 1, trace))
+        else:
+            self.dropped += 1
+            MESSAGES_DROPPED.inc()
+            print(f"Dropping message after {attempt + 1} attempts: {exc}")
+
+    def poll(self):
+        """Resend failed messages and flush on the checkpoint interval."""
+        for _ in range(len(self._retries)):
+            message, attempt, trace = self._retries.popleft()
+            self.send(message, attempt, trace)
+
+        if FLUSH_INTERVAL > 0 and time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Block until every queued send has been acknowledged."""
+        self.producer.flush()
+        self._last_flush = time.monotonic()
+
+    def stats(self):
+        """Return delivery counters as a dict."""
+        return {
+            "sent": self.sent,
+            "delivered": self.delivered,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "pending_retries": len(self._retries),
+        }
+
 def connect_to_socket_server(host, port):
     """Connect to the socket server and return the socket object."""
     print(f"Starting socket server connection to {host}:{port}...")
@@ -46,44 +174,56 @@ def connect_to_socket_server(host, port):
             print(f"Error connecting to socket server: {e}")
             raise
 
-def process_messages(sock, producer):
+def process_messages(sock, sender):
     """Continuously receive and process messages from the socket server."""
     print("Starting message processing...")
-    buffer = ""
+    decoder = make_decoder(FRAMING, BUFFER_SIZE)
+    # Wake up periodically so retries and checkpoints run while the socket is idle
+    sock.settimeout(SOCKET_POLL_TIMEOUT)
     while True:
         try:
-            # Receive data
-            data = sock.recv(BUFFER_SIZE)
-            if not data:
+            sender.poll()
+
+            # Receive data straight into the decoder buffer
+            received = decoder.recv_into(sock)
+            if not received:
                 print("Connection closed by server")
                 return False
+            SOCKET_BYTES.inc(received)
 
-            # Decode and process the data
-            buffer += data.decode('utf-8')
-            
-            # Process complete JSON objects
-            while '}' in buffer:
-                json_str, _, buffer = buffer.partition('}')
-                json_str += '}'
-                
-                # Parse the JSON data
-                message = json.loads(json_str)
-                
-                # Send to Kafka
-                producer.send(KAFKA_TOPIC, value=message)
-                producer.flush()
+            # Send every complete message to Kafka
+            framed = now_ms() if TRACING_ENABLED else None
+            for message in decoder.messages():
+                MESSAGES_IN.inc()
+                trace = None
+                if TRACING_ENABLED:
+                    emitted = emitted_ms(message.get('timestamp')) if isinstance(message, dict) else None
+                    trace = {'emitted': emitted, 'framed': framed}
+                sender.send(message, trace=trace)
+        except socket.timeout:
+            continue
+        except FramingError as e:
+            # Frame boundaries are lost (e.g. an oversized frame); resync on a new connection
+            FRAMING_ERRORS.inc()
+            print(f"Framing error: {e}. Dropping the connection")
+            return True
         except socket.error:
             print("Socket connection error")
             return False
 
 def main():
     print("Starting producer...")
+    if METRICS_PORT:
+        serve(METRICS_PORT)
+    if KAFKA_TOPIC_PARTITIONS:
+        ensure_topic(KAFKA_BOOTSTRAP_SERVERS, KAFKA_TOPIC, KAFKA_TOPIC_PARTITIONS, KAFKA_REPLICATION_FACTOR)
     producer = create_kafka_producer()
+    sender = PipelinedSender(producer, KAFKA_TOPIC)
     
     while True:
         sock = connect_to_socket_server(SOCKET_SERVER, SOCKET_PORT)
         try:
-            should_reconnect = process_messages(sock, producer)
+            should_reconnect = process_messages(sock, sender)
             if not should_reconnect:
                 break
         except KeyboardInterrupt:
@@ -96,8 +236,9 @@ def main():
         # Wait before reconnecting
         time.sleep(5)
     
+    sender.flush()
     producer.close()
-    print("Producer ended")
+    print(f"Producer ended. Delivery stats: {sender.stats()}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
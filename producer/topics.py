@@ -0,0 +1,66 @@
+"""Provision the telemetry topic with enough partitions for the consumer workers.
+
+The producer keys every message by Device_ID, so a device's readings always
+land on the same partition and stay in order, while different devices are
+spread across partitions that consumer workers can process in parallel.
+
+    python topics.py --partitions 8 --replication-factor 1
+"""
+import argparse
+import os
+
+from dotenv import load_dotenv
+from kafka.admin import KafkaAdminClient, NewPartitions, NewTopic
+from kafka.errors import TopicAlreadyExistsError
+
+load_dotenv()
+
+KAFKA_BOOTSTRAP_SERVERS = os.getenv('KAFKA_BOOTSTRAP_SERVERS', 'kafka:9092').split(',')
+KAFKA_TOPIC = os.getenv('KAFKA_TOPIC', 'shipment_data')
+# 0 leaves the topic to broker auto-creation
+KAFKA_TOPIC_PARTITIONS = int(os.getenv('KAFKA_TOPIC_PARTITIONS', 0))
+KAFKA_REPLICATION_FACTOR = int(os.getenv('KAFKA_REPLICATION_FACTOR', 1))
+
+
+def ensure_topic(bootstrap_servers, topic, partitions, replication_factor=1):
+    """
+    Create `topic` with `partitions` partitions, or grow it to that many.
+
+    Kafka can't shrink a topic; an existing topic with more partitions is left
+    alone. Growing a topic remaps keys to partitions, so per-device order is
+    only guaranteed for readings produced after the change.
+    Returns the topic's partition count.
+    """
+    admin = KafkaAdminClient(bootstrap_servers=bootstrap_servers)
+    try:
+        try:
+            admin.create_topics([NewTopic(topic, partitions, replication_factor)])
+            print(f"Created topic {topic} with {partitions} partitions")
+            return partitions
+        except TopicAlreadyExistsError:
+            pass
+
+        description = admin.describe_topics([topic])[0]
+        current = len(description['partitions'])
+        if current < partitions:
+            admin.create_partitions({topic: NewPartitions(total_count=partitions)})
+            print(f"Grew topic {topic} from {current} to {partitions} partitions")
+            return partitions
+        print(f"Topic {topic} has {current} partitions")
+        return current
+    finally:
+        admin.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or grow the telemetry topic")
+    parser.add_argument('--bootstrap-servers', default=','.join(KAFKA_BOOTSTRAP_SERVERS))
+    parser.add_argument('--topic', default=KAFKA_TOPIC)
+    parser.add_argument('--partitions', type=int, default=KAFKA_TOPIC_PARTITIONS or 8)
+    parser.add_argument('--replication-factor', type=int, default=KAFKA_REPLICATION_FACTOR)
+    args = parser.parse_args()
+    ensure_topic(args.bootstrap_servers.split(','), args.topic, args.partitions, args.replication_factor)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,50 +1,262 @@
-import socket
-import errno
+import asyncio
+import itertools
 import json
-import time
-import random
+import math
 import os
+import random
+import struct
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Shared modules live in common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.metrics import Counter, Gauge, Histogram, serve  # noqa: E402
 
-PORT = 5050
+# Configuration
 SERVER = os.getenv('SOCKET_HOST', '0.0.0.0')
-print(f"Starting socket server on {SERVER}:{PORT}")
-ADDR = (SERVER, PORT)
+PORT = int(os.getenv('SOCKET_PORT', 5050))
 FORMAT = 'utf-8'
+FRAMING = os.getenv('FRAMING', 'json')  # json (indent=1), ndjson or length
+
+# Simulated devices and aggregate rate across all connections (messages/s)
+DEVICE_ID_START = int(os.getenv('DEVICE_ID_START', 1150))
+DEVICE_COUNT = int(os.getenv('DEVICE_COUNT', 9))
+MESSAGE_RATE = float(os.getenv('MESSAGE_RATE', 0.1))
+TICK_SECONDS = float(os.getenv('TICK_SECONDS', 0.01))
+# Readings owed after a stall are sent late, up to this many seconds' worth; the rest are dropped
+CATCH_UP_SECONDS = float(os.getenv('CATCH_UP_SECONDS', 5))
+
+# Value distributions
+ROUTES = os.getenv('ROUTES', 'Newyork,USA|Chennai, India|Bengaluru, India|London,UK')
+TEMPERATURE_DIST = os.getenv('TEMPERATURE_DIST', 'uniform')  # uniform or normal
+TEMPERATURE_MIN = float(os.getenv('TEMPERATURE_MIN', 10.0))
+TEMPERATURE_MAX = float(os.getenv('TEMPERATURE_MAX', 40.0))
+TEMPERATURE_MEAN = float(os.getenv('TEMPERATURE_MEAN', 25.0))
+TEMPERATURE_STDDEV = float(os.getenv('TEMPERATURE_STDDEV', 5.0))
+BATTERY_DIST = os.getenv('BATTERY_DIST', 'uniform')  # uniform or drain
+BATTERY_MIN = float(os.getenv('BATTERY_MIN', 2.0))
+BATTERY_MAX = float(os.getenv('BATTERY_MAX', 5.0))
+BATTERY_DRAIN_PER_READING = float(os.getenv('BATTERY_DRAIN_PER_READING', 0.01))
+
+# Load shaping: periodic bursts of BURST_FACTOR x rate, and +/- JITTER fraction per tick
+BURST_FACTOR = float(os.getenv('BURST_FACTOR', 1.0))
+BURST_EVERY = float(os.getenv('BURST_EVERY', 60))
+BURST_DURATION = float(os.getenv('BURST_DURATION', 5))
+JITTER = float(os.getenv('JITTER', 0.0))
+
+STATS_INTERVAL = float(os.getenv('STATS_INTERVAL', 30))
+VERBOSE = os.getenv('VERBOSE', 'false').lower() == 'true'
+# Sidecar port for /metrics (0 disables it)
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9100))
+
+# Metrics
+MESSAGES_OUT = Counter('socket_server_messages_sent_total', 'Readings emitted to producers')
+MESSAGES_DROPPED = Counter('socket_server_messages_dropped_total', 'Readings skipped because generation fell behind')
+BYTES_OUT = Counter('socket_server_bytes_sent_total', 'Bytes written to producer connections')
+CLIENTS = Gauge('socket_server_clients', 'Connected producers')
+DRAIN_SECONDS = Histogram('socket_server_drain_seconds', 'Time a write waits for a producer to drain its buffer')
+
+_LENGTH_PREFIX = struct.Struct('>I')
+
+
+def parse_routes(spec):
+    """Parse 'Name=weight|Name|...' into (names, weights)."""
+    names, weights = [], []
+    for entry in spec.split('|'):
+        name, _, weight = entry.partition('=')
+        if name.strip():
+            names.append(name.strip())
+            weights.append(float(weight) if weight else 1.0)
+    if any(weight < 0 for weight in weights):
+        raise ValueError("ROUTES weights must not be negative")
+    # Every reading needs an origin and a different destination
+    if sum(1 for weight in weights if weight > 0) < 2:
+        raise ValueError("ROUTES needs at least two locations with a positive weight")
+    return names, weights
+
+
+def encode(reading, framing=FRAMING):
+    """Serialize a reading for the configured framing."""
+    if framing == 'json':
+        return json.dumps(reading, indent=1).encode(FORMAT)
+    payload = json.dumps(reading).encode(FORMAT)
+    if framing == 'ndjson':
+        return payload + b'\n'
+    if framing == 'length':
+        return _LENGTH_PREFIX.pack(len(payload)) + payload
+    raise ValueError(f"Unknown framing '{framing}'")
+
+
+def encode_batch(readings, framing=FRAMING):
+    """Serialize a tick's readings into one buffer."""
+    if framing == 'ndjson':
+        return '\n'.join(map(json.dumps, readings)).encode(FORMAT) + b'\n' if readings else b''
+    return b''.join(encode(reading, framing) for reading in readings)
+
+
+class DeviceSimulator:
+    """Generates readings for DEVICE_COUNT devices from the configured distributions."""
 
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.device_ids = list(range(DEVICE_ID_START, DEVICE_ID_START + DEVICE_COUNT))
+        self.routes, self.route_weights = parse_routes(ROUTES)
+        # choices() would rebuild these from the weights on every call
+        self.route_cum_weights = list(itertools.accumulate(self.route_weights))
+        # Each origin's possible destinations: every other route, with its weight
+        self.destinations = {}
+        for i, origin in enumerate(self.routes):
+            others = [j for j in range(len(self.routes)) if j != i]
+            self.destinations[origin] = (
+                [self.routes[j] for j in others],
+                list(itertools.accumulate(self.route_weights[j] for j in others)),
+            )
+        self.battery = {device_id: BATTERY_MAX for device_id in self.device_ids}
 
-server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-print("socket created")
+    def _temperature(self):
+        if TEMPERATURE_DIST == 'normal':
+            value = self.rng.gauss(TEMPERATURE_MEAN, TEMPERATURE_STDDEV)
+            return round(min(max(value, TEMPERATURE_MIN), TEMPERATURE_MAX), 1)
+        return round(self.rng.uniform(TEMPERATURE_MIN, TEMPERATURE_MAX), 1)
 
-server.bind(ADDR)    # bind this socket to the address we configured earlier
-server.listen(2)
-print(f"[LISTENING] Server is listening on {SERVER}")
-conn, addr = server.accept()
-print(f'CONNECTION FROM {addr} HAS BEEN ESTABLISHED')
-connected = True
-while connected:
+    def _battery(self, device_id):
+        if BATTERY_DIST == 'drain':
+            level = self.battery[device_id] - BATTERY_DRAIN_PER_READING
+            # Swap in a fresh battery once drained
+            self.battery[device_id] = level if level >= BATTERY_MIN else BATTERY_MAX
+            return round(self.battery[device_id], 2)
+        return round(self.rng.uniform(BATTERY_MIN, BATTERY_MAX), 2)
+
+    def reading(self, timestamp=None):
+        """Return one reading with distinct origin and destination."""
+        device_id = self.rng.choice(self.device_ids)
+        route_from, route_to = self.rng.choices(self.routes, cum_weights=self.route_cum_weights, k=2)
+        if route_to == route_from:
+            # Redraw from the other routes only, so this ends however skewed the weights are
+            destinations, cum_weights = self.destinations[route_from]
+            route_to = self.rng.choices(destinations, cum_weights=cum_weights)[0]
+        return {
+            "Battery_Level": self._battery(device_id),
+            "Device_ID": device_id,
+            "First_Sensor_temperature": self._temperature(),
+            "Route_From": route_from,
+            "Route_To": route_to,
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+        }
+
+    def readings(self, count):
+        """`count` readings for one tick, sharing its timestamp."""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        return [self.reading(timestamp) for _ in range(count)]
+
+
+def current_rate(elapsed):
+    """Aggregate rate at `elapsed` seconds, including the burst profile."""
+    if BURST_FACTOR != 1.0 and BURST_EVERY > 0 and elapsed % BURST_EVERY < BURST_DURATION:
+        return MESSAGE_RATE * BURST_FACTOR
+    return MESSAGE_RATE
+
+
+class SocketServer:
+    """Accepts any number of producer connections and spreads readings across them round-robin."""
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.clients = []
+        self.sent = 0
+        self.sent_bytes = 0
+
+    async def handle_client(self, reader, writer):
+        addr = writer.get_extra_info('peername')
+        print(f'CONNECTION FROM {addr} HAS BEEN ESTABLISHED')
+        self.clients.append(writer)
+        CLIENTS.inc()
         try:
-            for i in range(0,5):
-                route = ['Newyork,USA','Chennai, India','Bengaluru, India','London,UK']
-                routefrom = random.choice(route)
-                routeto = random.choice(route)
-                if (routefrom!=routeto):
-                    data = {
-                        "Battery_Level":round(random.uniform(2.00,5.00),2),
-                        "Device_ID": random.randint(1150,1158),
-                        "First_Sensor_temperature":round(random.uniform(10,40.0),1),
-                        "Route_From":routefrom,
-                        "Route_To":routeto
-                        }
-                    userdata = (json.dumps(data, indent=1)).encode(FORMAT)
-                    conn.send(userdata)
-                    print(userdata)
-                    time.sleep(10)
-                else:
-                    continue
-
-        except IOError as e:
-            if e.errno == errno.EPIPE:
-                pass
-
-conn.close()    #close the connection
+            # Producers never send anything; wait for them to disconnect
+            await reader.read()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.remove(writer)
+            CLIENTS.dec()
+            writer.close()
+            print(f'CONNECTION FROM {addr} CLOSED')
+
+    async def _send(self, writer, payload):
+        try:
+            writer.write(payload)
+            with DRAIN_SECONDS.time():
+                await writer.drain()
+        except (ConnectionError, OSError):
+            # handle_client notices the disconnect and drops the writer
+            pass
+
+    async def generate(self):
+        """Emit readings at the configured aggregate rate using a credit per tick."""
+        loop = asyncio.get_running_loop()
+        started = last = last_report = loop.time()
+        reported = 0
+        credit = 0.0
+        while True:
+            rate = current_rate(loop.time() - started)
+            # Sleep until at least one reading is due, but never longer than one tick at high rates
+            await asyncio.sleep(max(TICK_SECONDS, (1 - credit) / rate) if rate > 0 else 1)
+            now = loop.time()
+            if not self.clients:
+                credit, last = 0.0, now
+                continue
+
+            jitter = 1 + self.simulator.rng.uniform(-JITTER, JITTER) if JITTER else 1
+            # A late tick carries its readings over to the next ones, within CATCH_UP_SECONDS
+            credit += (now - last) * rate * jitter
+            last = now
+            backlog = max(rate * CATCH_UP_SECONDS, 1.0)
+            if credit > backlog:
+                dropped = math.floor(credit - backlog)
+                MESSAGES_DROPPED.inc(dropped)
+                credit -= dropped
+            # Send at most ten ticks' worth at once so catching up doesn't block the loop for long
+            due = min(math.floor(credit), max(1, math.ceil(rate * TICK_SECONDS * 10)))
+            credit -= due
+
+            clients = list(self.clients)
+            readings = self.simulator.readings(due)
+            # Round-robin across clients, continuing from where the last tick stopped
+            batches = [
+                encode_batch(readings[(i - self.sent) % len(clients)::len(clients)])
+                for i in range(len(clients))
+            ]
+            if VERBOSE:
+                for reading in readings:
+                    print(reading)
+            sent_bytes = sum(len(batch) for batch in batches)
+            self.sent += due
+            self.sent_bytes += sent_bytes
+            MESSAGES_OUT.inc(due)
+            BYTES_OUT.inc(sent_bytes)
+            await asyncio.gather(*(self._send(writer, batch) for writer, batch in zip(clients, batches) if batch))
+
+            if now - last_report >= STATS_INTERVAL:
+                rate_out = (self.sent - reported) / (now - last_report)
+                print(f"[STATS] clients={len(self.clients)} sent={self.sent} bytes={self.sent_bytes} rate={rate_out:.0f}/s")
+                last_report, reported = now, self.sent
+
+
+async def main():
+    print(f"Starting socket server on {SERVER}:{PORT}")
+    if METRICS_PORT:
+        serve(METRICS_PORT)
+    simulator = DeviceSimulator()
+    server = SocketServer(simulator)
+    listener = await asyncio.start_server(server.handle_client, SERVER, PORT)
+    print(f"[LISTENING] Server is listening on {SERVER}, {DEVICE_COUNT} devices at {MESSAGE_RATE} msgs/s ({FRAMING})")
+    async with listener:
+        await asyncio.gather(listener.serve_forever(), server.generate())
+
 
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Socket server stopped")
@@ -0,0 +1,128 @@
+"""Dead-lettered records keep their original Kafka timestamp through replay."""
+import json
+import sys
+from argparse import Namespace
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "consumer"))
+from common.normalize import normalize  # noqa: E402
+from dead_letters import KafkaDeadLetterSink, MongoDeadLetterSink, header_timestamp, record_source  # noqa: E402
+
+PRODUCED_AT = datetime(2026, 3, 1, 8, 15, 30, 250000, tzinfo=timezone.utc)
+PRODUCED_MS = int(PRODUCED_AT.timestamp() * 1000)
+VALUE = b'{"Device_ID": 1150, "Battery_Level": "3.5"}'
+
+
+def failed_message(**overrides):
+    return SimpleNamespace(**{
+        "topic": "shipment_data", "partition": 0, "offset": 42,
+        "timestamp": PRODUCED_MS, "key": b"1150", "value": VALUE, "headers": [],
+        **overrides,
+    })
+
+
+class Producer:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, topic, key=None, value=None, headers=None, timestamp_ms=None):
+        self.sent.append(SimpleNamespace(topic=topic, key=key, value=value, headers=headers or [],
+                                         timestamp=timestamp_ms))
+
+    def flush(self):
+        pass
+
+
+class Collection:
+    def __init__(self):
+        self.documents = {}
+
+    def replace_one(self, query, document, upsert=False):
+        self.documents[query["_id"]] = {"_id": query["_id"], **document}
+
+    def find(self, query):
+        return Cursor(self.documents.values())
+
+    def update_many(self, query, update):
+        pass
+
+
+class Cursor(list):
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        return self
+
+
+def decoded(headers):
+    return {key: value.decode("utf-8") for key, value in headers}
+
+
+def replayed_reading(message):
+    """What the consumer stores for a replayed message (normalize uses the record timestamp)."""
+    return normalize(json.loads(message.value), message.timestamp)
+
+
+def test_kafka_dead_letter_keeps_record_timestamp_in_a_header():
+    producer = Producer()
+    KafkaDeadLetterSink(producer, "shipment_data_dlq").send(record_source(failed_message()), "write", ValueError())
+    assert header_timestamp(decoded(producer.sent[0].headers)) == PRODUCED_MS
+
+
+def test_header_timestamp_falls_back_to_the_source_header():
+    headers = {"dlq.source": '{"topic": "shipment_data", "partition": 0, "offset": 42, "timestamp": %d}' % PRODUCED_MS}
+    assert header_timestamp(headers) == PRODUCED_MS
+    # Records without a timestamp are re-published without one
+    assert header_timestamp({"dlq.timestamp": "-1"}) is None
+
+
+def test_mongo_replay_keeps_original_timestamp(monkeypatch):
+    pytest.importorskip("kafka")
+    import replay_dead_letters
+
+    collection = Collection()
+    MongoDeadLetterSink(collection).send(record_source(failed_message()), "write", ValueError())
+    monkeypatch.setattr(replay_dead_letters, "MongoClient", lambda uri: _Client({"db": {"dead_letters": collection}}))
+
+    producer = Producer()
+    args = Namespace(mongo_uri=None, db="db", collection="dead_letters", stage=["write"], include_replayed=False,
+                     limit=0, dry_run=False, topic="shipment_data")
+    assert replay_dead_letters.replay_from_mongo(args, producer) == 1
+    assert replayed_reading(producer.sent[0])["timestamp"] == PRODUCED_AT
+
+
+def test_kafka_replay_keeps_original_timestamp(monkeypatch):
+    pytest.importorskip("kafka")
+    import replay_dead_letters
+
+    dlq = Producer()
+    KafkaDeadLetterSink(dlq, "shipment_data_dlq").send(record_source(failed_message()), "write", ValueError())
+    # The dead letter itself is timestamped when it failed, well after the reading
+    dead_letter = dlq.sent[0]
+    dead_letter.timestamp = PRODUCED_MS + 3_600_000
+    monkeypatch.setattr(replay_dead_letters, "KafkaConsumer", lambda *a, **kw: _Consumer([dead_letter]))
+
+    producer = Producer()
+    args = Namespace(dead_letter_topic="shipment_data_dlq", group_id="dead_letter_replay", stage=["write"],
+                     limit=0, dry_run=False, topic="shipment_data")
+    assert replay_dead_letters.replay_from_kafka(args, producer) == 1
+    assert replayed_reading(producer.sent[0])["timestamp"] == PRODUCED_AT
+
+
+class _Client(dict):
+    def close(self):
+        pass
+
+
+class _Consumer(list):
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
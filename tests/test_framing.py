@@ -0,0 +1,72 @@
+"""Producer frame decoders: results must not depend on how the stream is split into reads."""
+import json
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "producer"))
+from framing import FramingError, make_decoder  # noqa: E402
+
+MESSAGES = [
+    {"Device_ID": 1150, "Battery_Level": 3.5, "Route_From": "Newyork,USA"},
+    {"Device_ID": 1151, "note": "braces } and { and \"quotes\" inside a string"},
+    {"Device_ID": 1152, "route": {"from": "Chennai, India", "stops": [{"at": "Bengaluru"}]}},
+    {"Device_ID": 1153, "Route_To": "Zürich ☃ 東京"},
+]
+
+
+def encode(messages, framing):
+    if framing == "json":
+        return b"".join(json.dumps(m, indent=1, ensure_ascii=False).encode("utf-8") for m in messages)
+    if framing == "ndjson":
+        return b"".join(json.dumps(m, ensure_ascii=False).encode("utf-8") + b"\n" for m in messages)
+    return b"".join(struct.pack(">I", len(p)) + p for p in (json.dumps(m).encode("utf-8") for m in messages))
+
+
+def decode(stream, framing, chunk):
+    decoder = make_decoder(framing, 64)
+    messages = []
+    for i in range(0, len(stream), chunk):
+        decoder.feed(stream[i:i + chunk])
+        messages.extend(decoder.messages())
+    return decoder, messages
+
+
+@pytest.mark.parametrize("framing", ["json", "ndjson", "length"])
+@pytest.mark.parametrize("chunk", [1, 3, 7, 64, 4096])
+def test_any_read_size_gives_the_same_messages(framing, chunk):
+    decoder, messages = decode(encode(MESSAGES * 3, framing), framing, chunk)
+    assert messages == MESSAGES * 3
+    assert decoder.decode_errors == 0
+
+
+@pytest.mark.parametrize("chunk", [1, 5, 4096])
+def test_json_stream_skips_whitespace_and_malformed_objects(chunk):
+    stream = b' {"a": 1}\n\n{"b": 2,}\t{"c": {"d": 3}} \r\n{"e": "}"}'
+    decoder, messages = decode(stream, "json", chunk)
+    assert messages == [{"a": 1}, {"c": {"d": 3}}, {"e": "}"}]
+    assert decoder.decode_errors == 1
+
+
+@pytest.mark.parametrize("chunk", [1, 4, 4096])
+def test_ndjson_skips_blank_and_undecodable_lines(chunk):
+    stream = b'{"a": 1}\r\n\n  {"b": 2}  \nnot json\n{"c": "\xff"}\n{"d": 4}\n'
+    decoder, messages = decode(stream, "ndjson", chunk)
+    assert messages == [{"a": 1}, {"b": 2}, {"d": 4}]
+    assert decoder.decode_errors == 2
+
+
+def test_oversized_frames_raise_framing_error():
+    decoder = make_decoder("length", 64)
+    decoder.max_frame_size = 100
+    decoder.feed(struct.pack(">I", 101) + b"{")
+    with pytest.raises(FramingError):
+        list(decoder.messages())
+
+    decoder = make_decoder("json", 64)
+    decoder.max_frame_size = 100
+    decoder.feed(b'{"a": "' + b"x" * 200)
+    with pytest.raises(FramingError):
+        list(decoder.messages())
@@ -0,0 +1,72 @@
+"""Concurrent writes through IdempotentWriter without a unique index (time-series mode)."""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "consumer"))
+from idempotency import KEY_FIELD, IdempotentWriter  # noqa: E402
+
+
+class SlowCollection:
+    """Just enough of a pymongo collection, with a pause between reads and writes to widen races."""
+
+    def __init__(self):
+        self.documents = []
+        self._lock = threading.Lock()
+
+    def find(self, query, projection=None):
+        keys = set(query[KEY_FIELD]["$in"])
+        with self._lock:
+            found = [{KEY_FIELD: d[KEY_FIELD]} for d in self.documents if d[KEY_FIELD] in keys]
+        time.sleep(0.05)
+        return found
+
+    def find_one(self, query, projection=None):
+        time.sleep(0.05)
+        with self._lock:
+            return next((d for d in self.documents if d[KEY_FIELD] == query[KEY_FIELD]), None)
+
+    def insert_many(self, documents, ordered=True):
+        with self._lock:
+            self.documents.extend(dict(d) for d in documents)
+
+    def insert_one(self, document):
+        with self._lock:
+            self.documents.append(dict(document))
+
+
+def _batch():
+    return [{KEY_FIELD: f"shipment_data:0:{offset}", "Device_ID": 1} for offset in range(100)]
+
+
+def _run_concurrently(*targets):
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_insert_many_of_same_keys_stores_each_once():
+    collection = SlowCollection()
+    writer = IdempotentWriter(collection, unique=False)
+    results = []
+
+    _run_concurrently(*[lambda: results.append(writer.insert_many(_batch()))] * 2)
+
+    assert len(collection.documents) == 100
+    assert sorted(len(inserted) for inserted, failed in results) == [0, 100]
+    assert writer.duplicates == 100
+
+
+def test_concurrent_insert_one_of_same_key_stores_it_once():
+    collection = SlowCollection()
+    writer = IdempotentWriter(collection, unique=False)
+    document = _batch()[0]
+    results = []
+
+    _run_concurrently(*[lambda: results.append(writer.insert_one(dict(document)))] * 2)
+
+    assert len(collection.documents) == 1
+    assert sorted(results) == [False, True]
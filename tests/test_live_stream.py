@@ -0,0 +1,41 @@
+"""The Kafka live stream publishes readings as the consumer stores them."""
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("JWT_SECRET", "test")
+
+from backend.utils.live_stream import encode_reading, kafka_reading  # noqa: E402
+
+PRODUCED_AT = datetime(2026, 3, 1, 8, 15, 30, 250000, tzinfo=timezone.utc)
+
+
+def record(value, offset=7):
+    return SimpleNamespace(topic="shipment_data", partition=2, offset=offset,
+                           timestamp=int(PRODUCED_AT.timestamp() * 1000), value=value)
+
+
+def test_kafka_readings_are_normalized_and_keyed_by_offset():
+    raw = b'{"Device_ID": "1150", "Battery_Level": "3.5", "Route_From": "Chennai", "timestamp": "yesterday"}'
+    reading = json.loads(encode_reading(kafka_reading(record(raw))))
+    assert reading == {
+        "Device_ID": 1150,
+        "Battery_Level": 3.5,
+        "First_Sensor_temperature": None,
+        "Route_From": "Chennai",
+        "Route_To": None,
+        "timestamp": PRODUCED_AT.isoformat(),
+        "_id": "shipment_data:2:7",
+    }
+
+
+def test_records_the_consumer_rejects_are_not_published():
+    assert kafka_reading(record(b'{"Battery_Level": 3.5}')) is None
+    assert kafka_reading(record(b'{"Device_ID": "abc"}')) is None
+    assert kafka_reading(record(b'[1150]')) is None
+    assert kafka_reading(record(b'{"Device_ID": 11')) is None
+    assert kafka_reading(record(None)) is None
@@ -0,0 +1,41 @@
+import base64
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from bson import ObjectId, json_util
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("JWT_SECRET", "test")
+
+from backend.utils.pagination import decode_cursor, encode_cursor  # noqa: E402
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def test_round_trip():
+    document = {"_id": ObjectId(), "timestamp": datetime(2026, 1, 1, 12, 30)}
+    timestamp, object_id, direction = decode_cursor(encode_cursor(document, "next"))
+    assert (timestamp, object_id, direction) == (document["timestamp"], document["_id"], "next")
+
+    # Documents without the sort field still page
+    assert decode_cursor(encode_cursor({"_id": document["_id"]}, "prev"))[0] is None
+
+
+@pytest.mark.parametrize("payload", [
+    {"t": {"$ne": None}, "i": ObjectId(), "d": "next"},
+    {"t": datetime(2026, 1, 1), "i": {"$gt": ""}, "d": "next"},
+    {"t": "2026-01-01", "i": ObjectId(), "d": "next"},
+    {"t": datetime(2026, 1, 1), "i": str(ObjectId()), "d": "next"},
+    {"t": datetime(2026, 1, 1), "i": ObjectId(), "d": "sideways"},
+    [1, 2, 3],
+])
+def test_rejects_anything_encode_cursor_does_not_produce(payload):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(raw_cursor(payload))
+    assert error.value.status_code == 400
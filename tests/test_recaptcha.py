@@ -0,0 +1,90 @@
+"""HttpRecaptchaVerifier: single-use tokens and the circuit breaker's half-open probe."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("JWT_SECRET", "test")
+
+from backend.utils import recaptcha  # noqa: E402
+
+
+class Upstream:
+    """siteverify stand-in that accepts each token once, like Google's."""
+
+    def __init__(self):
+        self.calls = 0
+        self.down = False
+        self.delay = 0.0
+        self.seen = set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.down:
+            raise httpx.ConnectError("down", request=request)
+        token = dict(httpx.QueryParams(request.content.decode()))["response"]
+        success = token not in self.seen
+        self.seen.add(token)
+        return httpx.Response(200, json={"success": success})
+
+
+def verifier(upstream):
+    verifier = recaptcha.HttpRecaptchaVerifier(url="http://siteverify.test", secret="secret")
+    verifier.client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    return verifier
+
+
+def test_a_solved_token_is_not_reusable():
+    async def run():
+        upstream = Upstream()
+        check = verifier(upstream)
+        assert await check.verify("token") is True
+        assert await check.verify("token") is False
+        assert upstream.calls == 2
+
+    asyncio.run(run())
+
+
+def test_circuit_lets_one_probe_through_after_the_open_window(monkeypatch):
+    monkeypatch.setattr(recaptcha, "RECAPTCHA_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(recaptcha, "RECAPTCHA_OPEN_SECONDS", 0.05)
+
+    async def run():
+        upstream = Upstream()
+        upstream.down = True
+        check = verifier(upstream)
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await check.verify("token")
+        # Open: fails fast without calling the upstream
+        with pytest.raises(HTTPException):
+            await check.verify("token")
+        assert upstream.calls == 2
+
+        # Half-open: one probe goes out, concurrent requests still fail fast
+        await asyncio.sleep(0.06)
+        upstream.delay = 0.02
+        results = await asyncio.gather(*(check.verify(f"t{i}") for i in range(3)), return_exceptions=True)
+        assert upstream.calls == 3
+        assert all(isinstance(result, HTTPException) for result in results)
+
+        # The failed probe re-opened the circuit
+        with pytest.raises(HTTPException):
+            await check.verify("token")
+        assert upstream.calls == 3
+
+        # The next probe succeeds and closes it
+        await asyncio.sleep(0.06)
+        upstream.down = False
+        assert await check.verify("fresh") is True
+        assert await check.verify("other") is True
+        assert upstream.calls == 5
+
+    asyncio.run(run())
@@ -0,0 +1,79 @@
+"""Line splitting and row numbering of the streamed shipment import parser."""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from backend.utils.shipment_import import parse_rows  # noqa: E402
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _parse(data: bytes, fmt: str, size: int = 7):
+    async def collect():
+        return [row async for row in parse_rows(_chunks(data, size), fmt)]
+    return asyncio.run(collect())
+
+
+def test_ndjson_value_with_line_separators_is_one_row():
+    description = "first\u2028second\u0085third\rfourth"
+    body = "\n".join([
+        json.dumps({"shipment_number": "S1", "description": description}, ensure_ascii=False),
+        json.dumps({"shipment_number": "S2"}),
+    ]).encode("utf-8")
+
+    rows = _parse(body, "ndjson")
+
+    assert rows == [
+        (1, {"shipment_number": "S1", "description": description}, None),
+        (2, {"shipment_number": "S2"}, None),
+    ]
+
+
+def test_csv_field_with_lone_carriage_return_is_one_row():
+    body = 'shipment_number,description\r\nS1,"a\rb"\r\nS2,plain\r\n'.encode("utf-8")
+
+    rows = _parse(body, "csv")
+
+    assert [(row, record["shipment_number"], error) for row, record, error in rows] == [(1, "S1", None), (2, "S2", None)]
+    assert rows[0][1]["description"] == "a\rb"
+
+
+def test_oversized_ndjson_line_is_a_row_error_and_parsing_resumes():
+    long_line = json.dumps({"shipment_number": "S1", "description": "x" * 500})
+    body = "\n".join([long_line, json.dumps({"shipment_number": "S2"})]).encode("utf-8")
+
+    async def collect():
+        return [row async for row in parse_rows(_chunks(body, 16), "ndjson", max_chars=100)]
+    rows = asyncio.run(collect())
+
+    assert rows == [
+        (1, None, "line exceeds 100 characters"),
+        (2, {"shipment_number": "S2"}, None),
+    ]
+
+
+def test_body_without_newline_is_not_held_in_full():
+    body = b"x" * 10_000
+
+    async def collect():
+        return [row async for row in parse_rows(_chunks(body, 64), "ndjson", max_chars=100)]
+
+    assert asyncio.run(collect()) == [(1, None, "line exceeds 100 characters")]
+
+
+def test_oversized_csv_record_is_a_row_error():
+    body = f'shipment_number,description\nS1,"{"y" * 60}\n{"y" * 60}"\nS2,plain\n'.encode("utf-8")
+
+    async def collect():
+        return [row async for row in parse_rows(_chunks(body, 7), "csv", max_chars=100)]
+    rows = asyncio.run(collect())
+
+    assert [(row, record and record["shipment_number"], error) for row, record, error in rows] == [
+        (1, None, "record exceeds 100 characters"),
+        (2, "S2", None),
+    ]
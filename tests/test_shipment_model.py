@@ -0,0 +1,35 @@
+"""Field rules apply to new shipments, not to documents already stored."""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from backend.models.shipment_model import ShipmentCreate, ShipmentInDB  # noqa: E402
+
+LEGACY = {
+    "shipment_number": "S1",
+    "route": {"origin": "Chennai, India", "destination": "London,UK"},
+    "device_id": 1150,
+    "po_number": "PO 12/3",
+    "ndc_number": "0002-1433",
+    "serial_numbers": ["SN#1"],
+    "container_number": "MSCU 123",
+    "goods_type": "Pharmaceuticals",
+    "expected_delivery_date": datetime(2026, 1, 1),
+    "delivery_number": "D/1",
+    "batch_id": "B.7",
+}
+
+
+def test_create_rejects_non_alphanumeric_fields():
+    with pytest.raises(ValidationError):
+        ShipmentCreate(**LEGACY)
+
+
+def test_stored_shipments_still_load():
+    now = datetime(2025, 6, 1)
+    shipment = ShipmentInDB(**LEGACY, id="x", created_by="a@example.com", created_at=now, updated_at=now)
+    assert shipment.po_number == "PO 12/3"